@@ -0,0 +1,109 @@
+"""
+Micro-benchmark for the page-text extractors in upsilon.py.
+
+    python bench_extractors.py dump <pdf_dir> <corpus_dir>
+    python bench_extractors.py run <corpus_dir> [--repeat N] [--only NAME ...]
+
+`dump` saves the text of every PDF page (as merge_with_bookmarks sees it,
+via upsilon.extract_text) to <corpus_dir>/<pdf>_p<N>.txt. `run` times each
+extractor over every saved page so regex / rule-table regressions show up
+as a jump in the per-call cost.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import upsilon  # noqa: E402
+
+EXTRACTORS = (
+    "classify_text",
+    "is_unused_page",
+    "parse_w2",
+    "extract_account_number",
+    "extract_1099int_bookmark",
+    "extract_1099div_bookmark",
+    "extract_1099r_bookmark",
+    "extract_1099sa_bookmark",
+    "extract_5498sa_bookmark",
+    "extract_1098mortgage_bookmark",
+    "extract_1098t_bookmark",
+    "extract_consolidated_issuer",
+    "has_nonzero_int",
+    "has_nonzero_div",
+    "has_nonzero_misc",
+    "has_nonzero_oid",
+    "has_nonzero_1099b",
+)
+
+
+@contextlib.contextmanager
+def quiet():
+    """Swallow the extractors' debug prints while timing."""
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink), contextlib.redirect_stderr(sink):
+        yield
+
+
+def dump(pdf_dir: str, corpus_dir: str):
+    os.makedirs(corpus_dir, exist_ok=True)
+    count = 0
+    with upsilon.DocumentPool() as docs:
+        for path in sorted(glob.glob(os.path.join(pdf_dir, "*.pdf"))):
+            stem = os.path.splitext(os.path.basename(path))[0]
+            for i in range(docs.page_count(path)):
+                with quiet():
+                    text = upsilon.extract_text(path, i, docs)
+                with open(os.path.join(corpus_dir, f"{stem}_p{i + 1}.txt"), "w", encoding="utf-8") as f:
+                    f.write(text)
+                count += 1
+    print(f"Saved {count} page texts to {corpus_dir}")
+
+
+def run(corpus_dir: str, repeat: int, only: list[str] | None):
+    texts = []
+    for path in sorted(glob.glob(os.path.join(corpus_dir, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            texts.append(f.read())
+    if not texts:
+        sys.exit(f"No .txt pages in {corpus_dir}")
+
+    print(f"{len(texts)} pages, {sum(map(len, texts)) // len(texts)} chars avg, repeat={repeat}")
+    print(f"{'extractor':32} {'calls':>7} {'total ms':>10} {'µs/call':>10}")
+    for name in EXTRACTORS:
+        if only and name not in only:
+            continue
+        fn = getattr(upsilon, name, None)
+        if fn is None:
+            continue
+        with quiet():
+            for text in texts:  # warm-up: lazy imports, compiled tables
+                fn(text)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for text in texts:
+                    fn(text)
+            elapsed = time.perf_counter() - start
+        calls = repeat * len(texts)
+        print(f"{name:32} {calls:>7} {elapsed * 1e3:>10.1f} {elapsed / calls * 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    p = argparse.ArgumentParser(description="Benchmark upsilon bookmark extractors over saved page texts")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    d = sub.add_parser("dump", help="Save page texts from a folder of PDFs")
+    d.add_argument("pdf_dir")
+    d.add_argument("corpus_dir")
+    r = sub.add_parser("run", help="Time each extractor over a corpus of page texts")
+    r.add_argument("corpus_dir")
+    r.add_argument("--repeat", type=int, default=20)
+    r.add_argument("--only", nargs="*", help="Extractor names to run (default: all)")
+    args = p.parse_args()
+    if args.cmd == "dump":
+        dump(args.pdf_dir, args.corpus_dir)
+    else:
+        run(args.corpus_dir, args.repeat, args.only)
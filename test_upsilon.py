@@ -0,0 +1,143 @@
+import io
+import random
+import sys
+
+import fitz
+from PIL import Image, ImageDraw, ImageFont
+from pdfminer.pdfinterp import PDFPageInterpreter
+
+_streams = sys.stdout, sys.stderr
+import upsilon  # noqa: E402  (rewraps stdout/stderr as UTF-8 on import)
+_utf8_streams = sys.stdout, sys.stderr  # kept alive: collecting them would close pytest's capture files
+sys.stdout, sys.stderr = _streams
+
+
+def make_pdf(path, pages=12):
+    doc = fitz.open()
+    for n in range(pages):
+        page = doc.new_page()
+        page.insert_text((72, 72), f"Page {n + 1} of the annual account statement for the recipient")
+    doc.save(str(path))
+    doc.close()
+
+
+def test_parallel_extraction_lays_out_each_page_once(tmp_path, monkeypatch):
+    pdf = tmp_path / "statement.pdf"
+    make_pdf(pdf)
+    calls = tmp_path / "layout-calls"
+    process_page = PDFPageInterpreter.process_page
+
+    def counting(self, page):
+        with open(calls, "a") as f:   # workers are forked, so count through a file
+            f.write("x")
+        return process_page(self, page)
+
+    monkeypatch.setattr(PDFPageInterpreter, "process_page", counting)
+    jobs = [(str(pdf), i, ("PDFMiner",)) for i in range(12)]
+    results = list(upsilon.extract_pages_parallel(jobs, workers=4, chunksize=1))
+
+    assert [i for _, i, _, _ in results] == list(range(12))
+    assert len(calls.read_text()) == 12
+
+
+def thin_text_page(width, height, rotate):
+    doc = fitz.open()
+    page = doc.new_page(width=width, height=height)
+    page.insert_text((72, 72), "Form 1099-INT Interest Income")
+    page.set_rotation(rotate)
+    return doc, page
+
+
+def test_orientation_of_rotated_portrait_page_skips_osd(monkeypatch):
+    osd_calls = []
+    monkeypatch.setattr(upsilon, "osd_angle", lambda page, rotation: osd_calls.append(rotation) or 0)
+    doc, page = thin_text_page(612, 792, rotate=90)   # page.rect is landscape, the render is portrait
+
+    assert upsilon.page_orientation(page, "rotated.pdf", 0) == 0
+    assert osd_calls == []
+
+    doc, page = thin_text_page(792, 612, rotate=0)    # a real landscape page is still checked
+    upsilon.page_orientation(page, "landscape.pdf", 0)
+    assert osd_calls == [0]
+
+
+def test_title_needs_two_agreeing_readings(monkeypatch):
+    monkeypatch.setattr(upsilon, "classify_text", lambda text: ("Income", "1099-INT"))
+    monkeypatch.setitem(upsilon.TITLE_EXTRACTORS, "1099-INT", ("Income", lambda text: text.split("|")[0], "1099-INT"))
+    pulled = []
+
+    def candidates(form):
+        for name, text in (("roi", "Chase|1"), ("tiered", "Chose|2"), ("layout", "Chase|3"), ("PyMuPDF", "Chase|4")):
+            yield name, lambda name=name, text=text: pulled.append(name) or text
+
+    analysis = upsilon.analyse_page("Chase|0", candidates)
+
+    assert analysis.title == "Chase"
+    assert analysis.votes == {"Chase": 2, "Chose": 1}
+    assert pulled == ["roi", "tiered", "layout"]   # stops once two readings agree
+
+
+class StubStore:
+    """The PageTextStore calls analyse_page_record makes, over fixed texts."""
+
+    def __init__(self, text, form):
+        self._text, self._form, self.regions = text, form, []
+
+    def text(self, path, i):
+        return self._text
+
+    def analysis(self, path, i, compute):
+        return upsilon.PageAnalysis("Expenses", self._form)
+
+    def page_hash(self, path, i):
+        return None
+
+    def region_text(self, path, i, form, box_name):
+        self.regions.append(box_name)
+        return "Account Number: 123456789"
+
+
+def test_account_skip_rule_applies_to_the_form_and_skips_roi():
+    store = StubStore("Lender's name\nPayer's/Borrower's TIN", "1098-Mortgage")
+    run = upsilon.MergeRun("in", "out.pdf", None, store)
+
+    rec = upsilon.analyse_page_record(run, "scan.pdf", 0)
+
+    assert rec.account is None and rec.masked_account is None
+    assert "account" not in store.regions
+
+
+def scanned_w2(path, wages, noise_seed=None, shift=(0, 0)):
+    """One-page image-only PDF, optionally with speckle noise, a small offset and JPEG loss."""
+    img = Image.new("L", (1275, 1650), 255)
+    draw = ImageDraw.Draw(img)
+    font = ImageFont.load_default(size=28)
+    lines = ["Form W-2 Wage and Tax Statement", "c Employer's name ACME WIDGETS INC",
+             f"1 Wages, tips, other compensation {wages}", "2 Federal income tax withheld 8,765.43"]
+    for n, line in enumerate(lines):
+        draw.text((100 + shift[0], 150 + 60 * n + shift[1]), line, fill=0, font=font)
+    buf = io.BytesIO()
+    if noise_seed is None:
+        img.save(buf, "PNG")
+    else:
+        rnd, px = random.Random(noise_seed), img.load()
+        for _ in range(3000):
+            px[rnd.randrange(1275), rnd.randrange(1650)] = rnd.choice((0, 128, 255))
+        img.save(buf, "JPEG", quality=65)
+    doc = fitz.open()
+    page = doc.new_page(width=612, height=792)
+    page.insert_image(page.rect, stream=buf.getvalue())
+    doc.save(str(path))
+    doc.close()
+    return str(path), 0
+
+
+def test_rescans_are_duplicates_but_a_changed_amount_is_not(tmp_path):
+    original = scanned_w2(tmp_path / "a.pdf", "54,321.00")
+    rescan = scanned_w2(tmp_path / "b.pdf", "54,321.00", noise_seed=1, shift=(2, 1))
+    corrected = scanned_w2(tmp_path / "c.pdf", "54,821.00")
+
+    with upsilon.DocumentPool() as pool:
+        dups = upsilon.find_duplicate_pages([original, rescan, corrected], upsilon.PageTextStore(disk=None, pool=pool))
+
+    assert dups == {rescan: original}
@@ -1,4 +1,4 @@
-import sys, os, io, tempfile, traceback, re
+import sys, os, io, traceback, re
 from collections import defaultdict, Counter
 from typing import Dict, List, Tuple
 import re
@@ -9,11 +9,10 @@ EMP_BRACKET_RE = re.compile(
     re.IGNORECASE | re.DOTALL
 )
 
-from PyPDF2 import PdfMerger, PdfReader, PdfWriter
+from PyPDF2 import PdfReader, PdfWriter
 import PyPDF2
-from pdfminer.high_level import extract_text as pdfminer_extract
 from pdfminer.layout import LAParams
-from PyPDF2 import PdfReader, PdfMerger
+from PyPDF2 import PdfReader
 
 import platform
 import pytesseract
@@ -57,6 +56,12 @@ logger = logging.getLogger(__name__)
 #OPPLER_PATH = os.environ.get("POPPLER_PATH")  # e.g. "C:\\poppler\\Library\\bin"
 OCR_MIN_CHARS = 50
 PDFMINER_LA_PARAMS = LAParams(line_margin=0.2, char_margin=2.0)
+# Persistent OCR/text cache. It stores page text (names, SSNs) in plain
+# SQLite, so it is off unless OCR_CACHE_DIR names a directory; that
+# directory is created / tightened to owner-only access (0700).
+OCR_CACHE_DIR = os.environ.get("OCR_CACHE_DIR", "")
+OCR_CACHE_MAX_MB = int(os.environ.get("OCR_CACHE_MAX_MB", "512"))
+OCR_CACHE_VERSION = 7  # bump whenever rendering / preprocessing / OCR output / page hashing changes
 
 # ── Priority tables
 income_priorities = {
@@ -94,83 +99,539 @@ def log_extraction(src: str, method: str, text: str):
 
 import io
 import fitz  # PyMuPDF
-from PIL import Image, ImageOps, ImageEnhance, ImageFilter
+from PIL import Image, ImageEnhance, ImageFilter
 # ── Prevent PIL DecompressionBombError for large tax PDFs
 Image.MAX_IMAGE_PIXELS = None  # Safe because inputs are trusted (W-2/1099 client docs)
 
 
-def pdf_page_to_image(path: str, page_index: int, dpi: int = 300) -> Image.Image:
+# ── Shared document handles (open each input once per backend)
+from contextlib import closing, contextmanager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+from pdfminer.converter import TextConverter
+
+
+def iter_pdfminer_pages(fp, laparams: LAParams = PDFMINER_LA_PARAMS):
+    """
+    Walk the whole document once with pdfminer and yield (page_index,
+    layout) per page, where layout() returns the text exactly as
+    extract_text(page_numbers=[i]) would. The xref / page tree is parsed a
+    single time; a page is only laid out when its layout() is called, so
+    skipping ahead to page i costs no layout of the pages before it, and
+    each layout is dropped as soon as its text is returned.
+    """
+    rsrcmgr = PDFResourceManager(caching=True)
+    out = io.StringIO()
+    device = TextConverter(rsrcmgr, out, laparams=laparams)
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    def layout(page) -> str:
+        try:
+            interpreter.process_page(page)
+            return out.getvalue()
+        except Exception:
+            traceback.print_exc()
+            return ""
+        finally:
+            out.seek(0)
+            out.truncate(0)
+
+    try:
+        for i, page in enumerate(PDFPage.get_pages(fp, caching=True)):
+            yield i, lambda page=page: layout(page)
+    finally:
+        device.close()
+
+
+class DocumentPool:
+    """
+    Keeps one open handle per (input file, backend) for the whole run and
+    hands out page objects, instead of re-opening and re-parsing the PDF
+    for every page. Backends: fitz, PyPDF2, pdfplumber and pdfminer.
+    Call close() (or use it as a context manager) when the run is done.
+    """
+
+    def __init__(self):
+        self._fitz: Dict[str, "fitz.Document"] = {}
+        self._pypdf: Dict[str, PdfReader] = {}
+        self._plumber: Dict[str, "pdfplumber.PDF"] = {}
+        self._miner: Dict[str, tuple] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # -- fitz
+    def fitz(self, path: str) -> "fitz.Document":
+        if path not in self._fitz:
+            self._fitz[path] = fitz.open(path)
+        return self._fitz[path]
+
+    def fitz_page(self, path: str, page_index: int):
+        return self.fitz(path).load_page(page_index)
+
+    # -- PyPDF2
+    def pypdf(self, path: str) -> PdfReader:
+        if path not in self._pypdf:
+            self._pypdf[path] = PdfReader(path)
+        return self._pypdf[path]
+
+    def pypdf_page(self, path: str, page_index: int):
+        return self.pypdf(path).pages[page_index]
+
+    def page_count(self, path: str) -> int:
+        return len(self.pypdf(path).pages)
+
+    # -- pdfplumber
+    def plumber(self, path: str) -> "pdfplumber.PDF":
+        if path not in self._plumber:
+            self._plumber[path] = pdfplumber.open(path)
+        return self._plumber[path]
+
+    def plumber_page(self, path: str, page_index: int):
+        return self.plumber(path).pages[page_index]
+
+    # -- pdfminer
+    def miner_page_text(self, path: str, page_index: int) -> str:
+        """
+        Same text pdfminer's extract_text(page_numbers=[i]) returns, served
+        from one streaming pass per document (iter_pdfminer_pages) that is
+        advanced only as far as the highest page asked for so far. Only the
+        pages asked for are laid out, so a worker handed pages 60-61 does
+        not lay out pages 0-59 first. Asking for a page the stream already
+        skipped restarts it. Both extract_text() and the PDFMiner extract
+        read the same result.
+        """
+        state = self._miner.get(path)
+        if state is not None and page_index not in state[2] and page_index < state[3]:
+            self._close_miner(path)
+            state = None
+        if state is None:
+            fh = open(path, "rb")
+            state = self._miner[path] = [fh, iter_pdfminer_pages(fh), {}, 0]  # fh, pages, texts, next index
+        fh, pages, texts, _ = state
+        while page_index not in texts:
+            try:
+                i, layout = next(pages)
+            except StopIteration:
+                raise IndexError(f"{os.path.basename(path)} has no page {page_index+1}")
+            state[3] = i + 1
+            if i == page_index:
+                texts[i] = layout()
+        return texts[page_index]
+
+    def _close_miner(self, path: str):
+        fh, pages, _, _ = self._miner.pop(path)
+        pages.close()
+        fh.close()
+
+    def close(self):
+        for doc in self._fitz.values():
+            doc.close()
+        for pdf in self._plumber.values():
+            pdf.close()
+        for path in list(self._miner):
+            self._close_miner(path)
+        self._fitz.clear()
+        self._pypdf.clear()
+        self._plumber.clear()
+
+
+@contextmanager
+def borrowed(pool: DocumentPool | None):
+    """Use the caller's pool, or a throwaway one closed on exit."""
+    if pool is not None:
+        yield pool
+        return
+    own = DocumentPool()
+    try:
+        yield own
+    finally:
+        own.close()
+
+
+# ── OCR engine
+# tesserocr (when installed) keeps one TessBaseAPI per (lang, oem, psm,
+# variables) resident in the process, so traineddata loads once instead of
+# once per call. Without it every call goes through pytesseract, which
+# spawns a tesseract process and round-trips the image via temp files.
+import shlex
+import threading
+import atexit
+
+OCR_ENGINE = os.environ.get("OCR_ENGINE", "auto").lower()  # auto | tesserocr | pytesseract
+_tesserocr = None            # module once imported, False if unavailable
+_tess_apis: Dict[tuple, tuple] = {}
+_tess_apis_lock = threading.Lock()
+
+
+def parse_tess_config(config: str) -> Tuple[int | None, int | None, Dict[str, str], int | None]:
+    """Split a tesseract CLI config string into (oem, psm, variables, dpi)."""
+    oem = psm = dpi = None
+    variables: Dict[str, str] = {}
+    args = shlex.split(config or "")
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        val = args[i + 1] if i + 1 < len(args) else ""
+        if arg == "--oem":
+            oem, i = int(val), i + 2
+        elif arg == "--psm":
+            psm, i = int(val), i + 2
+        elif arg == "--dpi":
+            dpi, i = int(val), i + 2
+        elif arg == "-c" and "=" in val:
+            k, v = val.split("=", 1)
+            variables[k] = v
+            i += 2
+        else:
+            i += 1
+    return oem, psm, variables, dpi
+
+
+def _load_tesserocr():
+    """Import tesserocr lazily so pool workers set OMP_THREAD_LIMIT first."""
+    global _tesserocr
+    if _tesserocr is None:
+        if OCR_ENGINE == "pytesseract":
+            _tesserocr = False
+        else:
+            try:
+                import tesserocr
+                _tesserocr = tesserocr
+            except ImportError:
+                _tesserocr = False
+    return _tesserocr or None
+
+
+def _tess_api(lang: str, oem: int | None, psm: int | None, variables: Dict[str, str]):
+    """Resident (api, lock) for these settings, or None to fall back to pytesseract."""
+    global _tesserocr
+    mod = _load_tesserocr()
+    if mod is None:
+        return None
+    key = (lang, oem, psm, tuple(sorted(variables.items())))
+    with _tess_apis_lock:
+        if key not in _tess_apis:
+            kwargs = {"lang": lang, "variables": dict(variables)}
+            if oem is not None:
+                kwargs["oem"] = oem
+            if psm is not None:
+                kwargs["psm"] = psm
+            try:
+                _tess_apis[key] = (mod.PyTessBaseAPI(**kwargs), threading.Lock())
+            except Exception as e:  # missing tessdata etc.
+                print(f"[WARN] tesserocr init failed, using pytesseract: {e}", file=sys.stderr)
+                _tesserocr = False
+                return None
+        return _tess_apis[key]
+
+
+def ocr_image_to_string(img: Image.Image, lang: str = "eng", config: str = "") -> str:
+    """Drop-in for pytesseract.image_to_string."""
+    oem, psm, variables, dpi = parse_tess_config(config)
+    resident = _tess_api(lang, oem, psm, variables)
+    if resident is None:
+        return pytesseract.image_to_string(img, lang=lang, config=config)
+    api, lock = resident
+    with lock:
+        api.SetImage(img)
+        if dpi:
+            api.SetSourceResolution(dpi)
+        return api.GetUTF8Text()
+
+
+def tsv_words(tsv: str, width: int, height: int) -> List[list]:
+    """
+    Word rows of tesseract TSV output (image_to_data) as
+    [text, x0, y0, x1, y1, conf, line_id], coordinates as fractions of the
+    image size and line_id unique per (block, paragraph, line).
+    """
+    words = []
+    for line in tsv.splitlines()[1:]:
+        cols = line.split("\t")
+        if len(cols) != 12 or cols[0] != "5" or not cols[11].strip():
+            continue
+        block, par, ln = int(cols[2]), int(cols[3]), int(cols[4])
+        left, top, w, h = (int(c) for c in cols[6:10])
+        words.append([cols[11], left / width, top / height, (left + w) / width, (top + h) / height,
+                      float(cols[10]), (block * 1000 + par) * 1000 + ln])
+    return words
+
+
+def mean_word_confidence(words: List[list]) -> float:
+    """Mean tesseract confidence (0-100) of the words, -1 without any."""
+    confs = [w[5] for w in words if w[5] >= 0]
+    return sum(confs) / len(confs) if confs else -1.0
+
+
+def ocr_image_to_data(img: Image.Image, lang: str = "eng", config: str = "") -> Tuple[str, List[list]]:
+    """
+    ocr_image_to_string() plus the image_to_data words (see tsv_words)
+    from one recognition pass.
+    """
+    oem, psm, variables, dpi = parse_tess_config(config)
+    resident = _tess_api(lang, oem, psm, variables)
+    if resident is None:
+        # one tesseract run writing both outputs (run_and_get_multiple_output takes no config)
+        tess = pytesseract.pytesseract
+        with tess.save(img) as (base, input_filename):
+            tess.run_tesseract(input_filename, base, "txt", lang, f"-c tessedit_create_tsv=1 {config}")
+            with open(f"{base}.txt", encoding="utf-8") as fh:
+                text = fh.read()
+            with open(f"{base}.tsv", encoding="utf-8") as fh:
+                tsv = fh.read()
+    else:
+        api, lock = resident
+        with lock:
+            api.SetImage(img)
+            if dpi:
+                api.SetSourceResolution(dpi)
+            text = api.GetUTF8Text()
+            tsv = "header\n" + api.GetTSVText(0)
+    return text, tsv_words(tsv, *img.size)
+
+
+def ocr_image_to_osd(img: Image.Image, config: str = "") -> Dict:
+    """Drop-in for pytesseract.image_to_osd(..., output_type=DICT)."""
+    _, _, variables, dpi = parse_tess_config(config)
+    resident = _tess_api("eng", None, 0, variables)  # PSM 0 = OSD only
+    if resident is None:
+        return pytesseract.image_to_osd(img, config=config, output_type=pytesseract.Output.DICT)
+    api, lock = resident
+    with lock:
+        api.SetImage(img)
+        if dpi:
+            api.SetSourceResolution(dpi)
+        osd = api.DetectOrientationScript()
+    if not osd:
+        raise RuntimeError("OSD failed (too few characters)")
+    orientation = int(osd["orient_deg"])
+    return {
+        "orientation": orientation,
+        "rotate": (360 - orientation) % 360,  # same as tesseract's "Rotate:" line
+        "orientation_conf": osd["orient_conf"],
+        "script": osd["script_name"],
+        "script_conf": osd["script_conf"],
+    }
+
+
+def reset_ocr_engine():
+    """Drop resident APIs (inherited copies in forked workers, or at exit)."""
+    with _tess_apis_lock:
+        for api, _ in _tess_apis.values():
+            try:
+                api.End()
+            except Exception:
+                pass
+        _tess_apis.clear()
+
+
+atexit.register(reset_ocr_engine)
+
+
+# ── Vectorised preprocessing (NumPy)
+# Point operations are folded into one 256-entry LUT computed from the page
+# histogram, so each chain costs a single pass over the pixels. The maths
+# mirrors ImageOps.autocontrast / ImageEnhance exactly (float32 blend,
+# truncation, clip), so the output is bit-identical to the chained version.
+import numpy as np
+
+_LEVELS = np.arange(256, dtype=np.int64)
+
+def gray_histogram(img: Image.Image) -> np.ndarray:
+    """256-bin histogram of an "L" image."""
+    return np.asarray(img.histogram()[:256], dtype=np.int64)
+
+def _cut_histogram(h: np.ndarray, cut: int) -> np.ndarray:
+    """Remove `cut` pixels from the low end of a histogram."""
+    csum = np.cumsum(h)
+    k = int(np.searchsorted(csum, cut))
+    if k >= len(h):
+        return np.zeros_like(h)
+    h = h.copy()
+    h[:k] = 0
+    h[k] -= cut - (csum[k - 1] if k else 0)
+    return h
+
+def autocontrast_lut(hist: np.ndarray, cutoff: float = 0) -> np.ndarray:
+    """LUT equivalent of ImageOps.autocontrast(img, cutoff)."""
+    h = hist.copy()
+    if cutoff:
+        n = int(h.sum())
+        cut = int(n * cutoff // 100)
+        h = _cut_histogram(h, cut)
+        h = _cut_histogram(h[::-1], cut)[::-1]
+    nz = np.flatnonzero(h)
+    if len(nz) == 0 or nz[-1] <= nz[0]:
+        return _LEVELS.copy()
+    lo, hi = int(nz[0]), int(nz[-1])
+    scale = 255.0 / (hi - lo)
+    return np.clip(np.trunc(_LEVELS * scale - lo * scale), 0, 255).astype(np.int64)
+
+def _blend_lut(base, lut: np.ndarray, factor: float) -> np.ndarray:
+    """Image.blend(solid(base), img, factor) applied to a LUT."""
+    base = np.float32(base)
+    temp = base + np.float32(factor) * (lut.astype(np.float32) - base)
+    return np.clip(np.trunc(temp), 0, 255).astype(np.int64)
+
+def brightness_lut(lut: np.ndarray, factor: float) -> np.ndarray:
+    """Compose ImageEnhance.Brightness(factor) after `lut`."""
+    return _blend_lut(0, lut, factor)
+
+def contrast_lut(lut: np.ndarray, hist: np.ndarray, factor: float) -> np.ndarray:
+    """Compose ImageEnhance.Contrast(factor) after `lut`; mean comes from the remapped histogram."""
+    remapped = np.bincount(lut, weights=hist, minlength=256)
+    total = remapped.sum()
+    mean = int((remapped * _LEVELS).sum() / total + 0.5) if total else 0
+    return _blend_lut(mean, lut, factor)
+
+def apply_lut(img: Image.Image, lut: np.ndarray, mode: str | None = None) -> Image.Image:
+    return img.point(lut.tolist(), mode) if mode else img.point(lut.tolist())
+
+def white_ratio(hist: np.ndarray, cutoff: int) -> float:
+    """Share of pixels that a `cutoff` threshold turns white."""
+    total = hist.sum()
+    return float(hist[cutoff:].sum() / total) if total else 0.0
+
+def threshold_lut(cutoff: int) -> np.ndarray:
+    return np.where(_LEVELS < cutoff, 0, 255)
+
+# ── Page orientation
+# Cheap signals first (PDF /Rotate, text-layer direction, aspect ratio);
+# Tesseract OSD only runs on ambiguous scanned pages, on a small thumbnail.
+OSD_DPI = 100
+ORIENTATION_MIN_CHARS = 200
+_DIR_TO_ANGLE = {(1, 0): 0, (0, -1): 90, (-1, 0): 180, (0, 1): 270}
+_orientation_cache: Dict[tuple, int] = {}
+
+def text_layer_angle(page) -> Tuple[int | None, int]:
+    """Dominant writing direction of the text layer as (clockwise fix, chars)."""
+    votes = Counter()
+    for block in page.get_text("dict", flags=fitz.TEXTFLAGS_TEXT).get("blocks", []):
+        for line in block.get("lines", []):
+            dx, dy = line.get("dir", (1, 0))
+            angle = _DIR_TO_ANGLE.get((round(dx), round(dy)))
+            if angle is None:
+                continue
+            votes[angle] += sum(len(span.get("text", "").strip()) for span in line.get("spans", []))
+    if not votes:
+        return None, 0
+    return votes.most_common(1)[0][0], sum(votes.values())
+
+def pixmap_to_image(pix) -> Image.Image:
+    """Wrap a fitz pixmap's samples in a PIL image, no PNG encode/decode."""
+    mode = {1: "L", 3: "RGB", 4: "RGBA"}[pix.n]
+    return Image.frombuffer(mode, (pix.width, pix.height), pix.samples, "raw", mode, pix.stride, 1)
+
+def osd_angle(page, rotation: int) -> int:
+    """Tesseract OSD on a ~100 DPI thumbnail of the de-rotated page."""
+    zoom = OSD_DPI / 72
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom).prerotate(-rotation), colorspace=fitz.csGRAY, alpha=False)
+    thumb = pixmap_to_image(pix)
+    osd = ocr_image_to_osd(thumb, config=f"--dpi {OSD_DPI}")
+    return int(osd.get("rotate", 0))
+
+def page_orientation(page, path: str, page_index: int) -> int:
+    """
+    Extra clockwise rotation a page needs after its /Rotate is applied.
+    A solid text layer decides on its own; a thin one is trusted only for
+    upright portrait pages. Everything else falls back to OSD. Cached per page.
+    """
+    rotation = int(page.rotation or 0)
+    key = (path, page_index, rotation)
+    if key in _orientation_cache:
+        return _orientation_cache[key]
+
+    angle, chars = text_layer_angle(page)
+    # renders undo /Rotate (prerotate(-rotation)), so the image has the
+    # unrotated cropbox's shape, not page.rect's
+    box = page.cropbox
+    landscape = box.width > box.height
+    if angle is None or (chars < ORIENTATION_MIN_CHARS and (angle != 0 or landscape)):
+        try:
+            angle = osd_angle(page, rotation)
+        except Exception as e:
+            print(f"[WARN] Tesseract OSD rotation failed on page {page_index+1}: {e}", file=sys.stderr)
+            angle = 0
+
+    _orientation_cache[key] = angle
+    return angle
+
+def pdf_page_to_image(path: str, page_index: int, dpi: int = 300, pool: DocumentPool | None = None,
+                      min_width: int = 2000) -> Image.Image:
     """
     Convert a PDF page to a preprocessed PIL image optimized for OCR.
     Adds automatic rotation correction for 0°, 90°, 180°, 270° pages.
     Steps (no OpenCV):
       - Detect & fix PDF metadata rotation
-      - OCR-based auto-rotation (Tesseract OSD)
-      - High DPI render
-      - Convert to grayscale
+      - Auto-rotation from the text layer, OSD thumbnail only if ambiguous
+      - High DPI render straight to grayscale
       - Auto-contrast & brightness boost
       - Sharpen twice
       - Adaptive dual-thresholding (light & dark)
-      - Rescale small text images
+      - Rescale images narrower than `min_width` (0 keeps the render size)
     """
-    doc = fitz.open(path)
-    page = doc.load_page(page_index)
+    return prepare_ocr_image(render_upright_page(path, page_index, dpi, pool), min_width)
 
-    # 🧭 Step 1: Correct rotation using PDF metadata
-    rotation = int(page.rotation or 0)
-    zoom = dpi / 72
-    mat = fitz.Matrix(zoom, zoom).prerotate(-rotation)
 
-    pix = page.get_pixmap(matrix=mat, alpha=False)
+def render_upright_page(path: str, page_index: int, dpi: int = 300,
+                        pool: DocumentPool | None = None) -> Image.Image:
+    """Grayscale render of a page with metadata rotation and auto-rotation applied, not yet enhanced."""
+    with borrowed(pool) as docs:
+        page = docs.fitz_page(path, page_index)
 
-    # Convert to RGB image
-    try:
-        img = Image.open(io.BytesIO(pix.tobytes("png"))).convert("RGB")
-    except Image.DecompressionBombError:
-        logger.warning(f"⚠️ Skipping OCR: page too large in {path} p{page_index+1}")
-        doc.close()
-        return Image.new("L", (100, 100), color=255)
+        # 🧭 Step 1: Correct rotation using PDF metadata
+        rotation = int(page.rotation or 0)
+        zoom = dpi / 72
+        mat = fitz.Matrix(zoom, zoom).prerotate(-rotation)
 
-    # 🧠 Step 2: OCR-based auto-rotation (for scanned sideways pages)
-    try:
-        osd = pytesseract.image_to_osd(img, output_type=pytesseract.Output.DICT)
-        angle = osd.get("rotate", 0)
-        if angle != 0:
-            print(f"[Rotation Fix] Auto-rotating page {page_index+1} by {angle}°")
-            img = img.rotate(-angle, expand=True)
-    except Exception as e:
-        print(f"[WARN] Tesseract OSD rotation failed on page {page_index+1}: {e}")
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+
+        # 🧠 Step 2: orientation from cheap signals, OSD thumbnail if ambiguous
+        angle = page_orientation(page, path, page_index)
+
+    img = pixmap_to_image(pix)
+    del pix
+
+    if angle != 0:
+        print(f"[Rotation Fix] Auto-rotating page {page_index+1} by {angle}°")
+        img = img.rotate(-angle, expand=True)
+    return img
 
-    doc.close()
 
-    # 🖼 Step 3: Continue your original preprocessing
-    img = img.convert("L")  # grayscale
-    img = ImageOps.autocontrast(img)
-    img = ImageEnhance.Brightness(img).enhance(1.2)
-    img = ImageEnhance.Contrast(img).enhance(1.5)
+def prepare_ocr_image(img: Image.Image, min_width: int = 2000) -> Image.Image:
+    """
+    pdf_page_to_image()'s enhancement of an upright grayscale render (or a
+    crop of one): contrast/brightness, sharpening, upscaling below
+    `min_width` pixels and dual thresholding.
+    """
+    # autocontrast → brightness 1.2 → contrast 1.5 as one LUT pass
+    hist = gray_histogram(img)
+    lut = brightness_lut(autocontrast_lut(hist), 1.2)
+    img = apply_lut(img, contrast_lut(lut, hist, 1.5))
     img = img.filter(ImageFilter.SHARPEN)
     img = img.filter(ImageFilter.UnsharpMask(radius=1, percent=150, threshold=3))
 
     # Rescale if small
     w, h = img.size
-    if w < 2000:
-        scale = 2000 / w
+    if w < min_width:
+        scale = min_width / w
         img = img.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
 
-    # Dual thresholding
-    def threshold(im, cutoff):
-        return im.point(lambda x: 0 if x < cutoff else 255, "1")
-
-    light = threshold(img, 160)
-    dark = threshold(img, 200)
-    black_ratio_light = sum(light.getdata()) / (255 * light.size[0] * light.size[1])
-    black_ratio_dark = sum(dark.getdata()) / (255 * dark.size[0] * dark.size[1])
-    img_final = light if black_ratio_light < black_ratio_dark else dark
+    # Dual thresholding: pick the cutoff from the histogram, binarise once
+    hist = gray_histogram(img)
+    black_ratio_light = white_ratio(hist, 160)
+    black_ratio_dark = white_ratio(hist, 200)
+    cutoff = 160 if black_ratio_light < black_ratio_dark else 200
+    img_final = apply_lut(img, threshold_lut(cutoff), "1")
 
     return img_final
 
 
-def preprocess_old_safe(img: Image.Image) -> Image.Image:
+def preprocess_old_safe(img: Image.Image, min_width: int = 1800) -> Image.Image:
     """
     Gentle, safe OCR preprocessing that improves clarity
     WITHOUT breaking W-2 text.
@@ -179,74 +640,382 @@ def preprocess_old_safe(img: Image.Image) -> Image.Image:
     img = img.convert("L")
 
     # 2. Light auto-contrast (safe)
-    img = ImageOps.autocontrast(img, cutoff=1)
+    img = apply_lut(img, autocontrast_lut(gray_histogram(img), cutoff=1))
 
     # 3. Slight sharpness boost
     img = ImageEnhance.Sharpness(img).enhance(1.2)
 
-    # 4. Light contrast/brightness (safe)
-    img = ImageEnhance.Contrast(img).enhance(1.15)
-    img = ImageEnhance.Brightness(img).enhance(1.05)
+    # 4. Light contrast/brightness (safe), fused into one LUT
+    lut = brightness_lut(contrast_lut(_LEVELS, gray_histogram(img), 1.15), 1.05)
+    img = apply_lut(img, lut)
 
     # 5. Light noise reduction
     img = img.filter(ImageFilter.MedianFilter(size=3))
 
     # 6. Upscale if image is small
     w, h = img.size
-    if w < 1800:
-        scale = 1800 / w
+    if w < min_width:
+        scale = min_width / w
         img = img.resize((int(w * scale), int(h * scale)), Image.LANCZOS)
 
     return img
 
-def extract_text(path: str, page_index: int) -> str:
-    text = ""
-    # OCR fallback
-    if len(text.strip()) < OCR_MIN_CHARS:
-        try:
-        # 🔹 Use only 300 DPI for sharper OCR
-            dpi = 300
-            img = pdf_page_to_image(path, page_index, dpi=300)
 
-# NEW safe preprocessing
-            img = preprocess_old_safe(img)
+def ocr_input_image(img: Image.Image, min_width: int = 2000) -> Image.Image:
+    """
+    The one preprocessing chain for OCR input, full pages and layout boxes
+    alike: prepare_ocr_image() then preprocess_old_safe(), both upscaling
+    below `min_width` pixels (0 keeps the size).
+    """
+    return preprocess_old_safe(prepare_ocr_image(img, min_width), min_width)
+
+# ── Form layouts (region-of-interest OCR)
+# Where the boxes the bookmark extractors read sit on the standard IRS copy
+# layouts, as (x0, y0, x1, y1) fractions of the upright page with the form
+# printed at the top. Boxes are padded generously since broker-printed
+# copies drift by a few percent. On scanned pages these boxes are re-OCR'd
+# at ROI_DPI once the page is classified, instead of trusting the full-page
+# OCR for payer / employer names.
+ROI_DPI = int(os.environ.get("ROI_DPI", "400"))
+
+_PAYER_BOX = (0.02, 0.02, 0.56, 0.24)           # PAYER'S / FILER'S / TRUSTEE'S / LENDER'S name
+_RECIPIENT_TIN_BOX = (0.02, 0.16, 0.56, 0.30)   # PAYER'S TIN | RECIPIENT'S TIN row
+_FORM_ACCOUNT_BOX = (0.02, 0.30, 0.56, 0.46)    # "Account number (see instructions)"
+
+_1099_LAYOUT = {"title": _PAYER_BOX, "ssn": _RECIPIENT_TIN_BOX, "account": _FORM_ACCOUNT_BOX}
+FORM_LAYOUTS = {
+    "W-2": {
+        "ssn": (0.02, 0.02, 0.56, 0.09),        # a Employee's social security number
+        "title": (0.02, 0.06, 0.56, 0.30),      # c Employer's name, address, and ZIP code
+    },
+    "1099-INT": _1099_LAYOUT,
+    "1099-DIV": _1099_LAYOUT,
+    "1099-R": _1099_LAYOUT,
+    "1099-SA": _1099_LAYOUT,
+    "1098-Mortgage": _1099_LAYOUT,
+    "5498-SA": _1099_LAYOUT,
+    "1098-T": _1099_LAYOUT,
+}
+
 
-            t_ocr = pytesseract.image_to_string(
-                img,
-                lang="eng",
-                config="--oem 3 --psm 6 -c preserve_interword_spaces=1"
-            )
+def page_region_image(path: str, page_index: int, box: Tuple[float, float, float, float],
+                      dpi: int = ROI_DPI, pool: DocumentPool | None = None) -> Image.Image:
+    """
+    Render one layout box of a page, upright and OCR-ready. Upright pages
+    render only the clip; rotated ones render whole and are cropped after
+    the orientation fix so the box fractions still apply.
+    """
+    x0, y0, x1, y1 = box
+    with borrowed(pool) as docs:
+        page = docs.fitz_page(path, page_index)
+        rotation = int(page.rotation or 0)
+        angle = page_orientation(page, path, page_index)
+        mat = fitz.Matrix(dpi / 72, dpi / 72).prerotate(-rotation)
+        if rotation == 0 and angle == 0:
+            r = page.rect
+            clip = fitz.Rect(r.x0 + x0 * r.width, r.y0 + y0 * r.height,
+                             r.x0 + x1 * r.width, r.y0 + y1 * r.height)
+            img = pixmap_to_image(page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False, clip=clip))
+        else:
+            img = pixmap_to_image(page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False))
+            if angle != 0:
+                img = img.rotate(-angle, expand=True)
+            w, h = img.size
+            img = img.crop((int(x0 * w), int(y0 * h), int(x1 * w), int(y1 * h)))
+    return ocr_input_image(img, min_width=0)
+
+
+def ocr_page_region(path: str, page_index: int, form: str, box_name: str,
+                    pool: DocumentPool | None = None) -> str:
+    """OCR text of FORM_LAYOUTS[form][box_name] on a page; "" when the form has no such box."""
+    box = FORM_LAYOUTS.get(form, {}).get(box_name)
+    if box is None:
+        return ""
+    try:
+        img = page_region_image(path, page_index, box, ROI_DPI, pool)
+        text = ocr_image_to_string(img, lang="eng", config="--oem 3 --psm 6 -c preserve_interword_spaces=1")
+    except Exception as e:
+        print(f"[ROI] {os.path.basename(path)} p{page_index+1} {form}/{box_name} failed: {e}", file=sys.stderr)
+        return ""
+    print(f"[ROI] {os.path.basename(path)} p{page_index+1} {form}/{box_name} @{ROI_DPI}dpi\n{text}", file=sys.stderr)
+    return text
 
+# ── Page layout model (words with boxes)
+# Extractors historically re-split flat text and walked neighbouring lines
+# to guess which text sits in which box. A PageLayout keeps the words of a
+# page with their boxes instead, from the OCR pass's image_to_data output or
+# the PDF text layer, so "the text below this caption" is a lookup.
+_LAYOUT_NORM_RE = re.compile(r"\s+")
 
-            print(f"[OCR dpi={dpi}]\n{t_ocr}", file=sys.stderr)
 
-            if len(t_ocr.strip()) > len(text):
-                text = t_ocr
+def _layout_norm(s: str) -> str:
+    return _LAYOUT_NORM_RE.sub(" ", s.lower().replace("’", "'")).strip()
 
-        except Exception:
-            traceback.print_exc()
 
-    # PDFMiner
+class PageLayout:
+    """
+    Words of one page as [text, x0, y0, x1, y1, conf, line_id] with
+    coordinates as fractions of the page, grouped into lines once.
+    """
+
+    def __init__(self, words: List[list]):
+        self.words = words
+        by_line: Dict[int, list] = defaultdict(list)
+        for w in words:
+            by_line[w[6]].append(w)
+        self.lines = sorted(
+            (sorted(ws, key=lambda w: w[1]) for ws in by_line.values()),
+            key=lambda ws: (min(w[2] for w in ws), ws[0][1]),
+        )
+
+    @classmethod
+    def from_fitz(cls, page) -> "PageLayout":
+        """Layout of a digital page from its text layer (confidence 100)."""
+        r = page.rect
+        words = [
+            [text, (x0 - r.x0) / r.width, (y0 - r.y0) / r.height, (x1 - r.x0) / r.width, (y1 - r.y0) / r.height,
+             100.0, block * 10000 + line]
+            for x0, y0, x1, y1, text, block, line, _ in page.get_text("words")
+        ]
+        return cls(words)
+
+    def find(self, label: str):
+        """(line, first word, last word) of the first occurrence of `label`, or None."""
+        label = _layout_norm(label)
+        for ws in self.lines:
+            norms = [_layout_norm(w[0]) for w in ws]
+            joined, starts = "", []
+            for n in norms:
+                starts.append(len(joined))
+                joined += n + " "
+            pos = joined.find(label)
+            if pos < 0:
+                continue
+            end = pos + len(label)
+            first = max(k for k, st in enumerate(starts) if st <= pos)
+            last = max(k for k, st in enumerate(starts) if st < end)
+            return ws, first, last
+        return None
+
+    def text_below(self, label: str, max_lines: int = 3, tolerance: float = 0.02) -> List[str]:
+        """
+        Up to `max_lines` lines of text under `label`, restricted to its
+        column: from the caption's left edge to the next word to its right
+        in the same row (the neighbouring box's caption), or the page edge.
+        """
+        hit = self.find(label)
+        if hit is None:
+            return []
+        ws, first, last = hit
+        left = ws[first][1] - tolerance
+        top = min(w[2] for w in ws[first:last + 1])
+        bottom = max(w[4] for w in ws[first:last + 1])
+        caption_end = ws[last][3]
+        right = min((w[1] for w in self.words
+                     if w[1] > caption_end and top <= (w[2] + w[4]) / 2 <= bottom), default=1.0 + tolerance)
+        right -= tolerance
+        below = []
+        for line in self.lines:
+            if (min(w[2] for w in line) + max(w[4] for w in line)) / 2 <= bottom:
+                continue  # the caption's own row or above
+            inside = [w[0] for w in line if left <= (w[1] + w[3]) / 2 <= right]
+            if inside:
+                below.append(" ".join(inside))
+                if len(below) == max_lines:
+                    break
+        return below
+
+
+# Caption of each form's title box (FORM_LAYOUTS "title"), most specific first
+TITLE_LABELS = {
+    "W-2": ("employer's name, address, and zip code", "employer's name, address and zip code", "employer's name"),
+    "1099-INT": ("payer's name",),
+    "1099-DIV": ("payer's name",),
+    "1099-R": ("payer's name",),
+    "1099-SA": ("trustee's/payer's name", "payer's name", "trustee's name"),
+    "1098-Mortgage": ("recipient's/lender's name", "lender's name", "recipient's name"),
+    "5498-SA": ("trustee's name",),
+    "1098-T": ("filer's name",),
+}
+
+
+def layout_title_text(layout: PageLayout, form: str) -> str:
+    """The form's title caption and the lines below it, as text the bookmark extractors read."""
+    for label in TITLE_LABELS.get(form, ()):
+        below = layout.text_below(label)
+        if below:
+            hit = layout.find(label)
+            caption = " ".join(w[0] for w in hit[0][hit[1]:hit[2] + 1])
+            return "\n".join([caption, *below])
+    return ""
+
+# ── Text-layer-first extraction
+TEXT_LAYER_FIRST = os.environ.get("TEXT_LAYER_FIRST", "1") != "0"
+TEXT_LAYER_MIN_SCORE = float(os.environ.get("TEXT_LAYER_MIN_SCORE", "0.5"))
+# Adaptive OCR resolution: pages are OCR'd at OCR_BASE_DPI (no upscaling)
+# and re-OCR'd at OCR_MAX_DPI only when the mean word confidence is below
+# OCR_MIN_CONFIDENCE or the result scores like a poor text layer. The DPI
+# used is kept in the page record ("dpi", "ocr_conf") for tuning.
+OCR_BASE_DPI = int(os.environ.get("OCR_BASE_DPI", "150"))
+OCR_MAX_DPI = int(os.environ.get("OCR_MAX_DPI", "300"))
+OCR_MIN_CONFIDENCE = float(os.environ.get("OCR_MIN_CONFIDENCE", "70"))
+OCR_CONFIG = "--oem 3 --psm 6 -c preserve_interword_spaces=1"
+FORM_ANCHOR_RE = re.compile(
+    r"form\s*(?:1099|1098|5498|1095|w-?2)|wage and tax statement|schedule k-1"
+    r"|consolidated\s+(?:tax\s+)?(?:statement|1099)|1099-(?:int|div|b|r|sa|misc|oid|g)",
+    re.IGNORECASE,
+)
+
+
+def score_text_layer(text: str) -> float:
+    """
+    Score an embedded text layer between 0 and 1.
+    Combines the amount of text (full marks at 400 chars), the share of
+    printable characters (broken font maps show up as (cid:NN) or U+FFFD)
+    and whether a tax-form anchor such as "Form 1099" is present.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return 0.0
+    n = len(stripped)
+    printable = sum(1 for c in stripped if c.isprintable() or c in "\n\t") / n
+    garbage = (stripped.count("(cid:") * 6 + stripped.count("\ufffd")) / n
+    printable = max(0.0, printable - garbage)
+    length = min(1.0, n / 400)
+    anchor = 1.0 if FORM_ANCHOR_RE.search(stripped) else 0.0
+    return round(printable * (0.7 * length + 0.3 * anchor), 3)
+
+
+def extract_text_tiered(path: str, page_index: int, pool: DocumentPool | None = None) -> Dict[str, object]:
+    """
+    Text-layer-first extraction. The pdfminer / fitz text layer is read
+    and scored; Tesseract runs only when the score is below
+    TEXT_LAYER_MIN_SCORE (scanned pages, broken font maps). Returns
+    {"text", "score", "ocr", "source"} so the decision is kept per page.
+    """
+    text = ""
+    layer, source = "", "none"
+
+    # Text layer: PDFMiner, or PyMuPDF when it recovers more
     try:
-        t1 = pdfminer_extract(path, page_numbers=[page_index], laparams=PDFMINER_LA_PARAMS) or ""
+        with borrowed(pool) as docs:
+            t1 = docs.miner_page_text(path, page_index) or ""
         t1 = t1.strip()
         print(f"[PDFMiner full] {len(t1)} chars\n{t1}", file=sys.stderr)
-        if len(t1) > len(text.strip()):
-            text = t1
+        layer, source = t1, "pdfminer"
+    except Exception:
+        traceback.print_exc()
+    try:
+        with borrowed(pool) as docs:
+            t_fitz = docs.fitz_page(path, page_index).get_text().strip()
+        if len(t_fitz) > len(layer):
+            layer, source = t_fitz, "fitz"
     except Exception:
         traceback.print_exc()
 
+    score = score_text_layer(layer)
+    use_ocr = not TEXT_LAYER_FIRST or score < TEXT_LAYER_MIN_SCORE
+    print(
+        f"[TextLayer] {os.path.basename(path)} p{page_index+1} score={score:.2f} "
+        f"→ {'OCR' if use_ocr else 'text layer, OCR skipped'}",
+        file=sys.stderr,
+    )
+
+    dpi, conf, words = None, None, None
+    if not use_ocr:
+        text = layer
+    else:
+        try:
+            dpi = OCR_BASE_DPI
+            t_ocr, ocr_words = ocr_page_at(path, page_index, dpi, pool)
+            conf = mean_word_confidence(ocr_words)
+            if dpi < OCR_MAX_DPI and (conf < OCR_MIN_CONFIDENCE or score_text_layer(t_ocr) < TEXT_LAYER_MIN_SCORE):
+                print(f"[OCR dpi={dpi}] conf={conf:.0f} → escalating to {OCR_MAX_DPI} DPI", file=sys.stderr)
+                dpi = OCR_MAX_DPI
+                t_ocr, ocr_words = ocr_page_at(path, page_index, dpi, pool)
+                conf = mean_word_confidence(ocr_words)
+
+            print(f"[OCR dpi={dpi}] conf={conf:.0f}\n{t_ocr}", file=sys.stderr)
+
+            if len(t_ocr.strip()) > len(text):
+                text, words = t_ocr, ocr_words
+
+        except Exception:
+            traceback.print_exc()
+
+        if len(layer) > len(text.strip()):
+            text = layer
+        elif text:
+            source = "ocr"
+
     # PyPDF2 fallback
     if len(text.strip()) < OCR_MIN_CHARS:
         try:
-            reader = PdfReader(path)
-            t2 = reader.pages[page_index].extract_text() or ""
+            with borrowed(pool) as docs:
+                t2 = docs.pypdf_page(path, page_index).extract_text() or ""
             print(f"[PyPDF2 full]\n{t2}", file=sys.stderr)
-            if len(t2.strip()) > len(text): text = t2
+            if len(t2.strip()) > len(text):
+                text = t2
+                source = "pypdf2"
         except Exception:
             traceback.print_exc()
-   
-    return text
+
+    if source != "ocr":
+        words = None  # the layout comes from the text layer (PageLayout.from_fitz)
+    return {"text": text, "score": score, "ocr": use_ocr, "source": source, "dpi": dpi, "ocr_conf": conf,
+            "words": words}
+
+
+def ocr_page_at(path: str, page_index: int, dpi: int, pool: DocumentPool | None = None) -> Tuple[str, List[list]]:
+    """
+    OCR a page rendered at `dpi`; returns (text, words) as
+    ocr_image_to_data() does. Renders at OCR_MAX_DPI keep the usual
+    upscaling; lower ones are OCR'd at their own size, which is where the
+    pixel saving comes from.
+    """
+    img = render_upright_page(path, page_index, dpi, pool)
+    if dpi >= OCR_MAX_DPI:
+        return ocr_image_to_data(ocr_input_image(img), lang="eng", config=OCR_CONFIG)
+    return ocr_image_to_data(ocr_input_image(img, min_width=0), lang="eng", config=f"{OCR_CONFIG} --dpi {dpi}")
+
+
+def extract_text(path: str, page_index: int, pool: DocumentPool | None = None) -> str:
+    return extract_text_tiered(path, page_index, pool)["text"]
+
+
+# Boilerplate gate: instruction pages, year-end letters and "Understanding
+# your Form 1099" inserts are recognised from a cheap read of the page and
+# never reach OCR or the multi-method extraction.
+BOILERPLATE_GATE = os.environ.get("BOILERPLATE_GATE", "1") != "0"
+# OCR thumbnail for pages without a usable text layer; 0 = text layer only
+BOILERPLATE_GATE_DPI = int(os.environ.get("BOILERPLATE_GATE_DPI", "0"))
+
+
+def quick_page_text(path: str, page_index: int, pool: DocumentPool | None = None) -> Dict[str, object] | None:
+    """
+    The cheapest usable reading of a page for the boilerplate gate: the
+    PyMuPDF text layer when it scores at least TEXT_LAYER_MIN_SCORE, else
+    a BOILERPLATE_GATE_DPI OCR thumbnail (if enabled). Returns a record
+    shaped like extract_text_tiered()'s, or None.
+    """
+    try:
+        with borrowed(pool) as docs:
+            layer = docs.fitz_page(path, page_index).get_text().strip()
+    except Exception:
+        return None
+    score = score_text_layer(layer)
+    if score >= TEXT_LAYER_MIN_SCORE:
+        return {"text": layer, "score": score, "ocr": False, "source": "gate:fitz"}
+    if BOILERPLATE_GATE_DPI <= 0:
+        return None
+    try:
+        img = pdf_page_to_image(path, page_index, dpi=BOILERPLATE_GATE_DPI, pool=pool)
+        text = ocr_image_to_string(img, lang="eng", config="--oem 3 --psm 6")
+    except Exception:
+        return None
+    if len(text.strip()) < OCR_MIN_CHARS:
+        return None
+    return {"text": text, "score": score, "ocr": True, "source": f"gate:ocr{BOILERPLATE_GATE_DPI}"}
 
 
 # ── OCR for images
@@ -255,7 +1024,7 @@ def extract_text_from_image(file_path: str) -> str:
     try:
         img = Image.open(file_path)
         if img.mode!='RGB': img = img.convert('RGB')
-        et = pytesseract.image_to_string(img)
+        et = ocr_image_to_string(img)
         if et.strip():
             print_phrase_context(et)
             text = f"\n--- OCR Image {os.path.basename(file_path)} ---\n" + et
@@ -264,346 +1033,1252 @@ def extract_text_from_image(file_path: str) -> str:
         logger.error(f"Error OCR image {file_path}: {e}")
         text = f"Error OCR image: {e}"
     return text
-#For rotating pages
-import io
-from PIL import Image
-import pytesseract
-import fitz
-
-def is_unused_page(text: str) -> bool:
-    """
-    Detect pages that are just year-end messages, instructions,
-    or generic investment details (not real 1099 forms).
-    """
-    import re
-    lower = text.lower()
-    # normalize multiple spaces to single
-    norm = re.sub(r"\s+", " ", lower)
-
-    investment_details = re.search(r"\b\d{4}\s+investment details", norm)
-
-    return (
-        "understanding your form 1099" in norm
-        or "year-end messages" in norm
-        or "important: if your etrade account transitioned" in norm
-        or "please visit etrade.com/tax" in norm
-        or "tax forms for robinhood markets" in norm
-        or "robinhood retirements accounts" in norm
-        or "new for 2023 tax year" in norm
-        or "new for 2024 tax year" in norm
-        or "new for 2025 tax year" in norm
-        or "that are necessary for tax" in norm
-        or "please note there may be a slight timing" in norm
-        or "account statement will not have included" in norm
-        #1099-SA
-        or "fees and interest earnings are not considered" in norm
-        or "an hsa distribution" in norm
-        or "death is includible in the account" in norm
-        or "the account as of the date of death" in norm
-        or "amount on the account holder" in norm
-        #1099-Mortgage
-        or "for clients with paid mortgage insurance" in norm
-        or "you can also contact the" in norm
-        #or "" in norm
-        
-       #w2
-       or "for the latest information about developments related to form" in norm
-       or "you and any qualifying children must have valid social security numbers" in norm
-       
-       #w2
-        or "may be requested by the mortgagor" in norm
-       
-        or "you should contact a competent" in norm
-        or "tax lot closed on a first in" in norm
-        or "your form 1099 composite may include the following internal revenue service " in norm
-        or "schwab provides your form 1099 tax information as early" in norm
-        or "if you have any questions or need additional information about your" in norm
-        or "schwab is not providing cost basis" in norm
-        or "the amount displayed in this column has been adjusted for option premiums" in norm
-        or "you may select a different cost basis method for your brokerage" in norm
-        or "to view and change your default cost basis" in norm
-        or "this information is not intended to be a substitue for specific individualized" in norm
-        or "shares will be gifted based on your default cost basis" in norm
-        or "if you sell shares at a loss and buy additional shares" in norm
-        or "we are required to send you a corrected from with the revisions clearly marked" in norm
-        or "referenced to indicate individual items that make up the totals appearing" in norm
-        or "issuers of the securities in your account reallocated certain income distribution" in norm
-        or "the amount shown may be dividends a corporation paid directly" in norm
-        or "if this form includes amounts belonging to another person" in norm
-        or "spouse is not required to file a nominee return to show" in norm
-        or "character when passed through or distributed to its direct or in" in norm
-        or "brokers and barter exchanges must report proceeds from" in norm
-        or "first in first out basis" in norm
-        or "see the instructions for your schedule d" in norm
-        or "other property received in a reportable change in control or capital" in norm
-        or "enclosed is your" in norm and "consolidated tax statement" in norm
-        or "filing your taxes" in norm and "turbotax" in norm
-        or ("details of" in norm and "investment activity" in norm)
-        or bool(investment_details)
-    )
-
-
-import re
 
 
+# ── Per-method extraction (PDFMiner / Tesseract / pdfplumber / PyMuPDF)
+EXTRACT_METHODS = ("PDFMiner", "Tesseract", "pdfplumber", "PyMuPDF")
 
-import re
 
-def extract_account_number(text: str, page_number: int = None) -> str:
+def extract_method_text(path: str, page_index: int, method: str, pool: DocumentPool | None = None) -> str:
     """
-    Extract and normalize the account number or ORIGINAL number from page text.
-    Handles:
-    - 'Account Number: ####'
-    - 'ORIGINAL: ####'
-    - 'Account ####'
-    - 'Apex Clearing' followed by account number (next line or same line)
-    Automatically consolidates if both detections match.
-    Prints the detected account number per page for debugging.
-    Returns None if not found.
+    Extract one page with a single backend. Used to collect the
+    multi-method extracts that W-2 / 1099 title voting runs over.
     """
+    print(f"→ {'Tesseract OCR' if method == 'Tesseract' else method}:", file=sys.stderr)
+    try:
+        with borrowed(pool) as docs:
+            if method == "PDFMiner":
+                txt = docs.miner_page_text(path, page_index) or ""
+            elif method == "Tesseract":
+                img = pdf_page_to_image(path, page_index, dpi=150, pool=docs)  # ✅ use your PyMuPDF helper
+                txt = ocr_image_to_string(img, config="--psm 6") or ""
+            elif method == "pdfplumber":
+                txt = docs.plumber_page(path, page_index).extract_text() or ""
+            elif method == "PyMuPDF":
+                txt = docs.fitz_page(path, page_index).get_text()
+            else:
+                raise ValueError(f"unknown extraction method {method}")
+        print(txt, file=sys.stderr)
+        return txt
+    except Exception as e:
+        print(f"[ERROR] {method} failed: {e}", file=sys.stderr)
+        return ""
 
-    # --- 1️⃣ Standard patterns ---
-    std_patterns = [
-        r"Account\s*Number[:\s]*([\dA-Za-z\-]+)",
-        r"Account Number:\s*([\dA-Za-z\s]+)",
-        r"Account\s*No\.?[:\s]*([\dA-Za-z\-]+)",   # ✅ added: "Account No." or "Account No"s
-        r"ORIGINAL:\s*([\dA-Za-z\s]+)",
-        r"Account\s+(?!WITH\b)(?=[A-Za-z0-9\-]*\d)([A-Za-z0-9\-]+)",
-
-    ]
-
-    std_account = None
-    for p in std_patterns:
-        m = re.search(p, text, re.IGNORECASE)
-        if m:
-            std_account = m.group(1).replace(" ", "").strip()
-            break
-
-    # --- 2️⃣ Apex Clearing: account on next line ---
-    apex_match = re.search(
-        r"Apex\s+Clearing[^\n\r]*\n\s*([A-Z0-9\-]{4,})",
-        text,
-        re.IGNORECASE
-    )
-    apex_nextline = apex_match.group(1).strip() if apex_match else None
-
-    # --- 3️⃣ Apex Clearing: account on same line ---
-    apex_inline = re.search(
-        r"Apex\s+Clearing[^\n\r]{0,60}?([A-Z0-9\-]{4,})",
-        text,
-        re.IGNORECASE
-    )
-    apex_inline_acc = apex_inline.group(1).strip() if apex_inline else None
-
-    # --- 4️⃣ Combine and normalize ---
-    found = {std_account, apex_nextline, apex_inline_acc}
-    found = {a for a in found if a}  # remove None
 
-    detected_account = None
-    if found:
-        normalized = {a.replace("-", "").upper() for a in found}
-        if len(normalized) == 1:
-            detected_account = list(found)[0]
-        else:
-            detected_account = std_account or apex_nextline or apex_inline_acc
+# ── Per-run page text cache
+import hashlib
+import json
 
-    # --- 5️⃣ Debug output ---
-    if page_number is not None:
-        if detected_account:
-            print(f"✅ Page {page_number} → Account detected: {detected_account}")
-        else:
-            print(f"⚠️ Page {page_number} → No account found")
+# Bump when extract_text / extract_method_text change what they return.
+EXTRACTOR_CONFIG = (f"text-layer={int(TEXT_LAYER_FIRST)}@{TEXT_LAYER_MIN_SCORE:g};"
+                    f"ocr={OCR_BASE_DPI}-{OCR_MAX_DPI}@{OCR_MIN_CONFIDENCE:g};{OCR_CONFIG};"
+                    "methods-ocr=150;--psm 6")
 
-    return detected_account
 
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Hash a file's bytes in fixed-size chunks (never loads it whole)."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-def extract_account_number(text: str, form_type: str = "") -> str | None:
-    lower = text.lower()
 
-    # 🔹 Skip rules: don't extract account numbers for 1098-T, 1098-Mortgage, W-2, etc.
-    if (
-        (form_type and (form_type.startswith("1098") or form_type in ("W-2","5498-SA")))
-        or "form 1098-t" in lower
-        or "tuition statement" in lower
-        or "institution" in lower and "university" in lower
-        or "qualified tuition" in lower
-        or "form 1098 mortgage" in lower
-        or "mortgage interest" in lower
-    ):
-        return None   # 🚫 Skip account number detection
-
-    # 🔹 Otherwise try account number regex patterns
-    for pat in [
-        r"Account\s*Number[:\s]*([\d\-]+)",
-        r"Account Number:\s*([\d\s]+)",
-        r"ORIGINAL:\s*([\d\s]+)",
-        r"Account\s+(\d+)"
-    ]:
-        match = re.search(pat, text, re.IGNORECASE)
-        if match:
-            return match.group(1).replace(" ", "").strip()
+_XREF_RE = re.compile(rb"(\d+)\s+0\s+R")
 
-    return None
 
-# consolidated-1099 forms bookmark
-def has_nonzero_misc(text: str) -> bool:
-    patterns = [
-        r"1\.RENTS\s*\$([0-9,]+\.\d{2})",
-        r"2\.ROYALTIES\s*\$([0-9,]+\.\d{2})",
-        r"3\.OTHER INCOME\s*\$([0-9,]+\.\d{2})",
-        r"4\.FEDERAL INCOME TAX WITHHELD\s*\$([0-9,]+\.\d{2})",
-        r"8\.SUBSTITUTE PAYMENTS.*\$\s*([0-9,]+\.\d{2})",
-    ]
-    return _check_nonzero(patterns, text)
-def has_nonzero_oid(text: str) -> bool:
-    patterns = [
-        r"1\.ORIGINAL ISSUE DISCOUNT.*\$\s*([0-9,]+\.\d{2})",
-        r"2\.OTHER PERIODIC INTEREST.*\$\s*([0-9,]+\.\d{2})",
-        r"4\.FEDERAL INCOME TAX WITHHELD.*\$\s*([0-9,]+\.\d{2})",
-        r"5\.MARKET DISCOUNT.*\$\s*([0-9,]+\.\d{2})",
-        r"6\.ACQUISITION PREMIUM.*\$\s*([0-9,]+\.\d{2})",
-        r"8\.OID ON.*\$\s*([0-9,]+\.\d{2})",
-        r"9\.INVESTMENT EXPENSES.*\$\s*([0-9,]+\.\d{2})",
-        r"10\.BOND PREMIUM.*\$\s*([0-9,]+\.\d{2})",
-        r"11\.TAX-EXEMPT OID.*\$\s*([0-9,]+\.\d{2})",
-    ]
-    return _check_nonzero(patterns, text)
+def _hash_xobjects(doc, resources_xref: int, key: str, h, seen: set):
+    """Feed every XObject under `key` of an object's resources into h, descending into forms."""
+    kind, value = doc.xref_get_key(resources_xref, key)
+    if kind == "xref":
+        kind, value = "dict", doc.xref_object(int(value.split()[0]), compressed=True)
+    if kind != "dict":
+        return
+    for ref in _XREF_RE.findall(value.encode()):
+        xref = int(ref)
+        if xref in seen:
+            continue
+        seen.add(xref)
+        h.update(doc.xref_stream_raw(xref) or b"")
+        if doc.xref_get_key(xref, "Subtype")[1] == "/Form":
+            _hash_xobjects(doc, xref, "Resources/XObject", h, seen)
 
 
-def extract_1099b_section(text: str) -> str:
+def page_content_hash(path: str, page_index: int, pool: DocumentPool | None = None) -> str:
     """
-    Extract only the 1099-B summary table section.
+    Fingerprint a page by what it draws, not by the file it lives in:
+    geometry + rotation, the decompressed content stream, the raw streams
+    of its images / form XObjects (nested ones included), its font
+    definitions, and every annotation's appearance stream plus each form
+    field's name and value. Two fillable W-2s from one template differ
+    only in the last of these. The same W-2 re-uploaded inside a
+    different packet hashes the same.
     """
-    pattern = r"SUMMARY OF PROCEEDS.*?Grand total.*?(?:\n|$)"
-    m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-    return m.group(0) if m else ""
-
-
-def find_nonzero_after(label: str, text: str, window: int = 120) -> bool:
+    with borrowed(pool) as docs:
+        doc = docs.fitz(path)
+        page = doc.load_page(page_index)
+        h = hashlib.blake2b(digest_size=20)
+        h.update(f"{page.rotation}|{tuple(page.rect)}".encode())
+        h.update(page.read_contents() or b"")
+        seen = set()
+        for img in page.get_images(full=True):
+            seen.add(img[0])
+            h.update(doc.xref_stream_raw(img[0]) or b"")
+        _hash_xobjects(doc, page.xref, "Resources/XObject", h, seen)
+        for font in page.get_fonts(full=True):
+            h.update(doc.xref_object(font[0], compressed=True).encode())
+        annots = [(a.xref, f"{a.type[1]}|{tuple(a.rect)}|{a.info.get('content', '')}") for a in page.annots()]
+        annots += [(w.xref, f"{w.field_name}={w.field_value}|{tuple(w.rect)}") for w in page.widgets()]
+        for xref, desc in annots:
+            h.update(desc.encode())
+            kind, ap = doc.xref_get_key(xref, "AP/N")
+            if kind == "xref":
+                h.update(doc.xref_stream_raw(int(ap.split()[0])) or b"")
+        return h.hexdigest()
+
+
+import sqlite3
+import time
+
+
+class OcrDiskCache:
     """
-    Finds the label (e.g. 'Short A', 'Box A', etc.) and scans the next
-    `window` characters for any non-zero numeric value.
-    Works even when OCR breaks the line.
+    SQLite-backed cache of page text that survives across runs/sessions.
+    Keys are (page content hash, extractor config, kind) where kind is
+    "text" for extract_text(), an EXTRACT_METHODS name, or "analysis" for
+    a page's classification and title. Entries are evicted
+    least-recently-used once the stored text exceeds max_bytes, and the
+    whole cache is dropped when OCR_CACHE_VERSION changes. A files table
+    maps each upload's file_digest to its page hashes, so a byte-identical
+    file seen in an earlier session is looked up without opening it.
+    Reads only queue their last_used touch; touches are written with the
+    next put, every TOUCH_BATCH reads or on close(). The stored size is
+    tracked in memory, so the table is only scanned when it is over budget.
     """
-    pattern = re.compile(label, re.IGNORECASE)
 
-    for match in pattern.finditer(text):
-        start = match.end()
-        chunk = text[start:start + window]
-
-        # extract numbers like 42,118.15 or 0.00 or $19,295.46
-        nums = re.findall(r"-?\$?\s*[0-9][\d,]*\.\d{2}", chunk)
+    TOUCH_BATCH = 64
+
+    def __init__(self, directory: str = OCR_CACHE_DIR, max_bytes: int = OCR_CACHE_MAX_MB * 1024 * 1024,
+                 version: int = OCR_CACHE_VERSION):
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        os.chmod(directory, 0o700)
+        self.max_bytes = max_bytes
+        db_path = os.path.join(directory, "pages.sqlite3")
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        os.chmod(db_path, 0o600)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " key TEXT PRIMARY KEY, value TEXT, size INTEGER, last_used REAL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_used)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS files (digest TEXT PRIMARY KEY, pages TEXT, last_used REAL)")
+        row = self.conn.execute("SELECT v FROM meta WHERE k='version'").fetchone()
+        if row is None or row[0] != str(version):
+            logger.info(f"OCR cache version {row[0] if row else None} → {version}, clearing {directory}")
+            self.conn.execute("DELETE FROM pages")
+            self.conn.execute("DELETE FROM files")
+            self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+        self.conn.commit()
+        self.total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self._touched_pages: Dict[str, float] = {}
+        self._touched_files: Dict[str, float] = {}
+
+    @staticmethod
+    def make_key(page_hash: str, config: str, kind: str) -> str:
+        return f"{page_hash}|{config}|{kind}"
+
+    def get(self, key: str) -> str | None:
+        row = self.conn.execute("SELECT value FROM pages WHERE key=?", (key,)).fetchone()
+        if row is None:
+            return None
+        self._touch(self._touched_pages, key)
+        return row[0]
+
+    def put(self, key: str, value: str):
+        size = len(value.encode("utf-8", errors="ignore"))
+        old = self.conn.execute("SELECT size FROM pages WHERE key=?", (key,)).fetchone()
+        self.conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (key, value, size, time.time()))
+        self._touched_pages.pop(key, None)
+        self.total += size - (old[0] if old else 0)
+        self.flush()
+        if self.total > self.max_bytes:
+            self.evict()
+        self.conn.commit()
+
+    def _touch(self, pending: Dict[str, float], key: str):
+        pending[key] = time.time()
+        if len(self._touched_pages) + len(self._touched_files) >= self.TOUCH_BATCH:
+            self.flush()
+            self.conn.commit()
+
+    def flush(self):
+        """Write queued last_used touches (the caller commits)."""
+        if self._touched_pages:
+            self.conn.executemany("UPDATE pages SET last_used=? WHERE key=?",
+                                  [(t, k) for k, t in self._touched_pages.items()])
+            self._touched_pages.clear()
+        if self._touched_files:
+            self.conn.executemany("UPDATE files SET last_used=? WHERE digest=?",
+                                  [(t, k) for k, t in self._touched_files.items()])
+            self._touched_files.clear()
+
+    def file_pages(self, digest: str) -> List[str | None] | None:
+        """Page content hashes of a file seen before (by file_digest), else None."""
+        row = self.conn.execute("SELECT pages FROM files WHERE digest=?", (digest,)).fetchone()
+        if row is None:
+            return None
+        self._touch(self._touched_files, digest)
+        return json.loads(row[0])
+
+    def put_file_pages(self, digest: str, page_hashes: List[str | None]):
+        self.conn.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?)",
+                          (digest, json.dumps(page_hashes), time.time()))
+        self.conn.commit()
+
+    def evict(self):
+        # recount: another process sharing the directory may have written too
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+        self.total = total
+        if total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM pages ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM pages WHERE key=?", doomed)
+        self.total = total
 
-        for num in nums:
-            val = float(num.replace("$", "").replace(",", "").strip())
-            if val != 0:
-                return True
+    def close(self):
+        self.flush()
+        self.conn.commit()
+        self.conn.close()
 
-    return False
 
-def has_nonzero_1099b(text: str) -> bool:
-    # FORMAT 1 — Vanguard / Robinhood / TD Ameritrade
-    legacy_labels = [
-        "Short A",
-        "Short B",
-        "Short C",
-        "Total Short-term",
-        "Long D",
-        "Long E",
-        "Long F",
-        "Total Long-term",
-        "Undetermined B",
-        "Undetermined C",
-        "Total Undetermined-term",
-        "Grand total",
-    ]
+def open_ocr_cache() -> OcrDiskCache | None:
+    """Open the persistent cache, or None when disabled / unusable."""
+    if not OCR_CACHE_DIR:
+        return None
+    try:
+        return OcrDiskCache()
+    except Exception as e:
+        logger.warning(f"OCR cache disabled: {e}")
+        return None
 
-    # FORMAT 2 — Morgan Stanley / E*TRADE / Fidelity / Schwab
-    box_labels = [
-        r"Box A\b",
-        r"Box A - Ordinary",
-        r"Box B\b",
-        r"Box B - Ordinary",
-        r"Box D\b",
-        r"Box D - Ordinary",
-        r"Box E\b",
-        r"Box E - Ordinary",
-
-        r"Total Short\s*-?\s*Term",
-        r"Total Long\s*-?\s*Term",
-        r"Total Unknown\s*-?\s*Term",
-        r"Unknown Term",
-    ]
 
-    # FORMAT 3 — Fidelity / Schwab "Full Text" Section Names
-    fidelity_labels = [
-        r"Short-term transactions for which basis is reported to the IRS",
-        r"Short-term transactions for which basis is not reported to the IRS",
-        r"Long-term transactions for which basis is reported to the IRS",
-        r"Long-term transactions for which basis is not reported to the IRS",
-        r"Transactions for which basis is not reported to the IRS and Term is Unknown",
-    ]
+# ── Parallel page extraction (rendering + OCR + text layer per worker)
+from concurrent.futures import ProcessPoolExecutor
 
-    # Scan all available formats
-    all_labels = legacy_labels + box_labels + fidelity_labels
+EXTRACT_WORKERS = int(os.environ.get("EXTRACT_WORKERS", str(os.cpu_count() or 1)))
+EXTRACT_CHUNKSIZE = int(os.environ.get("EXTRACT_CHUNKSIZE", "2"))
 
-    for label in all_labels:
-        if find_nonzero_after(label, text, window=120):
-            return True
+_worker_docs: DocumentPool | None = None
 
-    return False
 
-def has_nonzero_div(text: str) -> bool:
-    """
-    Detects non-zero dividend amounts from:
-      - 1a Ordinary Dividends
-      - 1b Qualified Dividends
-      - 2a Capital Gain Distributions
-      - 3 Nondividend Distributions
-      - 5 Section 199A Dividends
-      - 7 Foreign Tax Paid
-    """
+def _init_extract_worker():
+    global _worker_docs
+    # one Tesseract thread per worker; the pool itself provides the parallelism
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    reset_ocr_engine()
+    _worker_docs = DocumentPool()
 
-    import re
-    t = text.lower()
 
-    # Robust OCR-safe patterns
-    patterns = [
-        r"1a[^0-9a-z]+.*ordinary dividends.*?([-]?\d[\d,]*\.\d{2})",
-        r"1b[^0-9a-z]+.*qualified dividends.*?([-]?\d[\d,]*\.\d{2})",
-        r"2a[^0-9a-z]+.*capital gain.*?([-]?\d[\d,]*\.\d{2})",
-        r"3[^0-9a-z]+.*non.?dividend.*?([-]?\d[\d,]*\.\d{2})",
-        r"5[^0-9a-z]+.*199a dividends.*?([-]?\d[\d,]*\.\d{2})",
-        r"7[^0-9a-z]+.*foreign tax paid.*?([-]?\d[\d,]*\.\d{2})",
-        r"11[^0-9a-z]+.*exempt.?interest dividends.*?([-]?\d[\d,]*\.\d{2})",
-    ]
+def _extract_page_job(job: tuple) -> tuple:
+    path, page_index, methods = job
+    record = extract_text_tiered(path, page_index, _worker_docs)
+    extracts = {m: extract_method_text(path, page_index, m, _worker_docs) for m in methods}
+    return path, page_index, record, extracts
 
-    for p in patterns:
-        m = re.search(p, t, flags=re.DOTALL)
-        if m:
-            try:
-                value = float(m.group(1).replace(",", ""))
-                if value != 0.0:
-                    return True
-            except:
-                pass
 
-    return False
+def extract_pages_parallel(jobs: List[tuple], workers: int = EXTRACT_WORKERS,
+                           chunksize: int = EXTRACT_CHUNKSIZE):
+    """
+    Fan (path, page_index, methods) jobs out over a ProcessPoolExecutor and
+    yield (path, page_index, record, extracts) in the same order as `jobs`,
+    so downstream classification stays deterministic. workers <= 1 runs
+    in-process.
+    """
+    global _worker_docs
+    if workers <= 1 or len(jobs) <= 1:
+        _worker_docs = DocumentPool()
+        try:
+            for job in jobs:
+                yield _extract_page_job(job)
+        finally:
+            _worker_docs.close()
+        return
+    ex = ProcessPoolExecutor(max_workers=workers, initializer=_init_extract_worker)
+    try:
+        yield from ex.map(_extract_page_job, jobs, chunksize=chunksize)
+    finally:
+        # also runs when the consumer stops early: drop the queued chunks
+        ex.shutdown(wait=True, cancel_futures=True)
 
 
-def has_nonzero_int(text: str) -> bool:
-    import re
+class PageTextStore:
+    """
+    Remembers extract_text_tiered() and per-method extracts for every page seen
+    in a run, keyed by (file content hash, page index, extractor config),
+    so each page is rendered / OCR'd / parsed once no matter how many
+    places in merge_with_bookmarks ask for its text. When a disk cache is
+    given, pages seen in earlier runs are served from it without OCR.
+    """
 
-    t = text.lower()
+    def __init__(self, config: str = EXTRACTOR_CONFIG, disk: OcrDiskCache | None = None,
+                 pool: DocumentPool | None = None):
+        self.config = config
+        self.disk = disk
+        self.pool = pool
+        self._digests: Dict[str, str] = {}
+        self._page_hashes: Dict[tuple, str | None] = {}
+        self._records: Dict[tuple, Dict[str, object]] = {}
+        self._methods: Dict[tuple, str] = {}
+        self._layouts: Dict[tuple, PageLayout] = {}
+        self._gated: set = set()
+
+    def digest(self, path: str) -> str:
+        if path not in self._digests:
+            try:
+                self._digests[path] = file_digest(path)
+            except OSError:
+                # synthetic entries (e.g. CONSOLIDATED::acct) have no file
+                self._digests[path] = path
+        return self._digests[path]
+
+    def key(self, path: str, page_index: int) -> tuple:
+        return (self.digest(path), page_index, self.config)
+
+    def page_hash(self, path: str, page_index: int) -> str | None:
+        key = (self.digest(path), page_index)
+        if key not in self._page_hashes:
+            try:
+                self._page_hashes[key] = page_content_hash(path, page_index, self.pool)
+            except Exception:
+                self._page_hashes[key] = None
+        return self._page_hashes[key]
+
+    def index_file(self, path: str, page_count: int) -> bool:
+        """
+        Seed the page hashes of `path` from the disk files index, or hash
+        its pages now and index them. True when the file was seen before.
+        """
+        if self.disk is None:
+            return False
+        digest = self.digest(path)
+        try:
+            known = self.disk.file_pages(digest)
+        except Exception as e:
+            logger.warning(f"OCR cache read failed: {e}")
+            known = None
+        if known is not None and len(known) == page_count:
+            for i, page_hash in enumerate(known):
+                self._page_hashes.setdefault((digest, i), page_hash)
+            return True
+        hashes = [self.page_hash(path, i) for i in range(page_count)]
+        try:
+            self.disk.put_file_pages(digest, hashes)
+        except Exception as e:
+            logger.warning(f"OCR cache write failed: {e}")
+        return False
 
-    # Match ONLY numbers at the END of the line, not in the middle
-    m = re.search(
-        r"interest\s+income[^\n\r]*?([-]?[0-9oO]{1,5}\.?[0-9oO]+)\s*$",
-        t,
-        flags=re.IGNORECASE | re.MULTILINE
+    def _disk_key(self, path: str, page_index: int, kind: str) -> str | None:
+        if self.disk is None:
+            return None
+        page_hash = self.page_hash(path, page_index)
+        if page_hash is None:
+            return None
+        return OcrDiskCache.make_key(page_hash, self.config, kind)
+
+    def _disk_get(self, path: str, page_index: int, kind: str) -> str | None:
+        dkey = self._disk_key(path, page_index, kind)
+        if dkey is None:
+            return None
+        try:
+            hit = self.disk.get(dkey)
+        except Exception as e:
+            logger.warning(f"OCR cache read failed: {e}")
+            return None
+        if hit is not None:
+            print(f"[OCR cache] hit {os.path.basename(path)} p{page_index+1} ({kind})", file=sys.stderr)
+        return hit
+
+    def _disk_put(self, path: str, page_index: int, kind: str, value: str):
+        dkey = self._disk_key(path, page_index, kind)
+        if dkey is None:
+            return
+        try:
+            self.disk.put(dkey, value)
+        except Exception as e:
+            logger.warning(f"OCR cache write failed: {e}")
+
+    def _cached(self, path: str, page_index: int, kind: str, compute) -> str:
+        """Look `kind` up in the disk cache, else compute and remember it."""
+        hit = self._disk_get(path, page_index, kind)
+        if hit is not None:
+            return hit
+        value = compute()
+        self._disk_put(path, page_index, kind, value)
+        return value
+
+    def record(self, path: str, page_index: int) -> Dict[str, object]:
+        """extract_text_tiered() result: text plus the OCR decision and score."""
+        key = self.key(path, page_index)
+        if key not in self._records:
+            self._records[key] = json.loads(self._cached(
+                path, page_index, "text",
+                lambda: json.dumps(extract_text_tiered(path, page_index, self.pool)),
+            ))
+        return self._records[key]
+
+    def text(self, path: str, page_index: int) -> str:
+        return self.record(path, page_index)["text"]
+
+    def method_text(self, path: str, page_index: int, method: str) -> str:
+        if method == "Tesseract" and self.record(path, page_index).get("source") == "ocr":
+            # already OCR'd by the adaptive pass; a second 150 DPI pass adds nothing
+            return self.text(path, page_index)
+        key = self.key(path, page_index) + (method,)
+        if key not in self._methods:
+            self._methods[key] = self._cached(
+                path, page_index, method, lambda: extract_method_text(path, page_index, method, self.pool)
+            )
+        return self._methods[key]
+
+    def region_text(self, path: str, page_index: int, form: str, box_name: str) -> str:
+        """ocr_page_region() for a scanned (OCR'd) page, cached like the method texts; "" otherwise."""
+        if not self.record(path, page_index).get("ocr") or box_name not in FORM_LAYOUTS.get(form, {}):
+            return ""
+        key = self.key(path, page_index) + (f"roi:{form}:{box_name}",)
+        if key not in self._methods:
+            self._methods[key] = self._cached(
+                path, page_index, f"roi{ROI_DPI}:{form}:{box_name}",
+                lambda: ocr_page_region(path, page_index, form, box_name, self.pool),
+            )
+        return self._methods[key]
+
+    def layout(self, path: str, page_index: int) -> PageLayout:
+        """Word layout of a page: the OCR pass's words, else the PDF text layer's."""
+        key = self.key(path, page_index)
+        if key not in self._layouts:
+            words = self.record(path, page_index).get("words")
+            if words is not None:
+                self._layouts[key] = PageLayout(words)
+            else:
+                try:
+                    with borrowed(self.pool) as docs:
+                        self._layouts[key] = PageLayout.from_fitz(docs.fitz_page(path, page_index))
+                except Exception:
+                    self._layouts[key] = PageLayout([])
+        return self._layouts[key]
+
+    def analysis(self, path: str, page_index: int, compute) -> "PageAnalysis":
+        """
+        compute()'s PageAnalysis for a page, cached on disk like its text so
+        a page seen in an earlier session is not classified or title-voted
+        again while ANALYSIS_RULES_VERSION is unchanged. Pages settled by
+        the boilerplate gate are not cached.
+        """
+        if self.key(path, page_index) in self._gated:
+            return compute()
+        kind = f"analysis:{ANALYSIS_RULES_VERSION}:{TITLE_AGREEMENT}"
+        hit = self._disk_get(path, page_index, kind)
+        if hit is not None:
+            d = json.loads(hit)
+            d["votes"] = Counter(d["votes"])
+            return PageAnalysis(**d)
+        result = compute()
+        if self.disk is not None:
+            d = {**vars(result), "votes": dict(result.votes)}
+            d.pop("owner", None)
+            self._disk_put(path, page_index, kind, json.dumps(d))
+        return result
+
+    def extracts(self, path: str, page_index: int) -> Dict[str, str]:
+        return {m: self.method_text(path, page_index, m) for m in EXTRACT_METHODS}
+
+    def _load_from_disk(self, path: str, page_index: int, methods) -> bool:
+        """Fill memory from the disk cache; True when nothing is missing."""
+        key = self.key(path, page_index)
+        if key not in self._records:
+            hit = self._disk_get(path, page_index, "text")
+            if hit is None:
+                return False
+            self._records[key] = json.loads(hit)
+        for m in methods:
+            if key + (m,) not in self._methods:
+                hit = self._disk_get(path, page_index, m)
+                if hit is None:
+                    return False
+                self._methods[key + (m,)] = hit
+        return True
+
+    def gate_boilerplate(self, pages: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """
+        Cheap pass before prefetch(): pages whose quick_page_text() the
+        rules already file as Unused keep that text as their record, so
+        they are never OCR'd or extracted per method. Gate records stay in
+        memory only. Returns the pages that still need full extraction.
+        """
+        if not (BOILERPLATE_GATE and TEXT_LAYER_FIRST):
+            return list(pages)
+        todo = []
+        for path, i in pages:
+            key = self.key(path, i)
+            if key in self._records or self._load_from_disk(path, i, ()):
+                todo.append((path, i))
+                continue
+            record = quick_page_text(path, i, self.pool)
+            if record is not None and is_boilerplate(record["text"]):
+                print(f"[Gate] {os.path.basename(path)} p{i+1} boilerplate ({record['source']}), "
+                      f"extraction skipped", file=sys.stderr)
+                self._records[key] = record
+                self._gated.add(key)
+            else:
+                todo.append((path, i))
+        if len(todo) < len(pages):
+            logger.info(f"Boilerplate gate: {len(pages) - len(todo)} of {len(pages)} pages need no extraction")
+        return todo
+
+    def prefetch(self, pages: List[Tuple[str, int]], methods=EXTRACT_METHODS,
+                 workers: int = EXTRACT_WORKERS, chunksize: int = EXTRACT_CHUNKSIZE):
+        """
+        Extract every (path, page_index) up front on a process pool so the
+        classification / bookmarking stages only read finished results.
+        Pages already in memory or on disk are not resubmitted.
+        """
+        todo = [(p, i, tuple(methods)) for p, i in pages if not self._load_from_disk(p, i, methods)]
+        if not todo:
+            return
+        logger.info(f"Extracting {len(todo)} pages on {workers} worker(s), chunksize={chunksize}")
+        try:
+            with closing(extract_pages_parallel(todo, workers, chunksize)) as results:
+                for path, i, record, extracts in results:
+                    key = self.key(path, i)
+                    if key not in self._records:
+                        self._records[key] = record
+                        self._disk_put(path, i, "text", json.dumps(record))
+                    for m, txt in extracts.items():
+                        if key + (m,) not in self._methods:
+                            self._methods[key + (m,)] = txt
+                            self._disk_put(path, i, m, txt)
+        except Exception as e:
+            # whatever is missing gets extracted lazily in this process
+            logger.warning(f"Parallel extraction stopped early: {e}")
+
+
+# ── Duplicate pages (fingerprinted before extraction)
+# Digital pages are duplicates when page_content_hash() matches. Pages
+# without a usable text layer also get a dHash of a 64×64 thumbnail kept in
+# a BK-tree; a near match is only a candidate, because two scans of the same
+# form differing in one amount hash almost alike. The pair is confirmed by
+# comparing both renders at OCR_BASE_DPI, aligned to within DUP_MAX_SHIFT
+# pixels: scan noise and re-compression leave scattered differing pixels,
+# a changed digit leaves a cluster, so the test is the most differing
+# pixels in any DUP_TILE×DUP_TILE tile. Either way a pair
+# only counts once pages_read_alike() agrees: same text layer, same form
+# field values, so two filled copies of one blank W-2 are never merged.
+DUP_PAGES_PRE_EXTRACT = os.environ.get("DUP_PAGES_PRE_EXTRACT", "1") != "0"
+DHASH_SIZE = 32                    # 32×32 gradient bits per hash
+DHASH_MARGIN = 2                   # grey levels a step must exceed, so blank paper hashes as 0s, not noise
+DHASH_MAX_DISTANCE = int(os.environ.get("DHASH_MAX_DISTANCE", "24"))
+DUP_PIXEL_DELTA = 64               # grey-level change that counts as a differing pixel
+DUP_TILE = 16                      # ~2.7 mm at 150 DPI, about one printed digit
+DUP_MAX_SHIFT = 3                  # pixels of misregistration absorbed between scans
+# differing pixels allowed per tile; a changed digit leaves 30+ in one tile
+DUP_PIXEL_TOLERANCE = int(os.environ.get("DUP_PIXEL_TOLERANCE", "8"))
+
+
+def page_dhash(path: str, page_index: int, pool: DocumentPool | None = None) -> int:
+    """Difference hash of the rendered page: is each pixel clearly brighter than its left neighbour."""
+    with borrowed(pool) as docs:
+        page = docs.fitz_page(path, page_index)
+        mat = fitz.Matrix(64 / page.rect.width, 64 / page.rect.height)
+        thumb = pixmap_to_image(page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False))
+    a = np.asarray(thumb.resize((DHASH_SIZE + 1, DHASH_SIZE), Image.LANCZOS), dtype=np.int16)
+    return int.from_bytes(np.packbits(a[:, 1:] > a[:, :-1] + DHASH_MARGIN).tobytes(), "big")
+
+
+class BKTree:
+    """Burkhard–Keller tree over integer hashes under Hamming distance."""
+
+    def __init__(self):
+        self.root = None   # [hash, item, {distance: child}]
+
+    def add(self, h: int, item):
+        if self.root is None:
+            self.root = [h, item, {}]
+            return
+        node = self.root
+        while True:
+            d = (h ^ node[0]).bit_count()
+            if d not in node[2]:
+                node[2][d] = [h, item, {}]
+                return
+            node = node[2][d]
+
+    def search(self, h: int, max_distance: int) -> List[tuple]:
+        """(distance, item) within max_distance of h, nearest first."""
+        found, stack = [], [self.root] if self.root else []
+        while stack:
+            node = stack.pop()
+            d = (h ^ node[0]).bit_count()
+            if d <= max_distance:
+                found.append((d, node[1]))
+            stack += [c for k, c in node[2].items() if d - max_distance <= k <= d + max_distance]
+        return sorted(found, key=lambda x: x[0])
+
+
+def pages_look_identical(a: Tuple[str, int], b: Tuple[str, int], pool: DocumentPool | None = None) -> bool:
+    """
+    Render both pages at OCR_BASE_DPI and compare them after a slight blur,
+    which absorbs re-compression and resampling but not a changed digit.
+    The second render is shifted by up to DUP_MAX_SHIFT pixels either way
+    and the best-aligned difference is judged tile by tile.
+    """
+    with borrowed(pool) as docs:
+        imgs = []
+        for path, i in (a, b):
+            page = docs.fitz_page(path, i)
+            zoom = OCR_BASE_DPI / 72
+            imgs.append(pixmap_to_image(page.get_pixmap(matrix=fitz.Matrix(zoom, zoom),
+                                                         colorspace=fitz.csGRAY, alpha=False)))
+    x, y = imgs
+    if abs(x.width / x.height - y.width / y.height) > 0.02:
+        return False
+    y = y.resize(x.size, Image.BILINEAR)
+    x, y = (np.asarray(im.filter(ImageFilter.GaussianBlur(1)), dtype=np.int16) for im in (x, y))
+    s = DUP_MAX_SHIFT
+    core = x[s:-s, s:-s]
+    best = None
+    for dy in range(-s, s + 1):
+        for dx in range(-s, s + 1):
+            diff = np.abs(core - y[s + dy:y.shape[0] - s + dy, s + dx:y.shape[1] - s + dx]) > DUP_PIXEL_DELTA
+            if best is None or diff.sum() < best.sum():
+                best = diff
+    h, w = (n // DUP_TILE * DUP_TILE for n in best.shape)
+    tiles = best[:h, :w].reshape(h // DUP_TILE, DUP_TILE, w // DUP_TILE, DUP_TILE).sum(axis=(1, 3))
+    return int(tiles.max(initial=0)) <= DUP_PIXEL_TOLERANCE
+
+
+def _page_reading(path: str, page_index: int, pool: DocumentPool | None = None) -> tuple:
+    """(text layer with whitespace collapsed, sorted form field values) of a page."""
+    with borrowed(pool) as docs:
+        page = docs.fitz_page(path, page_index)
+        text = " ".join(page.get_text().split())
+        fields = sorted((w.field_name or "", str(w.field_value or "")) for w in page.widgets())
+    return text, fields
+
+
+def pages_read_alike(a: Tuple[str, int], b: Tuple[str, int], pool: DocumentPool | None = None) -> bool:
+    """True when both pages carry the same text layer and the same form field values."""
+    return _page_reading(*a, pool) == _page_reading(*b, pool)
+
+
+def find_duplicate_pages(pages: List[Tuple[str, int]], store: PageTextStore) -> Dict[tuple, tuple]:
+    """
+    {(path, page_index): (path, page_index) of the first copy} for pages
+    that repeat an earlier page in `pages`, decided without OCR.
+    """
+    if not DUP_PAGES_PRE_EXTRACT:
+        return {}
+    exact: Dict[str, tuple] = {}
+    scans = BKTree()
+    dups = {}
+    for page in pages:
+        path, i = page
+        h = store.page_hash(path, i)
+        try:
+            if h is not None and h in exact and pages_read_alike(exact[h], page, store.pool):
+                dups[page] = exact[h]
+                continue
+            with borrowed(store.pool) as docs:
+                layer = docs.fitz_page(path, i).get_text().strip()
+            if score_text_layer(layer) < TEXT_LAYER_MIN_SCORE:
+                dh = page_dhash(path, i, store.pool)
+                for _, first in scans.search(dh, DHASH_MAX_DISTANCE):
+                    if pages_look_identical(first, page, store.pool) and pages_read_alike(first, page, store.pool):
+                        dups[page] = first
+                        break
+                else:
+                    scans.add(dh, page)
+        except Exception as e:
+            print(f"[Dedup] fingerprint failed {os.path.basename(path)} p{i+1}: {e}", file=sys.stderr)
+        if page not in dups and h is not None:
+            exact.setdefault(h, page)
+    return dups
+
+
+#For rotating pages
+import io
+from PIL import Image
+import pytesseract
+import fitz
+
+# ── Phrase rule engine
+# Classification tables are declarative: each rule names a result, the text
+# view it reads and its anchor phrases / regexes. Every view is scanned once
+# by a PhraseMatcher and rules are then resolved in priority order, so adding
+# phrases does not add passes over the page.
+class PhraseMatcher:
+    """
+    Find every phrase of a fixed set that occurs in a string, in one pass.
+    The phrases compile into one trie-shaped regex, which yields the longest
+    phrase starting at a position; shorter phrases starting there are
+    necessarily its prefixes and come from a table. Searching resumes one
+    character after each hit so overlapping phrases are still seen.
+    """
+
+    def __init__(self, phrases):
+        trie: Dict[str, dict] = {}
+        for phrase in set(phrases):
+            node = trie
+            for ch in phrase:
+                node = node.setdefault(ch, {})
+            node[""] = phrase
+        self._prefixes: Dict[str, frozenset] = {}
+        self._collect(trie, ())
+        self._re = re.compile(self._trie_regex(trie)) if trie else None
+
+    def _collect(self, node: dict, seen: tuple):
+        if "" in node:
+            seen = seen + (node[""],)
+            self._prefixes[node[""]] = frozenset(seen)
+        for ch, child in node.items():
+            if ch:
+                self._collect(child, seen)
+
+    @classmethod
+    def _trie_regex(cls, node: dict) -> str:
+        alts = [re.escape(ch) + cls._trie_regex(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    def findall(self, s: str) -> set:
+        found: set = set()
+        if self._re is None:
+            return found
+        m = self._re.search(s)
+        while m:
+            found |= self._prefixes[m.group()]
+            m = self._re.search(s, m.start() + 1)
+        return found
+
+
+def text_views(text: str) -> Dict[str, str]:
+    """The lowercased variants classification rules read, built once per page."""
+    lower = text.lower()
+    norm = re.sub(r"\s+", " ", lower)
+    return {
+        "lower": lower,                                   # text.lower()
+        "norm": norm,                                     # whitespace runs → one space
+        "compact": re.sub(r"\s+", "", lower),             # all whitespace removed
+        "clean": re.sub(r"[^A-Za-z0-9\s]", "", lower),    # punctuation/OCR noise removed
+    }
+
+
+def rule(priority: int, category: str, form: str, view: str = "lower",
+         any_of=(), all_of=(), regex=(), when=None) -> dict:
+    """
+    One classification rule. It holds when at least one `any_of` phrase and
+    every `all_of` phrase occur in the view, one `regex` matches it and
+    `when(text)` is true (each check only if given).
+    """
+    return {"priority": priority, "result": (category, form), "view": view,
+            "any_of": tuple(any_of), "all_of": tuple(all_of),
+            "regex": tuple(re.compile(p) for p in regex), "when": when}
+
+
+class RuleSet:
+    """A compiled rule table: one PhraseMatcher per view, rules sorted by priority."""
+
+    def __init__(self, rules):
+        self.rules = sorted(rules, key=lambda r: r["priority"])
+        phrases = defaultdict(set)
+        for r in self.rules:
+            phrases[r["view"]].update(r["any_of"], r["all_of"])
+        self.matchers = {view: PhraseMatcher(p) for view, p in phrases.items()}
+
+    def match(self, text: str, views: Dict[str, str] | None = None) -> dict | None:
+        """Highest-priority rule that holds for `text`, or None."""
+        views = views or text_views(text)
+        hits = {view: m.findall(views[view]) for view, m in self.matchers.items()}
+        for r in self.rules:
+            found = hits.get(r["view"], ())
+            if r["all_of"] and not all(p in found for p in r["all_of"]):
+                continue
+            if r["any_of"] and not any(p in found for p in r["any_of"]):
+                continue
+            if r["regex"] and not any(rx.search(views[r["view"]]) for rx in r["regex"]):
+                continue
+            if r["when"] is not None and not r["when"](text):
+                continue
+            return r
+        return None
+
+
+# Year-end letters, instructions and generic investment detail pages.
+# Read against whitespace-normalised lowercase text ("norm").
+UNUSED_PAGE_RULES = [
+    rule(0, "Unknown", "Unused", "norm", any_of=[
+        "understanding your form 1099",
+        "year-end messages",
+        "important: if your etrade account transitioned",
+        "please visit etrade.com/tax",
+        "tax forms for robinhood markets",
+        "robinhood retirements accounts",
+        "new for 2023 tax year",
+        "new for 2024 tax year",
+        "new for 2025 tax year",
+        "that are necessary for tax",
+        "please note there may be a slight timing",
+        "account statement will not have included",
+        #1099-SA
+        "fees and interest earnings are not considered",
+        "an hsa distribution",
+        "death is includible in the account",
+        "the account as of the date of death",
+        "amount on the account holder",
+        #1099-Mortgage
+        "for clients with paid mortgage insurance",
+        "you can also contact the",
+        #w2
+        "for the latest information about developments related to form",
+        "you and any qualifying children must have valid social security numbers",
+        #w2
+        "may be requested by the mortgagor",
+        "you should contact a competent",
+        "tax lot closed on a first in",
+        "your form 1099 composite may include the following internal revenue service ",
+        "schwab provides your form 1099 tax information as early",
+        "if you have any questions or need additional information about your",
+        "schwab is not providing cost basis",
+        "the amount displayed in this column has been adjusted for option premiums",
+        "you may select a different cost basis method for your brokerage",
+        "to view and change your default cost basis",
+        "this information is not intended to be a substitue for specific individualized",
+        "shares will be gifted based on your default cost basis",
+        "if you sell shares at a loss and buy additional shares",
+        "we are required to send you a corrected from with the revisions clearly marked",
+        "referenced to indicate individual items that make up the totals appearing",
+        "issuers of the securities in your account reallocated certain income distribution",
+        "the amount shown may be dividends a corporation paid directly",
+        "if this form includes amounts belonging to another person",
+        "spouse is not required to file a nominee return to show",
+        "character when passed through or distributed to its direct or in",
+        "brokers and barter exchanges must report proceeds from",
+        "first in first out basis",
+        "see the instructions for your schedule d",
+        "other property received in a reportable change in control or capital",
+    ]),
+    rule(0, "Unknown", "Unused", "norm", all_of=["enclosed is your", "consolidated tax statement"]),
+    rule(0, "Unknown", "Unused", "norm", all_of=["filing your taxes", "turbotax"]),
+    rule(0, "Unknown", "Unused", "norm", all_of=["details of", "investment activity"]),
+    rule(0, "Unknown", "Unused", "norm", regex=[r"\b\d{4}\s+investment details"]),
+]
+_UNUSED_PAGE_RULESET = RuleSet(UNUSED_PAGE_RULES)
+
+
+def is_unused_page(text: str) -> bool:
+    """
+    Detect pages that are just year-end messages, instructions,
+    or generic investment details (not real 1099 forms).
+    """
+    return _UNUSED_PAGE_RULESET.match(text) is not None
+
+
+import re
+
+
+
+# ── Account index (Consolidated-1099 grouping)
+# Account numbers are read in one pass: the patterns below are alternatives
+# of one regex, ranked in list order (an earlier pattern anywhere on the
+# page beats a later one). Digits may be OCR'd as O / I / l; keys are
+# normalised so those variants, dashes and spaces all group together.
+_ACCT_DIGITS = r"[OoIl]?\d(?:[\dOoIl]*\d)?"
+ACCOUNT_PATTERNS = [
+    r"Account\s*Number[:\s]*(?P<a0>(?:[OoIl]?\d|-)(?:[\dOoIl\-]*[\d\-])?)",
+    r"Account Number:\s*(?P<a1>\d(?:[\d\sOoIl]*\d)?)",
+    r"ORIGINAL:\s*(?P<a2>\d(?:[\d\sOoIl]*\d)?)",
+    rf"Account\s+(?P<a3>{_ACCT_DIGITS})",
+]
+# "Account XXXX-1234", "Account Number: ****1234", "account ending in 1234"
+MASKED_ACCOUNT_PATTERNS = [
+    r"Account\s*(?:Number|No\.?)?[:#\s]*[X*]{2,}[\s\-]?(?P<m0>\d{3,4})\b",
+    r"account\s+ending\s+(?:in\s+)?(?P<m1>\d{3,4})\b",
+]
+_ACCOUNT_RE = re.compile(
+    "|".join(f"(?:{p})" for p in ACCOUNT_PATTERNS + MASKED_ACCOUNT_PATTERNS), re.IGNORECASE
+)
+_ACCT_OCR_FIX = str.maketrans("OIL", "011")
+
+
+def normalize_account(acct: str) -> str:
+    """Grouping key of an account number: no dashes / spaces, OCR letters read as digits."""
+    return re.sub(r"[\s\-]", "", acct).upper().translate(_ACCT_OCR_FIX)
+
+
+def skips_account(text: str, form_type: str = "") -> bool:
+    """True for forms that carry no brokerage account (1098-T, 1098 mortgage, W-2, 5498-SA)."""
+    lower = text.lower()
+
+    # 🔹 Skip rules: don't extract account numbers for 1098-T, 1098-Mortgage, W-2, etc.
+    return bool(
+        (form_type and (form_type.startswith("1098") or form_type in ("W-2","5498-SA")))
+        or "form 1098-t" in lower
+        or "tuition statement" in lower
+        or "institution" in lower and "university" in lower
+        or "qualified tuition" in lower
+        or "form 1098 mortgage" in lower
+        or "mortgage interest" in lower
     )
 
-    if not m:
+
+def page_accounts(text: str, form_type: str = "") -> Tuple[str | None, str | None]:
+    """
+    (account number, masked last digits) printed on a page, either None.
+    Pages skips_account() rules out return (None, None).
+    """
+    if skips_account(text, form_type):
+        return None, None   # 🚫 Skip account number detection
+
+    best, masked = None, None
+    for m in _ACCOUNT_RE.finditer(text):
+        name = m.lastgroup
+        if name[0] == "m":
+            masked = masked or m.group(name)
+        elif best is None or name < best[0]:
+            best = (name, m.group(name))
+    return (best[1].replace(" ", "").strip() if best else None), masked
+
+
+def extract_account_number(text: str, form_type: str = "") -> str | None:
+    return page_accounts(text, form_type)[0]
+
+
+class AccountIndex:
+    """
+    Groups Consolidated-1099 pages by account with union-find. A page
+    joins the group of its normalised account number; a page showing only
+    a masked number ("XXXX-1234") joins the one account ending in those
+    digits, or a group of its own when none or several do. The label of a
+    group is the first account number as printed.
+    """
+
+    def __init__(self):
+        self._parent: Dict[str, str] = {}
+        self._shown: Dict[str, str] = {}        # key -> account as first printed
+        self._issuers: Dict[str, str] = {}      # key -> issuer read off its first page
+        self._pages: List[Tuple[tuple, str]] = []
+
+    def _find(self, key: str) -> str:
+        root = key
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[key] != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def _union(self, a: str, b: str):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            self._parent[rb] = ra
+
+    def add(self, entry: tuple, account: str | None, masked: str | None = None) -> Tuple[str, bool]:
+        """File a page; returns (its key, whether the key is new)."""
+        keys = []
+        if account:
+            keys.append(normalize_account(account))
+            self._shown.setdefault(keys[0], account)
+        if masked:
+            keys.append("*" + masked)
+            self._shown.setdefault(keys[-1], f"XXXX{masked}")
+        new = keys[0] not in self._parent
+        for k in keys:
+            self._parent.setdefault(k, k)
+        for k in keys[1:]:
+            self._union(keys[0], k)
+        self._pages.append((entry, keys[0]))
+        return keys[0], new
+
+    def set_issuer(self, key: str, issuer: str):
+        self._issuers.setdefault(key, issuer)
+
+    def groups(self) -> Tuple[Dict[str, List[tuple]], Dict[str, str]]:
+        """({account label: pages}, {account label: issuer}) in first-seen order."""
+        full = [k for k in self._parent if not k.startswith("*")]
+        for k in self._parent:
+            if k.startswith("*"):
+                owners = [f for f in full if f.endswith(k[1:])]
+                if len(owners) == 1:
+                    self._union(owners[0], k)
+        first_key: Dict[str, str] = {}   # root -> first full key seen (else first key)
+        for _, key in self._pages:
+            root = self._find(key)
+            if root not in first_key or (first_key[root].startswith("*") and not key.startswith("*")):
+                first_key[root] = key
+        pages: Dict[str, List[tuple]] = {}
+        issuers: Dict[str, str] = {}
+        for entry, key in self._pages:
+            root = self._find(key)
+            label = self._shown[first_key[root]]
+            pages.setdefault(label, []).append(entry)
+            if key in self._issuers:
+                issuers.setdefault(label, self._issuers[key])
+        return pages, issuers
+
+# consolidated-1099 forms bookmark
+# ── Amount scanner
+# The has_nonzero_* predicates all ask "is there a non-zero amount after box
+# label X?". Rather than one regex pass per label, a page is walked once for
+# every known label and once for amount tokens; each predicate then reads
+# the (label hit → following amounts) events. Labels are matched on the
+# lowercased page with IGNORECASE | DOTALL, as the per-form regexes were.
+import bisect
+from functools import lru_cache
+
+B_AMOUNT_WINDOW = 120   # chars after a 1099-B summary label searched for amounts
+
+B_SUMMARY_LABELS = [
+    # FORMAT 1 — Vanguard / Robinhood / TD Ameritrade
+    r"Short A", r"Short B", r"Short C", r"Total Short-term",
+    r"Long D", r"Long E", r"Long F", r"Total Long-term",
+    r"Undetermined B", r"Undetermined C", r"Total Undetermined-term",
+    r"Grand total",
+    # FORMAT 2 — Morgan Stanley / E*TRADE / Fidelity / Schwab
+    r"Box A\b", r"Box A - Ordinary", r"Box B\b", r"Box B - Ordinary",
+    r"Box D\b", r"Box D - Ordinary", r"Box E\b", r"Box E - Ordinary",
+    r"Total Short\s*-?\s*Term", r"Total Long\s*-?\s*Term",
+    r"Total Unknown\s*-?\s*Term", r"Unknown Term",
+    # FORMAT 3 — Fidelity / Schwab "Full Text" Section Names
+    r"Short-term transactions for which basis is reported to the IRS",
+    r"Short-term transactions for which basis is not reported to the IRS",
+    r"Long-term transactions for which basis is reported to the IRS",
+    r"Long-term transactions for which basis is not reported to the IRS",
+    r"Transactions for which basis is not reported to the IRS and Term is Unknown",
+]
+
+# (box number, caption): the box number followed by a non-alphanumeric
+# character, anywhere before the caption, then the first amount after it
+DIV_BOXES = [
+    ("1a", r"ordinary dividends"),
+    ("1b", r"qualified dividends"),
+    ("2a", r"capital gain"),
+    ("3", r"non.?dividend"),
+    ("5", r"199a dividends"),
+    ("7", r"foreign tax paid"),
+    ("11", r"exempt.?interest dividends"),
+]
+_DIV_BOX_RES = {box: re.compile(box + r"[^0-9a-z]") for box, _ in DIV_BOXES}
+
+INT_INCOME_LABEL = r"interest\s+income"
+# the number ending the "interest income" line (OCR may read 0 as O)
+_INT_TAIL_RE = re.compile(r"[^\n\r]*?([-]?[0-9oO]{1,5}\.?[0-9oO]+)\s*$", re.IGNORECASE | re.MULTILINE)
+
+# (caption, adjacent): adjacent captions take the "$amount" right after
+# them; the others take the last "$ amount" anywhere after the caption
+MISC_BOXES = [
+    (r"1\.RENTS", True),
+    (r"2\.ROYALTIES", True),
+    (r"3\.OTHER INCOME", True),
+    (r"4\.FEDERAL INCOME TAX WITHHELD", True),
+    (r"8\.SUBSTITUTE PAYMENTS", False),
+]
+OID_BOXES = [
+    (r"1\.ORIGINAL ISSUE DISCOUNT", False),
+    (r"2\.OTHER PERIODIC INTEREST", False),
+    (r"4\.FEDERAL INCOME TAX WITHHELD", False),
+    (r"5\.MARKET DISCOUNT", False),
+    (r"6\.ACQUISITION PREMIUM", False),
+    (r"8\.OID ON", False),
+    (r"9\.INVESTMENT EXPENSES", False),
+    (r"10\.BOND PREMIUM", False),
+    (r"11\.TAX-EXEMPT OID", False),
+]
+
+# "$ 1,234.56" (dollar) or a bare "1,234.56" (num); a dollar token's digits
+# also count as a bare amount
+_AMOUNT_TOKEN_RE = re.compile(r"\$\s*(?P<dollar>[0-9,]+\.\d{2})|(?P<num>\d[\d,]*\.\d{2})")
+
+
+class AmountScanner:
+    """
+    Scan a page once for a fixed set of label regexes. One lookahead
+    alternation finds every position where some label starts; only those
+    positions are tried against the individual labels, so overlapping
+    labels ("Box A" / "Box A - Ordinary") are all reported.
+    """
+
+    def __init__(self, labels, flags=re.IGNORECASE | re.DOTALL):
+        self.labels = {p: re.compile(p, flags) for p in dict.fromkeys(labels)}
+        self._any = re.compile("(?=" + "|".join(f"(?:{p})" for p in self.labels) + ")", flags)
+
+    def scan(self, text: str) -> "AmountEvents":
+        hits: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for cand in self._any.finditer(text):
+            pos = cand.start()
+            for label, pat in self.labels.items():
+                m = pat.match(text, pos)
+                if m:
+                    hits[label].append((pos, m.end()))
+
+        nums: List[Tuple[int, int, float]] = []      # (start, end, value) of every amount
+        dollars: List[Tuple[int, int, str]] = []     # (start of "$", start of digits, digits) of "$ amounts"
+        for m in _AMOUNT_TOKEN_RE.finditer(text):
+            if m.group("num"):
+                nums.append((m.start(), m.end(), float(m.group("num").replace(",", ""))))
+                continue
+            digits = m.group("dollar")
+            dollars.append((m.start(), m.start("dollar"), digits.replace(",", "")))
+            core = digits.lstrip(",")
+            if core[0].isdigit():
+                nums.append((m.end() - len(core), m.end(), float(core.replace(",", ""))))
+        return AmountEvents(text, hits, nums, dollars)
+
+
+class AmountEvents:
+    """Label hits and amount tokens of one page, all in text order."""
+
+    def __init__(self, text, hits, nums, dollars):
+        self.text = text
+        self._hits = hits
+        self.nums = nums
+        self.dollars = dollars
+        self._num_starts = [n[0] for n in nums]
+        self._dollar_starts = [d[0] for d in dollars]
+
+    def hits(self, label: str) -> List[Tuple[int, int]]:
+        """(start, end) of every occurrence of `label`."""
+        return self._hits.get(label, [])
+
+    def amounts_after(self, pos: int, window: int = None):
+        """Amounts starting at or after `pos` (and ending within `window` chars)."""
+        i = bisect.bisect_left(self._num_starts, pos)
+        limit = len(self.text) if window is None else pos + window
+        while i < len(self.nums) and self.nums[i][1] <= limit:
+            yield self.nums[i]
+            i += 1
+
+    def dollar_after(self, pos: int, adjacent: bool):
+        """
+        The "$amount" right after `pos` (only whitespace before the "$",
+        none after it) if `adjacent`, else the last "$ amount" anywhere
+        after `pos`; None if absent.
+        """
+        i = bisect.bisect_left(self._dollar_starts, pos)
+        if i == len(self.dollars):
+            return None
+        if not adjacent:
+            return self.dollars[-1]
+        d = self.dollars[i]
+        gap = self.text[pos:d[0]]
+        if (gap and not gap.isspace()) or d[1] != d[0] + 1:
+            return None
+        return d
+
+
+_AMOUNT_SCANNER = AmountScanner(
+    B_SUMMARY_LABELS
+    + [caption for _, caption in DIV_BOXES]
+    + [INT_INCOME_LABEL]
+    + [caption for caption, _ in MISC_BOXES + OID_BOXES]
+)
+
+
+@lru_cache(maxsize=8)
+def scan_amounts(text: str) -> AmountEvents:
+    """Amount events of a page; classify_text_multi asks several predicates about the same text."""
+    return _AMOUNT_SCANNER.scan(text.lower())
+
+
+def _check_nonzero(boxes, text: str) -> bool:
+    """
+    True if any of the (caption, adjacent) boxes has a "$ amount" greater
+    than zero. Only the first occurrence of a non-adjacent caption counts,
+    since the amount it takes is the last one on the page anyway.
+    """
+    events = scan_amounts(text)
+    for caption, adjacent in boxes:
+        hits = events.hits(caption)
+        for _, end in (hits if adjacent else hits[:1]):
+            d = events.dollar_after(end, adjacent)
+            if d and float(d[2]) > 0.0:
+                print(f"[DEBUG] ✅ Nonzero value detected: {d[2]}", file=sys.stderr)
+                return True
+    return False
+
+
+def has_nonzero_misc(text: str) -> bool:
+    return _check_nonzero(MISC_BOXES, text)
+def has_nonzero_oid(text: str) -> bool:
+    return _check_nonzero(OID_BOXES, text)
+
+def extract_1099b_section(text: str) -> str:
+    """
+    Extract only the 1099-B summary table section.
+    """
+    pattern = r"SUMMARY OF PROCEEDS.*?Grand total.*?(?:\n|$)"
+    m = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
+    return m.group(0) if m else ""
+
+
+def has_nonzero_1099b(text: str) -> bool:
+    """
+    True if any 1099-B summary row label (Vanguard / Morgan Stanley /
+    Fidelity layouts) is followed within B_AMOUNT_WINDOW characters by a
+    non-zero amount. Works even when OCR breaks the line.
+    """
+    events = scan_amounts(text)
+    for label in B_SUMMARY_LABELS:
+        for _, end in events.hits(label):
+            if any(value != 0 for _, _, value in events.amounts_after(end, B_AMOUNT_WINDOW)):
+                return True
+    return False
+
+def has_nonzero_div(text: str) -> bool:
+    """
+    Detects non-zero dividend amounts from:
+      - 1a Ordinary Dividends
+      - 1b Qualified Dividends
+      - 2a Capital Gain Distributions
+      - 3 Nondividend Distributions
+      - 5 Section 199A Dividends
+      - 7 Foreign Tax Paid
+      - 11 Exempt-Interest Dividends
+    Each box reads the first amount after the last caption that follows
+    the box number.
+    """
+    events = scan_amounts(text)
+    for box, caption in DIV_BOXES:
+        first = _DIV_BOX_RES[box].search(events.text)
+        if not first:
+            continue
+        for start, end in reversed(events.hits(caption)):
+            if start < first.end():
+                break
+            amount = next(events.amounts_after(end), None)
+            if amount:
+                if amount[2] != 0.0:
+                    return True
+                break
+
+    return False
+
+
+def has_nonzero_int(text: str) -> bool:
+    events = scan_amounts(text)
+
+    # Match ONLY numbers at the END of the line, not in the middle
+    for _, end in events.hits(INT_INCOME_LABEL):
+        m = _INT_TAIL_RE.match(events.text, end)
+        if m:
+            break
+    else:
         return False
 
     val = (
@@ -620,36 +2295,6 @@ def has_nonzero_int(text: str) -> bool:
         return False
 
 
-import re
-
-def _check_nonzero(patterns, text: str) -> bool:
-    """
-    Scan text with given regex patterns and return True
-    if any captured numeric value is greater than zero.
-    Works even when '$' is missing or OCR introduces stray spaces/letters.
-    """
-    for pat in patterns:
-        matches = re.findall(pat, text, flags=re.IGNORECASE | re.DOTALL)
-        for m in matches:
-            # Clean OCR artifacts like "3.9O" or "$ 3.90"
-            val_str = (
-                str(m)
-                .replace(",", "")
-                .replace("$", "")
-                .replace("O", "0")   # OCR 'O' → '0'
-                .strip()
-            )
-
-            try:
-                val = float(val_str)
-                if val > 0.0:
-                    print(f"[DEBUG] ✅ Nonzero value detected: {val_str}", file=sys.stderr)
-                    return True
-            except ValueError:
-                continue
-    return False
-
-
 # --- Post-processing cleanup for bookmarks ---
 
 def classify_text_multi(text: str) -> list[str]:
@@ -726,144 +2371,104 @@ def classify_text_multi(text: str) -> list[str]:
     return matches
 
 
-# --- Classification Helper
-
-def classify_text(text: str) -> Tuple[str, str]:
-    normalized = re.sub(r'\s+', '', text.lower())
-    t = text.lower()
-    
-    lower = text.lower()
-      # Detect W-2 pages by their header phrases
-    t = re.sub(r"\s+", " ", text.lower()).strip()
-    # --- Detect Schedule K-1 (Form 1065) ---
-    if "schedule k-1" in t or "form 1065" in t:
-        return "Income", "K-1"
-    if "statement a" in t and "qbi" in t:
-        return "Income", "K-1"
+# --- Classification rules
+# Priority order mirrors the original if-chain: the first rule that holds wins.
+# Views: "norm" = whitespace-normalised lowercase (the old `t`, which only
+# differed by strip()), "lower" = text.lower(), "clean" = lowercase without
+# punctuation, "compact" = lowercase without whitespace. Phrases written in uppercase in the old chain could never match
+# the lowercased text and are left out.
+CLASSIFY_RULES = [
+    # --- Schedule K-1 (Form 1065) ---
+    rule(10, "Income", "K-1", "norm", any_of=["schedule k-1", "form 1065"]),
+    rule(20, "Income", "K-1", "norm", all_of=["statement a", "qbi"]),
 
     #Property Tax
-    if (
-        "total allowable community college" in t
-        or "school district property tax paid" in t
-        or "district property tax paid" in t
-        or "parcel id property property" in t
-        or "axing unit taxrate previous tax" in t
-        or "homestead exempt" in t
-        or "real property tax proper iy location" in t
-        or "property assessment" in t
-        or "real property taxsssss" in t
-        or "REAL PROPERTY TAX PROPERTY LOCATION" in t
-        or "real property tax property location" in t
-        or "www.dctreasurer.ora" in t
-        or "homesteadexempt" in t
-    ):
-        return "Expenses", "Property Tax"
+    rule(30, "Expenses", "Property Tax", "norm", any_of=[
+        "total allowable community college",
+        "school district property tax paid",
+        "district property tax paid",
+        "parcel id property property",
+        "axing unit taxrate previous tax",
+        "homestead exempt",
+        "real property tax proper iy location",
+        "property assessment",
+        "real property taxsssss",
+        "real property tax property location",
+        "www.dctreasurer.ora",
+        "homesteadexempt",
+    ]),
 
     # --------------------------- 1095-C --------------------------- #
-    if (
-        "form 1095-c" in lower
-        or "employer-provided health insurance offer and coverage" in lower
-        or "employee offer of coverage" in lower
-        or "covered individuals" in lower
-        or "employer-provided health insurance offer" in lower
-        or "do not attach to your tax return" in lower
-        
-    ):
-        return "Others", "1095-C"
-    # --------------------------- 1095-C --------------------------- #
-    
-
-
-    if (
-        "fees and interest earnings are not considered contributions" in t
-        or "contact a competent tax advisor or the irs" in t
-        or "retirement plans for small business" in t
-        or "civil service retirement benefits" in t
-        or "general rule for pensions and annuities" in t
-        or "hsas and other tax-favored health plan" in t
-        # New lines from E*TRADE statement:
-        or "the following tax documents are not included in this statement" in t
-        or "forms 1099-r, 1099-q, 1042-s, 2439, 5498" in t
-        or "e*trade from morgan stanley is pleased to provide" in t
-        or "warning - corrected tax forms possible" in t
-        or "prepared based upon information provided by the issuer" in t
-        or "we will be required to send you one or more corrections" in t
-        # Existing unused checks...
-        or "the following tax documents are not included in this statement" in t
-        or "e*trade from morgan stanley" in t
-        or "1099 consolidated tax statement" in t
-        or "*** warning - corrected tax forms possible ***" in t
-        or "prepared based upon information provided by the issuer" in t
-        or "will be required to send you one or more corrections" in t
+    rule(40, "Others", "1095-C", "lower", any_of=[
+        "form 1095-c",
+        "employer-provided health insurance offer and coverage",
+        "employee offer of coverage",
+        "covered individuals",
+        "employer-provided health insurance offer",
+        "do not attach to your tax return",
+    ]),
+
+    rule(50, "Others", "Unused", "norm", any_of=[
+        "fees and interest earnings are not considered contributions",
+        "contact a competent tax advisor or the irs",
+        "retirement plans for small business",
+        "civil service retirement benefits",
+        "general rule for pensions and annuities",
+        "hsas and other tax-favored health plan",
+        # E*TRADE statement
+        "the following tax documents are not included in this statement",
+        "forms 1099-r, 1099-q, 1042-s, 2439, 5498",
+        "e*trade from morgan stanley is pleased to provide",
+        "warning - corrected tax forms possible",
+        "prepared based upon information provided by the issuer",
+        "we will be required to send you one or more corrections",
+        "e*trade from morgan stanley",
+        "1099 consolidated tax statement",
+        "*** warning - corrected tax forms possible ***",
+        "will be required to send you one or more corrections",
         #1042-S
-        or "explanation of codes" in t
-        or "einbehaltung der steuern" in t
-    ):
-        return "Others", "Unused"
+        "explanation of codes",
+        "einbehaltung der steuern",
+    ]),
 
     #1099-R
-    r1099 = [
-        #"federal income tax withheld",
+    rule(60, "Income", "1099-R", "lower", any_of=[
         "taxable amount iras",
         "contrib or insurance premiums",
         "6 net unrealized appreciation",
         "13 date of 17 local tax withheld 18 name",
         "total employee contributions the irs",
         "2b taxable amount total copy b",
-        
-        
-    ]
-    for pat in r1099:
-        if pat in lower:
-            return "Income", "1099-R"
-
-    # --- Detect 1099-G (State Income Tax Refund) ---
-    g1099 = [
-        "1099 g",
-        "form 1099 g",
-        "1099-g",
-        "form 1099-g",
-    ]
-    for pat in g1099:
-        if pat in lower:
-            return "Income", "1099-G"
-
-    if (
-        "child care" in lower
-        or "day care" in lower
-        or "to the parents" in lower
-      
-        or "provider information" in lower
-        or "total payments paid by" in lower
-        #or "dates of service" in lower
-        or "late payment fee late payment fee" in lower
-        or "assistant business administrator" in lower
-        or "preschool tuition payments" in lower
-        or "the student named above has" in lower
-        or "ach - returned - online payment" in lower
-        or "registration fee new enrollmeny" in lower
-        #or "" in lower
-        
-    ):
-        print(f"[DEBUG] CHILD CARE EXPENSE DETECTED in page: {text[:120]}...", file=sys.stderr)
-        return "Expenses", "Child Care Expenses"
-   
-    unuseddiv = [
+    ]),
+
+    # --- 1099-G (State Income Tax Refund) ---
+    rule(70, "Income", "1099-G", "lower", any_of=["1099 g", "form 1099 g", "1099-g", "form 1099-g"]),
+
+    rule(80, "Expenses", "Child Care Expenses", "lower", any_of=[
+        "child care",
+        "day care",
+        "to the parents",
+        "provider information",
+        "total payments paid by",
+        "late payment fee late payment fee",
+        "assistant business administrator",
+        "preschool tuition payments",
+        "the student named above has",
+        "ach - returned - online payment",
+        "registration fee new enrollmeny",
+    ]),
+
+    rule(90, "Others", "Unused", "lower", any_of=[
         "fundrise strives to provide your",
         "#although the fundrise team seeks to",
         "fundrise receives updated information for",
         #1099-SA
         "fees and interest earnings",
         "if you have questions regarding",
-        "you should contact a competent tax advisor"
-        "Fees and interest earnings are not considered contributions",
         "contact a competent tax advisor or the irs",
         "contributions or distributions and are not",
         "if you have questions regarding specific circumstances",
-        "if you have questions regarding specific circumstances",
-        "if you have questions regarding specific circumstances",
         #1098-T
-        #"for the latest information about developments"
         "may result in an increase in tax",
         "reimbursements or refunds for the calendar",
         "rippling",
@@ -873,67 +2478,39 @@ def classify_text(text: str) -> Tuple[str, str]:
         "such a legislation enacted after",
         #1099-INT
         "continued on the back of copy",
-       
-       
-    ]
-    for pat in unuseddiv:
-        if pat in lower:
-            return "Others", "Unused"
+    ]),
+
     # --------------------------- 529 Plan / College Savings --------------------------- #
-    # Detect 529 college savings plan statements or transaction notices
-    clean_text = re.sub(r'[^A-Za-z0-9\s]', '', text.lower())  # normalize OCR artifacts
-   
-    if (
-        "529" in clean_text
-        and (
-            #"indiana529" in clean_text
-            "indiana 529" in clean_text
-            or "529 direct savings plan" in clean_text
-            or "education savings authority" in clean_text
-            or "college savings" in clean_text
-            or "qualified tuition program" in clean_text
-            or "investment allocations" in clean_text
-            or "investment portfolio" in clean_text
-            or "funding information" in clean_text
-            or "recurring contribution" in clean_text
-            or "bank information" in clean_text
-            or "electronic bank transfer" in clean_text
-            #or "indiana529directcom" in clean_text
-            #or "indiana 529 direct com" in clean_text
-            or "indiana education savings" in clean_text
-            or "contribution ebt" in clean_text
-            or "please see below for details pertaining to" in clean_text
-        )
-    ):
-        return "Expenses", "529-Plan"
-    if "#bwnjgwm" in normalized:
-        return "Others", "Unused"
-    
-    if "#rippling" in normalized:
-        return "Others", "Unused"
-    sa_front_patterns = [
+    rule(100, "Expenses", "529-Plan", "clean", all_of=["529"], any_of=[
+        "indiana 529",
+        "529 direct savings plan",
+        "education savings authority",
+        "college savings",
+        "qualified tuition program",
+        "investment allocations",
+        "investment portfolio",
+        "funding information",
+        "recurring contribution",
+        "bank information",
+        "electronic bank transfer",
+        "indiana education savings",
+        "contribution ebt",
+        "please see below for details pertaining to",
+    ]),
+    rule(110, "Others", "Unused", "compact", any_of=["#bwnjgwm", "#rippling"]),
+
+    # 🔁 Priority: 1099-SA > Unused
+    rule(120, "Income", "1099-SA", "lower", regex=[
         r"earnings\s+on\s+excess\s+cont",   # will also match 'cont.'
-        #r"form\s+1099-?sa",                 # matches '1099-SA' or '1099SA'
         r"fmv\s+on\s+date\s+of\s+death",
-    ]
+    ]),
 
-    found_sa_front = any(re.search(pat, lower) for pat in sa_front_patterns)
+    # W-2 pages by key header phrases
+    rule(130, "Income", "W-2", "lower", any_of=["wages, tips, other compensation"]),
+    rule(130, "Income", "W-2", "lower", all_of=["employer's name", "address"]),
 
-    # 🔁 Priority: 1099-SA > Unused
-    if found_sa_front:
-        return "Income", "1099-SA"
-
-   
-    # 1) Detect W-2 pages by key header phrases
-    if (
-        "wages, tips, other compensation" in lower or
-        ("employer's name" in lower and "address" in lower)
-    ):
-        return "Income", "W-2"
-
-    #5498-SA
-    # --- 5498-SA detection (more tolerant OCR patterns) ---
-    sa5498_front_patterns = [
+    # --- 5498-SA (tolerant OCR patterns) ---
+    rule(140, "Expenses", "5498-SA", "lower", regex=[
         r"form\s+[s§5]\s*498-?\s*sa",             # catches “5498-SA”, “S498-SA”, “§498-SA”
         r"form\s+5498sa",                         # no dash
         r"form\s+s498-sa",                        # OCR “5”→“S”
@@ -943,147 +2520,102 @@ def classify_text(text: str) -> Tuple[str, str]:
         r"\b2[\.\-)]?\s*rollover\s+contributions",
         r"\b5[\.\-)]?\s*fair\s+market\s+value\s+of\s+(account|hsa)",
         r"\b7[\.\-)]?\s*ira\s+type",
-        r"\b11[\.\-)]?\s*required\s+minimum\s+distribution.*\d{4}"
-    ]
-    if any(re.search(pat, lower) for pat in sa5498_front_patterns):
-        return "Expenses", "5498-SA"
-
-   
-    if is_unused_page(text):
-        return "Unknown", "Unused"
-    if '1098-t' in t: return 'Expenses', '1098-T'
-   
-    # If page matches any instruction patterns, classify as Others → Unused
-    instruction_patterns = [
-    # full “Instructions for Employee…” block (continued from back of Copy C)
-    # W-2 instructions
-    #"box 1. enter this amount on the wages line of your tax return",
-    #"box 2. enter this amount on the federal income tax withheld line",
-    #"box 5. you may be required to report this amount on form 8959",
-    ##"box 6. this amount includes the 1.45% medicare tax withheld",
-    #"box 8. this amount is not included in box 1, 3, 5, or 7",
-    #"you must file form 4137",
-    #"box 10. this amount includes the total dependent care benefits",
-    "instructions for form 8949",
-    "employee w-4 profile to change your employee w-4 profile information",
-    "the following information reflects your final pay statement plus employer adjustments",
-    "the following information reflects your final pay statement plus statement plus",
-    "regulations section 1.6045-1",
-    "recipient's taxpayer identification number",
-    "fata filing requirement",
-    "payer’s routing transit number",
-    #"refer to the form 1040 instructions",
-    "earned income credit",
-    "if your name, SSN, or address is incorrect",
-    #"corrected wage and tax statement",
-    #"credit for excess taxes",
-    #"instructions for employee  (continued from back of copy c) "
-    #"box 12 (continued)",
-    #"f—elective deferrals under a section 408(k)(6) salary reduction sep",
-    "g—elective deferrals and employer contributions (including  nonelective ",
-    "deferrals) to a section 457(b) deferred compensation plan",
-    "h—elective deferrals to a section 501(c)(18)(d) tax-exempt  organization ",
-    "plan. see the form 1040 instructions for how to deduct.",
-    #"j—nontaxable sick pay (information only, not included in box 1, 3, or 5)",
-    #"k—20% excise tax on excess golden parachute payments. see the ",
-    #"form 1040 instructions.",
-    #"l—substantiated employee business expense reimbursements ",
-    #"(nontaxable)",
-    "m—uncollected social security or rrta tax on taxable cost  of group-",
-    "term life insurance over $50,000 (former employees only). see the form ",
-    #"1040 instructions.",
-    "n—uncollected medicare tax on taxable cost of group-term  life ",
-    "insurance over $50,000 (former employees only). see the form 1040 ",
-    #"instructions.",
-    #"p—excludable moving expense reimbursements paid directly to a ",
-    "member of the u.s. armed forces (not included in box 1, 3, or 5)",
-    #"q—nontaxable combat pay. see the form 1040 instructions for details ",
-    "on reporting this amount.",
-    # 1099-INT instructions
-    "box 1. shows taxable interest",
-    "box 2. shows interest or principal forfeited",
-    "box 3. shows interest on u.s. savings bonds",
-    "box 4. shows backup withholding",
-    "box 5. any amount shown is your share",
-    "box 6. shows foreign tax paid",
-    "box 7. shows the country or u.s. territory",
-    "box 8. shows tax-exempt interest",
-    "box 9. shows tax-exempt interest subject",
-    "box 10. for a taxable or tax-exempt covered security",
-    "box 11. for a taxable covered security",
-    "box 12. for a u.s. treasury obligation",
-    "box 13. for a tax-exempt covered security",
-    "box 14. shows cusip number",
-    "boxes 15-17. state tax withheld",
-    # 1098-T instruction lines
-    "you, or the person who can claim you as a dependent, may be able to claim an education credit",
-    "student’s taxpayer identification number (tin)",
-    "box 1. shows the total payments received by an eligible educational institution",
-    "box 2. reserved for future use",
-    "box 3. reserved for future use",
-    "box 4. shows any adjustment made by an eligible educational institution",
-    "box 5. shows the total of all scholarships or grants",
-    "tip: you may be able to increase the combined value of an education credit",
-    "box 6. shows adjustments to scholarships or grants for a prior year",
-    "box 7. shows whether the amount in box 1 includes amounts",
-    "box 8. shows whether you are considered to be carrying at least one-half",
-    "box 9. shows whether you are considered to be enrolled in a program leading",
-    "box 10. shows the total amount of reimbursements or refunds",
-    "future developments. for the latest information about developments related to form 1098-t",
-    # 1098-Mortgage
-    ]
-    for pat in instruction_patterns:
-        if pat in lower:
-            return "Others", "Unused"
-       
-       
-        #---------------------------1099-DIV----------------------------------#
-    #1099-INT for page 1
-    div_front = [
+        r"\b11[\.\-)]?\s*required\s+minimum\s+distribution.*\d{4}",
+    ]),
+
+    # is_unused_page(), folded into the same scan
+    *[dict(r, priority=150) for r in UNUSED_PAGE_RULES],
+
+    rule(160, "Expenses", "1098-T", "norm", any_of=["1098-t"]),
+
+    # Instruction pages → Others / Unused
+    rule(170, "Others", "Unused", "lower", any_of=[
+        # W-2 instructions
+        "instructions for form 8949",
+        "employee w-4 profile to change your employee w-4 profile information",
+        "the following information reflects your final pay statement plus employer adjustments",
+        "the following information reflects your final pay statement plus statement plus",
+        "regulations section 1.6045-1",
+        "recipient's taxpayer identification number",
+        "fata filing requirement",
+        "payer’s routing transit number",
+        "earned income credit",
+        "g—elective deferrals and employer contributions (including  nonelective ",
+        "deferrals) to a section 457(b) deferred compensation plan",
+        "h—elective deferrals to a section 501(c)(18)(d) tax-exempt  organization ",
+        "plan. see the form 1040 instructions for how to deduct.",
+        "m—uncollected social security or rrta tax on taxable cost  of group-",
+        "term life insurance over $50,000 (former employees only). see the form ",
+        "n—uncollected medicare tax on taxable cost of group-term  life ",
+        "insurance over $50,000 (former employees only). see the form 1040 ",
+        "member of the u.s. armed forces (not included in box 1, 3, or 5)",
+        "on reporting this amount.",
+        # 1099-INT instructions
+        "box 1. shows taxable interest",
+        "box 2. shows interest or principal forfeited",
+        "box 3. shows interest on u.s. savings bonds",
+        "box 4. shows backup withholding",
+        "box 5. any amount shown is your share",
+        "box 6. shows foreign tax paid",
+        "box 7. shows the country or u.s. territory",
+        "box 8. shows tax-exempt interest",
+        "box 9. shows tax-exempt interest subject",
+        "box 10. for a taxable or tax-exempt covered security",
+        "box 11. for a taxable covered security",
+        "box 12. for a u.s. treasury obligation",
+        "box 13. for a tax-exempt covered security",
+        "box 14. shows cusip number",
+        "boxes 15-17. state tax withheld",
+        # 1098-T instruction lines
+        "you, or the person who can claim you as a dependent, may be able to claim an education credit",
+        "student’s taxpayer identification number (tin)",
+        "box 1. shows the total payments received by an eligible educational institution",
+        "box 2. reserved for future use",
+        "box 3. reserved for future use",
+        "box 4. shows any adjustment made by an eligible educational institution",
+        "box 5. shows the total of all scholarships or grants",
+        "tip: you may be able to increase the combined value of an education credit",
+        "box 6. shows adjustments to scholarships or grants for a prior year",
+        "box 7. shows whether the amount in box 1 includes amounts",
+        "box 8. shows whether you are considered to be carrying at least one-half",
+        "box 9. shows whether you are considered to be enrolled in a program leading",
+        "box 10. shows the total amount of reimbursements or refunds",
+        "future developments. for the latest information about developments related to form 1098-t",
+    ]),
+
+    #---------------------------1099-DIV----------------------------------#
+    # 🔁 Priority: 1099-DIV > Unused
+    rule(180, "Income", "1099-DIV", "lower", any_of=[
         "form 1099-div",
         "dividends and distributions",
         "1a total ordinary dividends",
         "1b qualified dividends distributions",
-        "2a Total capital gain distr",
+        "2a total capital gain distr",
         "specified private activity bond interest dividends",
         "qualified dividends",
         "total capital gain distr",
         "section 1202 gain",
         "section 1250 gain",
-    ]
-
-    div_unused = [
-       
+    ]),
+    rule(190, "Others", "Unused", "lower", any_of=[
         "the information contained herein",
         "please note that we have changed",
         "your redeemed shares has not been",
         "we are requested by trh irs",
-        ]
-    lower = text.lower()
-    found_div_front = any(pat.lower() in lower for pat in div_front)
-    found_div_unused = any(pat.lower() in lower for pat in div_unused)
-
-# 🔁 Priority: 1099-INT > Unused
-    if found_div_front:
-        return "Income", "1099-DIV"
-    elif found_div_unused:
-        return "Others", "Unused"
-           
+    ]),
+
     # --- 1099-MISC ---
-    misc_category = [
+    rule(200, "Income", "1099-MISC", "lower", any_of=[
         "form 1099-misc",
         "miscellaneous information",
         "1.rents",
         "2.royalties",
         "3.other income",
-        "8.substitute payments in lieu of dividends or interest"
-    ]
-    for pat in misc_category:
-        if pat in lower:
-            return "Income", "1099-MISC"
+        "8.substitute payments in lieu of dividends or interest",
+    ]),
 
     # --- 1099-OID ---
-    oid_category = [
+    rule(210, "Income", "1099-OID", "lower", any_of=[
         "form 1099-oid",
         "original issue discount",
         "1.original issue discount",
@@ -1092,14 +2624,11 @@ def classify_text(text: str) -> Tuple[str, str]:
         "6.acquisition premium",
         "8.oid on u.s. treasury obligations",
         "10.bond premium",
-        "11.tax-exempt oid"
-    ]
-    for pat in oid_category:
-        if pat in lower:
-            return "Income", "1099-OID"
+        "11.tax-exempt oid",
+    ]),
 
     # --- 1099-B ---
-    b_category = [
+    rule(220, "Income", "1099-B", "lower", any_of=[
         "form 1099-b",
         "proceeds from broker and barter exchange transactions",
         "1d.proceeds",
@@ -1107,132 +2636,89 @@ def classify_text(text: str) -> Tuple[str, str]:
         "noncovered securities",
         "1e.cost or other basis of covered securities",
         "1f.accrued market discount",
-        "1g.wash sale loss disallowed"
-    ]
-    for pat in b_category:
-        if pat in lower:
-            return "Income", "1099-B"
+        "1g.wash sale loss disallowed",
+    ]),
 
     #---------------------------Consolidated-1099----------------------------------#
-   
-     # E*TRADE text in parts
-   
-   
-
-    con_unused = [
+    # E*TRADE text in parts
+    rule(230, "Others", "Unused", "lower", any_of=[
         "etrade from morgan stanley 1099 consolidated tax statement for 2023 provides your official tax information",
         "income information that was reported on your december account statement will not have included certain adjustments",
         "if your etrade account was transferred to morgan stanley smith barney llc in 2023 you may receive a separate 1099 consolidated tax statement",
         "consider and review both consolidated tax statements when preparing your 2023 income tax return",
         "for more information on what to expect, visit etrade.com/taxyear2023",
         "the following tax documents are not included in this statement and are sent individually",
-        "forms 1099-q, 1042-s, 2439, 5498, 5498-esa, remic information statement, schedule k-1 and puerto rico forms 480.6a, 480.6b, 480.6c and 480.6d"
-    ]
-   
-    for pat in con_unused:
-        if pat in lower:
-            return "Others", "Unused"  
-    #---------------------------Consolidated-1099----------------------------------#
+        "forms 1099-q, 1042-s, 2439, 5498, 5498-esa, remic information statement, schedule k-1 and puerto rico forms 480.6a, 480.6b, 480.6c and 480.6d",
+    ]),
 
     #---------------------------1099-INT----------------------------------#
-    #1099-INT for page 1
-    int_front = [
-        "3 Interest on U.S. Savings Bonds and Treasury obligations",
-        #"Investment expenses",
-        "Tax-exempt interest",
-        "ond premium on Treasury obligations",
+    # 🔁 Priority: 1099-INT > Unused
+    rule(240, "Income", "1099-INT", "lower", any_of=[
+        "3 interest on u.s. savings bonds and treasury obligations",
+        "tax-exempt interest",
+        "ond premium on treasury obligations",
         "withdrawal penalty",
-   
-    ]
-
-    int_unused = [
-        "Box 1. Shows taxable interest paid to you ",
-        "Box 2. Shows interest or principal forfeited",
-        "Box 3. Shows interest on U.S. Savings Bonds",
-        "Box 8. Shows tax-exempt interest paid to",
-        "Box 10. For a taxable or tax-exempt covered security",
+    ]),
+    rule(250, "Others", "Unused", "lower", any_of=[
+        "box 1. shows taxable interest paid to you ",
+        "box 2. shows interest or principal forfeited",
+        "box 3. shows interest on u.s. savings bonds",
+        "box 8. shows tax-exempt interest paid to",
+        "box 10. for a taxable or tax-exempt covered security",
         "if you are registered in the account",
         "subject to reporting when paid regardless",
-        "if we are required to withhold tax"
-    ]
-    lower = text.lower()
-    found_int_front = any(pat.lower() in lower for pat in int_front)
-    found_int_unused = any(pat.lower() in lower for pat in int_unused)
+        "if we are required to withhold tax",
+    ]),
 
-# 🔁 Priority: 1099-INT > Unused
-    if found_int_front:
-        return "Income", "1099-INT"
-    elif found_int_unused:
-        return "Others", "Unused"
-    #---------------------------1099-SA----------------------------------#
-    #1099-INT for page 1
-
-   
-    #---------------------------1098-Mortgage----------------------------------#    
-    #1098-Mortgage form page 1
-    mort_front = [
-    "Mortgage insurance premiums",
-    "Mortgage origination date",
-    "Number of properties securing the morgage",  # typo here, maybe fix to "mortgage"
-    "Address or description of property securing",
-    "form 1098 mortgage",
-    "limits based on the loan amount",
-    "refund of overpaid",
-    "Mortgage insurance important tax Information",
-    "mortgage origination date the information",
-    "1 mortgage interest received from",
-    #"Account number (see instructions)"
-    ]
-    mort_unused = [
+    #---------------------------1098-Mortgage----------------------------------#
+    # 🔁 Priority: 1098-Mortgage > Unused
+    rule(260, "Expenses", "1098-Mortgage", "lower", any_of=[
+        "mortgage insurance premiums",
+        "mortgage origination date",
+        "number of properties securing the morgage",
+        "address or description of property securing",
+        "form 1098 mortgage",
+        "limits based on the loan amount",
+        "refund of overpaid",
+        "mortgage insurance important tax information",
+        "mortgage origination date the information",
+        "1 mortgage interest received from",
+    ]),
+    rule(270, "Others", "Unused", "lower", any_of=[
         "instructions for payer/borrower",
         "payer’s/borrower’s taxpayer identification number",
         "box 1. shows the mortgage interest received",
-        "Box 1. Shows the mortgage interest received by the recipient",
-        "Box 3. Shows the date of the mortgage origination",
-        "Box 5. If an amount is reported in this box",
-        "Box 8. Shows the address or description",  # ← this line was missing a comma
-        "This information is being provided to you as",
-        "We’re providing the mortgage insurance",
-        "If you received this statement as the payer of",
-        "If your mortgage payments were subsidized"
-       
-    ]
-    lower = text.lower()
-    found_front = any(pat.lower() in lower for pat in mort_front)
-    found_unused = any(pat.lower() in lower for pat in mort_unused)
+        "box 1. shows the mortgage interest received by the recipient",
+        "box 3. shows the date of the mortgage origination",
+        "box 5. if an amount is reported in this box",
+        "box 8. shows the address or description",
+        "this information is being provided to you as",
+        "we’re providing the mortgage insurance",
+        "if you received this statement as the payer of",
+        "if your mortgage payments were subsidized",
+    ]),
+
+    # fallback form detectors
+    rule(280, "Income", "W-2", "norm", any_of=["w-2", "w2"]),
+    rule(290, "Income", "1099-INT", "norm", any_of=["1099-int", "interest income"]),
+    rule(300, "Expenses", "Donation", "lower", any_of=["donation", "volunteers greatly appreciate your"]),
+]
+_CLASSIFY_RULESET = RuleSet(CLASSIFY_RULES)
+
+
+def is_boilerplate(text: str) -> bool:
+    """True when a classification rule (not the no-match fallback) files the page as Unused."""
+    hit = _CLASSIFY_RULESET.match(text)
+    return hit is not None and hit["result"][1] == "Unused"
 
-# 🔁 Priority: 1098-Mortgage > Unused
-    if found_front:
-        return "Expenses", "1098-Mortgage"
-    elif found_unused:
-        return "Others", "Unused"
 
-    #---------------------------1098-Mortgage----------------------------------#
-#3) fallback form detectors
-    if 'w-2' in t or 'w2' in t: return 'Income', 'W-2'
-    if '1099-int' in t or 'interest income' in t: return 'Income', '1099-INT'
-    #if '1099-div' in t: return 'Income', '1099-DIV'
-    #if 'form 1099-div' in t: return 'Income', '1099-DIV'
-   
-    #if '1099' in t: return 'Income', '1099-Other'
-    front_donation = [
-        "donation",
-        "volunteers greatly appreciate your",
-        "Volunteers greatly appreciate your generous coma"
-    ]
-   
-    for pat in front_donation:
-        if pat in lower:
-            return "Expenses", "Donation"  
-    
-    return 'Unknown', 'Unused'
-
-   
-
-   
-# Detect W-2 pages by their header phrases
-    if 'wage and tax statement' in t or ("employer's name" in t and 'address' in t):
-        return 'Income', 'W-2'
+def classify_text(text: str) -> Tuple[str, str]:
+    hit = _CLASSIFY_RULESET.match(text)
+    if hit is None:
+        return 'Unknown', 'Unused'
+    if hit["result"][1] == "Child Care Expenses":
+        print(f"[DEBUG] CHILD CARE EXPENSE DETECTED in page: {text[:120]}...", file=sys.stderr)
+    return hit["result"]
    
 # --------------------------- 1095-C --------------------------- #
 def extract_1095c_bookmark(text: str) -> str:
@@ -1378,11 +2864,19 @@ def next_valid_line(lines, start_index, junk_phrases=None):
 
 
 
+# parse_w2 patterns, compiled once
+_SSN_RE = re.compile(r"\b(\d{3}-\d{2}-\d{4})\b")
+_EIN_RE = re.compile(r"\b(\d{2}-\d{7})\b")
+_W2_SALESFORCE_RE = re.compile(r"\bSALESFORCE[, ]+INC\.?\b", re.IGNORECASE)
+_W2_PAYROL_RE = re.compile(r".+\s*-\s*PAYROL", re.IGNORECASE)
+_W2_EMPLOYER_TAIL_RE = re.compile(r"\bb\s*employer.*", re.IGNORECASE)
+
+
 def parse_w2(text: str) -> Dict[str, str]:
     # SSN & EIN
-    ssn_m = re.search(r"\b(\d{3}-\d{2}-\d{4})\b", text)
+    ssn_m = _SSN_RE.search(text)
     ssn = ssn_m.group(1) if ssn_m else "N/A"
-    ein_m = re.search(r"\b(\d{2}-\d{7})\b", text)
+    ein_m = _EIN_RE.search(text)
     ein = ein_m.group(1) if ein_m else "N/A"
 
     lines = text.splitlines()
@@ -1391,7 +2885,7 @@ def parse_w2(text: str) -> Dict[str, str]:
     full_lower = text.lower()
    
     # 🚨 Hard-coded override for Salesforce
-    if re.search(r"\bSALESFORCE[, ]+INC\.?\b", text, flags=re.IGNORECASE):
+    if _W2_SALESFORCE_RE.search(text):
         emp_name = "SALESFORCE, INC"
         return {
             'ssn': ssn,
@@ -1426,11 +2920,11 @@ def parse_w2(text: str) -> Dict[str, str]:
     #DOTCOM TEAM LLC B Employer Verification number …
     for i, line in enumerate(lines):
     # Match anything ending with "- PAYROL"
-        if re.search(r".+\s*-\s*PAYROL", line, re.IGNORECASE):
+        if _W2_PAYROL_RE.search(line):
             raw = next_valid_line(lines, i + 1)   # ⬅ skip "PAYROL" line and junk
             if raw:
             # If line has "b Employer..." trailing text, strip it out
-                raw = re.sub(r"\bb\s*employer.*", "", raw, flags=re.IGNORECASE).strip()
+                raw = _W2_EMPLOYER_TAIL_RE.sub("", raw).strip()
 
             # Normalize (remove trailing numbers, extra spaces, etc.)
                 emp_name = normalize_entity_name(raw)
@@ -1473,7 +2967,7 @@ def parse_w2(text: str) -> Dict[str, str]:
     # 🔹 4) PAYROL fallback
     if emp_name == "N/A":
         for i, line in enumerate(lines):
-            if re.search(r".+\s*-\s*PAYROL", line, re.IGNORECASE):
+            if _W2_PAYROL_RE.search(line):
                 raw = next_valid_line(lines, i + 1)
                 if raw:
                     emp_name = normalize_entity_name(raw)
@@ -1525,6 +3019,58 @@ def print_w2_summary(info: Dict[str, str]):
 import re
 from typing import List
 
+# ── Institution name registry
+# Known payer / trustee display names live in institutions.json (one table
+# per form family) and compile once into PhraseMatchers. When several keys
+# occur in a page the longest one wins, so "synovus bank" is no longer
+# claimed by the shorter "us bank"; equal lengths fall back to file order.
+INSTITUTIONS_PATH = os.environ.get(
+    "INSTITUTIONS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "institutions.json"),
+)
+
+
+class InstitutionRegistry:
+    """Per-form tables of normalised name fragments → display names."""
+
+    def __init__(self, tables: Dict[str, Dict[str, str]]):
+        self.tables = tables
+        self._order = {name: {key: i for i, key in enumerate(t)} for name, t in tables.items()}
+        self._matchers = {name: PhraseMatcher(t) for name, t in tables.items()}
+
+    @classmethod
+    def load(cls, path: str = INSTITUTIONS_PATH) -> "InstitutionRegistry":
+        try:
+            with open(path, encoding="utf-8") as f:
+                return cls(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Institution registry unavailable ({path}): {e}")
+            return cls({})
+
+    def lookup(self, table: str, normalized_text: str) -> str | None:
+        """Display name for the most specific key found in the text, else None."""
+        matcher = self._matchers.get(table)
+        if matcher is None:
+            return None
+        hits = matcher.findall(normalized_text)
+        if not hits:
+            return None
+        order = self._order[table]
+        best = max(hits, key=lambda key: (len(key), -order[key]))
+        return self.tables[table][best]
+
+
+INSTITUTIONS = InstitutionRegistry.load()
+
+
+# extract_1099int_bookmark per-line patterns, compiled once
+_BOX_LINE_RE = re.compile(r"^\d+[\s.]")
+_ALL_CAPS_NAME_RE = re.compile(r"^[A-Z][A-Z\s&.,'-]{5,}$")
+_DIGIT_RE = re.compile(r"\d")
+_INT_NAME_TAIL_RE = re.compile(r"[^\w\s.&,'-]+$")
+_INT_NAME_TAIL_NO_COMMA_RE = re.compile(r"[^\w\s.&'-]+$")
+
+
 def extract_1099int_bookmark(text: str) -> str:
     """
     Extract a clean payer/institution name for Form 1099-INT.
@@ -1537,31 +3083,20 @@ def extract_1099int_bookmark(text: str) -> str:
     """
    
 
-    import re
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     lower_lines = [l.lower() for l in lines]
 
     # --- Step 1: Overrides for common institutions ---
-    overrides = {
-        "us bank na": "US Bank NA",
-        "u.s. bank na": "US Bank NA",
-        "capital one": "Capital One NA",
-        "bank of america": "Bank of America",
-        "digital federal credit union": "Digital Federal Credit Union",
-        "fifth third bank": "FIFTH THIRD BANK, N.A.",   # ✅ new override
-        "discover bank": "Discover Bank",
-        "goldman sachs bank usa": "Goldman Sachs Bank USA",  # ✅ new override
-    }
-    for key, val in overrides.items():
-        if key in text.lower():
-            return val
+    known = INSTITUTIONS.lookup("1099-INT", text.lower())
+    if known:
+        return known
 
     # --- Step 2: Top-down scan for bank-like names ---
     for cand in lines:
         cand_lower = cand.lower()
         if any(word in cand_lower for word in ["bank", "credit union", "mortgage", "trust", "financial"]):
             # strip trailing garbage like punctuation
-            return re.sub(r"[^\w\s.&,'-]+$", "", cand).strip()
+            return _INT_NAME_TAIL_RE.sub("", cand).strip()
        
     # --- Step 3: Look after payer header (if available) ---
     for i, l in enumerate(lower_lines):
@@ -1577,12 +3112,12 @@ def extract_1099int_bookmark(text: str) -> str:
                               "street", "road", "apt", "zip"]
                 if any(bad in cand_lower for bad in bad_tokens):
                     continue
-                if re.match(r"^\d+[\s.]", cand):  # skip box lines
+                if _BOX_LINE_RE.match(cand):  # skip box lines
                     continue
 
-                if (re.match(r"^[A-Z][A-Z\s&.,'-]{5,}$", cand) and not re.search(r"\d", cand)) \
+                if (_ALL_CAPS_NAME_RE.match(cand) and not _DIGIT_RE.search(cand)) \
                    or any(word in cand_lower for word in ["bank", "credit union", "mortgage", "trust", "financial"]):
-                    return re.sub(r"[^\w\s.&'-]+$", "", cand).strip()
+                    return _INT_NAME_TAIL_NO_COMMA_RE.sub("", cand).strip()
     # --- Step 4: Global scan again as a last resort ---
     for cand in lines:
         cand_lower = cand.lower()
@@ -1590,11 +3125,11 @@ def extract_1099int_bookmark(text: str) -> str:
                       "street", "road", "apt", "zip"]
         if any(bad in cand_lower for bad in bad_tokens):
             continue
-        if re.match(r"^\d+[\s.]", cand):
+        if _BOX_LINE_RE.match(cand):
             continue
 
         if any(word in cand_lower for word in ["bank", "credit union", "mortgage", "trust", "financial"]):
-            return re.sub(r"[^\w\s.&'-]+$", "", cand).strip()
+            return _INT_NAME_TAIL_NO_COMMA_RE.sub("", cand).strip()
 
 
     # --- Step 4: Fallback ---
@@ -1718,33 +3253,31 @@ def extract_consolidated_issuer(text: str) -> str | None:
     return None
 # --------------------------- Consolidated-1099 issuer name --------------------------- #
 #---------------------------1099-DIV----------------------------------#
+# extract_1099div_bookmark patterns, compiled once
+_NON_ALNUM_SPACE_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RUN_RE = re.compile(r"\s+")
+_PIPE_TAIL_RE = re.compile(r"\s*\|.*$")
+_DOLLAR_TAIL_RE = re.compile(r"\s*\$.*$")
+_DIV_NAME_TAIL_RE = re.compile(r"[^\w\s,&.\-]+$")
+_FORM_WORD_RE = re.compile(r"\bform\b")
+_LETTER_RE = re.compile(r"[A-Za-z]")
+_DIV_ORG_RE = re.compile(r"\b(LLC|Inc|Fund|Trust|Bank|Corp|Company|Services|Advisors)\b", re.IGNORECASE)
+
+
 def extract_1099div_bookmark(text: str) -> str:
     """
     Extract the payer name for Form 1099-DIV.
     Handles OCR noise, skips junk lines, and applies direct overrides
     for known payers like Fundrise, Bank of America, etc.
     """
-    import re
-
     # --- Step 1: normalize text for pattern matching ---
-    normalized_text = re.sub(r"[^a-z0-9\s]", " ", text.lower())
-    normalized_text = re.sub(r"\s+", " ", normalized_text).strip()
+    normalized_text = _NON_ALNUM_SPACE_RE.sub(" ", text.lower())
+    normalized_text = _WHITESPACE_RUN_RE.sub(" ", normalized_text).strip()
 
     # --- Step 2: hardcoded overrides (fast exact detection) ---
-    OVERRIDES = {
-        "fundrise income real estate fund": "Fundrise Income Real Estate Fund, LLC",
-        "fundrise income fund": "Fundrise Income Fund, LLC",
-        # 🔹 Morgan Stanley (new)
-        "morgan stanley domestic holdings": "Morgan Stanley Domestic Holdings, Inc",
-        "morgan stanley domestic holding": "Morgan Stanley Domestic Holdings, Inc",
-        "morgan stanley holdings inc": "Morgan Stanley Domestic Holdings, Inc",
-        "morgan stanley holdings": "Morgan Stanley Domestic Holdings, Inc",
-   
-    }
-
-    for key, val in OVERRIDES.items():
-        if key in normalized_text:
-            return val  # ✅ immediate return on match
+    known = INSTITUTIONS.lookup("1099-DIV", normalized_text)
+    if known:
+        return known  # ✅ immediate return on match
 
     # --- Step 3: fallback pattern-based extraction ---
     lines = text.splitlines()
@@ -1776,9 +3309,9 @@ def extract_1099div_bookmark(text: str) -> str:
                     continue
 
                 # Clean unwanted right-hand text
-                candidate = re.sub(r"\s*\|.*$", "", candidate)   # remove trailing table/columns
-                candidate = re.sub(r"\s*\$.*$", "", candidate)   # remove dollar values
-                candidate = re.sub(r"[^\w\s,&.\-]+$", "", candidate).strip()
+                candidate = _PIPE_TAIL_RE.sub("", candidate)   # remove trailing table/columns
+                candidate = _DOLLAR_TAIL_RE.sub("", candidate)   # remove dollar values
+                candidate = _DIV_NAME_TAIL_RE.sub("", candidate).strip()
 
                 if candidate:
                     return candidate
@@ -1800,18 +3333,18 @@ def extract_1099div_bookmark(text: str) -> str:
                     ]):
                         continue
 
-                    if re.search(r"\bform\b", cand_lower):
+                    if _FORM_WORD_RE.search(cand_lower):
                         continue
-                    if len(cand) < 5 or not re.search(r"[A-Za-z]", cand):
+                    if len(cand) < 5 or not _LETTER_RE.search(cand):
                         continue
 
                     # If looks like an organization name
-                    if re.search(r"\b(LLC|Inc|Fund|Trust|Bank|Corp|Company|Services|Advisors)\b", cand, re.IGNORECASE):
-                        cand = re.sub(r"\s*\$.*$", "", cand)
+                    if _DIV_ORG_RE.search(cand):
+                        cand = _DOLLAR_TAIL_RE.sub("", cand)
                         return cand.strip(" ,.-")
 
                     # fallback
-                    fallback = re.sub(r"[^\w\s,&.-]+$", "", cand).strip()
+                    fallback = _DIV_NAME_TAIL_RE.sub("", cand).strip()
                     if fallback:
                         return fallback
         return None
@@ -1836,6 +3369,20 @@ def clean_bookmark(name: str) -> str:
     cleaned = re.sub(r"\bInterest.*$", "", name, flags=re.IGNORECASE)
     return cleaned.strip()
 
+# extract_1099r_bookmark per-line patterns, compiled once
+_R_SECTION_END_RE = re.compile(r"(recipient's|account number|department|form\s*1099|treasury|omb\s*no)", re.I)
+_R_RETIREMENT_OR_RE = re.compile(r"(?i)retirement\s*or")
+_R_RETIREMENT_OR_TAIL_RE = re.compile(r"(?i)\s*Retirement\s*or\s*$")
+_R_AMOUNT_TAIL_RE = re.compile(r"(?i)\$?\d.*$")
+_R_FORM_TAIL_RE = re.compile(r"(?i)\bForm\s*1099.*$")
+_R_CONTRACTS_TAIL_RE = re.compile(r"(?i)\bContracts.*$")
+_R_INSURANCE_TAIL_RE = re.compile(r"(?i)\bInsurance.*$")
+_R_NUMBER_RUN_RE = re.compile(r"\d{3,}")
+_R_ADDRESS_RE = re.compile(r"(street|city|state|zip|address|drive|road|way|blvd)", re.I)
+_R_CONTINUATION_STOP_RE = re.compile(r"\d|city|state|zip|address|form|recipient|account", re.I)
+_R_CAPS_CONTINUATION_RE = re.compile(r"^[A-Z][A-Z\s&.,'-]{3,}$")
+
+
 #1099-R
 def extract_1099r_bookmark(text: str) -> str:
     """
@@ -1844,7 +3391,6 @@ def extract_1099r_bookmark(text: str) -> str:
       - 'country, ZIP or foreign postal code, and telephone no.' layout (Schwab)
       - 'PAYER’S name, street address...' layout (Fidelity, Vanguard, etc.)
     """
-    import re
     lines = [l.strip() for l in text.splitlines() if l.strip()]
     lower_lines = [l.lower() for l in lines]
     for i, line in enumerate(lines):
@@ -1858,26 +3404,24 @@ def extract_1099r_bookmark(text: str) -> str:
                     break
                 cand = lines[i + offset].strip()
                 # Stop if we hit unrelated sections
-                if re.search(
-                    r"(recipient's|account number|department|form\s*1099|treasury|omb\s*no)", cand, re.I
-                ):
+                if _R_SECTION_END_RE.search(cand):
                     break
                 # Skip empty or generic lines
                 if not cand:
                     continue
                 # Skip "Retirement or" and trim if attached
-                if re.fullmatch(r"(?i)retirement\s*or", cand):
+                if _R_RETIREMENT_OR_RE.fullmatch(cand):
                     continue
-                cand = re.sub(r"(?i)\s*Retirement\s*or\s*$", "", cand).strip()
+                cand = _R_RETIREMENT_OR_TAIL_RE.sub("", cand).strip()
                 # Remove noise like $amounts, “Form 1099-R Contracts, etc.”
-                cand = re.sub(r"(?i)\$?\d.*$", "", cand)
-                cand = re.sub(r"(?i)\bForm\s*1099.*$", "", cand)
-                cand = re.sub(r"(?i)\bContracts.*$", "", cand)
-                cand = re.sub(r"(?i)\bInsurance.*$", "", cand)
+                cand = _R_AMOUNT_TAIL_RE.sub("", cand)
+                cand = _R_FORM_TAIL_RE.sub("", cand)
+                cand = _R_CONTRACTS_TAIL_RE.sub("", cand)
+                cand = _R_INSURANCE_TAIL_RE.sub("", cand)
                 # Skip addresses or numeric-heavy lines
-                if re.search(r"\d{3,}", cand):
+                if _R_NUMBER_RUN_RE.search(cand):
                     continue
-                if re.search(r"(street|city|state|zip|address|drive|road|way|blvd)", cand, re.I):
+                if _R_ADDRESS_RE.search(cand):
                     continue
                 # --- Check for continuation line (next line looks like part of company name) ---
                 next_line = (
@@ -1887,12 +3431,12 @@ def extract_1099r_bookmark(text: str) -> str:
                 )
                 if (
                     next_line
-                    and not re.search(r"\d|city|state|zip|address|form|recipient|account", next_line, re.I)
-                    and re.match(r"^[A-Z][A-Z\s&.,'-]{3,}$", next_line)
+                    and not _R_CONTINUATION_STOP_RE.search(next_line)
+                    and _R_CAPS_CONTINUATION_RE.match(next_line)
                 ):
                     cand = f"{cand} {next_line}".strip()
                 # Accept likely company name
-                if len(cand.split()) >= 2 and not re.search(r"\d", cand):
+                if len(cand.split()) >= 2 and not _DIGIT_RE.search(cand):
                     return cand.title()
             break
     return "1099-R"
@@ -2016,1380 +3560,10 @@ def extract_1099sa_bookmark(text: str) -> str:
     )
     # --- Rule -1: Explicit overrides ---
     
-    OVERRIDES = {
-    # --- Known OCR Fixes / Existing ---
-        "healthequity inc": "HealthEquity Inc.",
-        # --- New: Bank of New York Mellon variations ---
-        "the bank of new york mellon": "The Bank of New York Mellon",
-        "the bank of new yok mellon": "The Bank of New York Mellon",   # common OCR missing 'r'
-        "bank of new york mellon": "The Bank of New York Mellon",
-        "bank of new yok mellon": "The Bank of New York Mellon",
-        "coudl u add for thi stex t also": "The Bank of New York Mellon", 
-        "optum bank inc": "Optum Bank Inc.",
-        "fidelity investments hsa": "Fidelity Investments HSA",
-        "hsa bank": "HSA Bank (Webster Bank N.A.)",
-        "hsa bank webster bank": "HSA Bank (Webster Bank N.A.)",
-        "hsa bank webster bank na": "HSA Bank (Webster Bank N.A.)",
-        "lively hsa inc": "Lively HSA Inc.",
-        "bank of america hsa services": "Bank of America HSA Services",
-        "umb bank": "UMB Bank N.A.",
-        "umb bank na": "UMB Bank N.A.",
-        "first american bank": "First American Bank",
-        "wells fargo bank": "Wells Fargo Bank N.A.",
-        "wells fargo bank na": "Wells Fargo Bank N.A.",
-        "jpmorgan chase bank": "JPMorgan Chase Bank N.A.",
-        "jpmorgan chase bank na": "JPMorgan Chase Bank N.A.",
-        "associated bank": "Associated Bank N.A.",
-        "associated bank na": "Associated Bank N.A.",
-        "fifth third bank": "Fifth Third Bank N.A.",
-        "fifth third bank na": "Fifth Third Bank N.A.",
-        "keybank": "KeyBank N.A.",
-        "keybank na": "KeyBank N.A.",
-        "payflex": "PayFlex (Aetna)",
-        "payflex aetna": "PayFlex (Aetna)",
-        #"benefitwallet": "BenefitWallet (Conduent)",
-        "benefitwallet conduent": "BenefitWallet (Conduent)",
-        "bend hsa inc": "Bend HSA Inc.",
-        "saturna capital": "Saturna Capital (HSA Investing)",
-        "saturna capital hsa investing": "Saturna Capital (HSA Investing)",
-        "further": "Further (Health Savings Admin by BCBS MN)",
-        "further health savings admin": "Further (Health Savings Admin by BCBS MN)",
-        "elements financial credit union": "Elements Financial Credit Union",
-        "patelco credit union": "Patelco Credit Union",
-        "digital federal credit union": "Digital Federal Credit Union (DCU)",
-        "digital federal credit union dcu": "Digital Federal Credit Union (DCU)",
-        "america first credit union": "America First Credit Union",
-        "golden 1 credit union": "Golden 1 Credit Union",
-        "truist bank": "Truist Bank",
-        "pnc bank": "PNC Bank N.A.",
-        "pnc bank na": "PNC Bank N.A.",
-        "regions bank": "Regions Bank",
-        "us bank": "U.S. Bank N.A.",
-        "us bank na": "U.S. Bank N.A.",
-        "comerica bank": "Comerica Bank",
-        "citizens bank": "Citizens Bank N.A.",
-        "citizens bank na": "Citizens Bank N.A.",
-        "first horizon bank": "First Horizon Bank",
-        "hancock whitney bank": "Hancock Whitney Bank",
-        "zions bank": "Zions Bank N.A.",
-        "zions bank na": "Zions Bank N.A.",
-        "frost bank": "Frost Bank",
-        "old national bank": "Old National Bank",
-        "synovus bank": "Synovus Bank",
-        "bok financial": "BOK Financial (Bank of Oklahoma)",
-        "bok financial bank of oklahoma": "BOK Financial (Bank of Oklahoma)",
-        "commerce bank": "Commerce Bank",
-        "first interstate bank": "First Interstate Bank",
-        "glacier bank": "Glacier Bank",
-        "banner bank": "Banner Bank",
-        "first citizens bank": "First Citizens Bank",
-        "huntington national bank": "Huntington National Bank",
-        "associated healthcare credit union": "Associated Healthcare Credit Union",
-        "advia credit union": "Advia Credit Union",
-        "premier america credit union": "Premier America Credit Union",
-        "bethpage federal credit union": "Bethpage Federal Credit Union",
-        "mountain america credit union": "Mountain America Credit Union",
-        "alliant credit union": "Alliant Credit Union",
-        "penfed credit union": "PenFed Credit Union",
-        "navy federal credit union": "Navy Federal Credit Union",
-        "schoolsfirst federal credit union": "SchoolsFirst Federal Credit Union",
-        "boeing employees credit union": "Boeing Employees Credit Union (BECU)",
-        "boeing employees credit union becu": "Boeing Employees Credit Union (BECU)",
-        "space coast credit union": "Space Coast Credit Union",
-        "redstone federal credit union": "Redstone Federal Credit Union",
-        "desert financial credit union": "Desert Financial Credit Union",
-        "gesa credit union": "Gesa Credit Union",
-        "bellco credit union": "Bellco Credit Union",
-        "ent credit union": "Ent Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "randolph brooks federal credit union": "Randolph-Brooks Federal Credit Union (RBFCU)",
-        "randolph brooks federal credit union rbfcu": "Randolph-Brooks Federal Credit Union (RBFCU)",
-        "american airlines federal credit union": "American Airlines Federal Credit Union",
-        "delta community credit union": "Delta Community Credit Union",
-        "state employees credit union": "State Employees’ Credit Union (SECU)",
-        "vantage west credit union": "Vantage West Credit Union",
-        "oregon community credit union": "Oregon Community Credit Union",
-        "truwest credit union": "TruWest Credit Union",
-        "lasso healthcare msa": "Lasso Healthcare MSA",
-        "unitedhealthcare msa plans": "UnitedHealthcare MSA Plans",
-        "humana msa plans": "Humana MSA Plans",
-        "blue cross blue shield msa plans": "Blue Cross Blue Shield MSA Plans",
-        "vibrant usa msa plans": "Vibrant USA MSA Plans",
-        "healthsavings administrators": "HealthSavings Administrators",
-        "connectyourcare": "ConnectYourCare (now Optum)",
-        "connectyourcare now optum": "ConnectYourCare (now Optum)",
-        "benefit resource inc": "Benefit Resource Inc.",
-        "hsa authority": "HSA Authority (Old National Bank Division)",
-        "hsa authority old national bank division": "HSA Authority (Old National Bank Division)",
-        "selectaccount": "SelectAccount (HealthEquity)",
-        "selectaccount healthequity": "SelectAccount (HealthEquity)",
-        "starship hsa": "Starship HSA",
-        "first bank and trust": "First Bank & Trust",
-        "peoples bank midwest": "Peoples Bank Midwest",
-        "choice bank": "Choice Bank",
-        "midwestone bank": "MidWestOne Bank",
-        "first financial bank": "First Financial Bank",
-        "cadence bank": "Cadence Bank",
-        "great southern bank": "Great Southern Bank",
-        "independent bank": "Independent Bank",
-        "origin bank": "Origin Bank",
-        "texas capital bank": "Texas Capital Bank",
-        "pinnacle financial partners": "Pinnacle Financial Partners",
-        "columbia bank": "Columbia Bank",
-        "townebank": "TowneBank",
-        "bank ozk": "Bank OZK",
-        "firstbank": "FirstBank (TN)",
-        "firstbank tn": "FirstBank (TN)",
-        "glacier hills credit union": "Glacier Hills Credit Union",
-        "security health savings": "Security Health Savings",
-        "bell bank": "Bell Bank",
-        "banner life insurance co": "Banner Life Insurance Co.",
-        "farmers and merchants bank": "Farmers & Merchants Bank",
-        "first national bank of omaha": "First National Bank of Omaha",
-        "arvest bank": "Arvest Bank",
-        "bancorpsouth bank": "BancorpSouth Bank",
-        "bank of tampa": "Bank of Tampa",
-        "bank of the west": "Bank of the West",
-        "bb&t": "BB&T (now Truist)",
-        "bb&t now truist": "BB&T (now Truist)",
-        "beneficial bank": "Beneficial Bank",
-        "bmo harris bank": "BMO Harris Bank N.A.",
-        "bmo harris bank na": "BMO Harris Bank N.A.",
-        "california bank and trust": "California Bank & Trust",
-        "cambridge trust company": "Cambridge Trust Company",
-        "capital one bank": "Capital One Bank N.A.",
-        "capital one bank na": "Capital One Bank N.A.",
-        "centier bank": "Centier Bank",
-        "central bank and trust co": "Central Bank & Trust Co.",
-        "citizens equity first credit union": "Citizens Equity First Credit Union (CEFCU)",
-        "citizens equity first credit union cefcu": "Citizens Equity First Credit Union (CEFCU)",
-        "community america credit union": "Community America Credit Union",
-        "community bank": "Community Bank N.A.",
-        "community bank na": "Community Bank N.A.",
-        "cornerstone community credit union": "Cornerstone Community Credit Union",
-        "country bank for savings": "Country Bank for Savings",
-        "credit human federal credit union": "Credit Human Federal Credit Union",
-        "dearborn federal savings bank": "Dearborn Federal Savings Bank",
-        "dedham savings bank": "Dedham Savings Bank",
-        "deere employees credit union": "Deere Employees Credit Union",
-        "denali federal credit union": "Denali Federal Credit Union",
-        "dugood federal credit union": "DuGood Federal Credit Union",
-        "elevations credit union": "Elevations Credit Union",
-        "emprise bank": "Emprise Bank",
-        "everence federal credit union": "Everence Federal Credit Union",
-        "farm bureau bank": "Farm Bureau Bank FSB",
-        "farm bureau bank fsb": "Farm Bureau Bank FSB",
-        "first community bank": "First Community Bank",
-        "first federal bank of the midwest": "First Federal Bank of the Midwest",
-        "first merchants bank": "First Merchants Bank",
-        "first mid bank and trust": "First Mid Bank & Trust",
-        "first republic bank": "First Republic Bank",
-        "first united bank and trust": "First United Bank & Trust Co.",
-        "first united bank and trust co": "First United Bank & Trust Co.",
-        "flagstar bank": "Flagstar Bank",
-        "fulton bank": "Fulton Bank N.A.",
-        "fulton bank na": "Fulton Bank N.A.",
-        "gateway bank": "Gateway Bank",
-        "georgias own credit union": "Georgia’s Own Credit Union",
-        "great plains bank": "Great Plains Bank",
-        "great western bank": "Great Western Bank",
-        "greenstate credit union": "GreenState Credit Union",
-        "guaranty bank and trust company": "Guaranty Bank & Trust Company",
-        "heritage bank of commerce": "Heritage Bank of Commerce",
-        "homestreet bank": "HomeStreet Bank",
-        "intouch credit union": "InTouch Credit Union",
-        "investors bank": "Investors Bank",
-        "johnson financial group bank": "Johnson Financial Group Bank",
-        "kinecta federal credit union": "Kinecta Federal Credit Union",
-        "lake city bank": "Lake City Bank",
-        "liberty bank": "Liberty Bank N.A.",
-        "liberty bank na": "Liberty Bank N.A.",
-        "lincoln savings bank": "Lincoln Savings Bank",
-        "mainstreet credit union": "Mainstreet Credit Union",
-        "marine federal credit union": "Marine Federal Credit Union",
-        "marquette bank": "Marquette Bank",
-        "mechanics bank": "Mechanics Bank",
-        "merchants bank of indiana": "Merchants Bank of Indiana",
-        "midfirst bank": "MidFirst Bank",
-        "midland states bank": "Midland States Bank",
-        "mutualone bank": "MutualOne Bank",
-        "nicolet national bank": "Nicolet National Bank",
-        "north island credit union": "North Island Credit Union",
-        "north shore bank": "North Shore Bank",
-        "northwest bank": "Northwest Bank",
-        "old point national bank": "Old Point National Bank",
-        "p1fcu": "P1FCU (Potlatch No. 1 Financial CU)",
-        "pathfinder bank": "Pathfinder Bank",
-        "patriot federal credit union": "Patriot Federal Credit Union",
-        "peoples trust credit union": "Peoples Trust Credit Union",
-        "provident bank of new jersey": "Provident Bank of New Jersey",
-        "quorum federal credit union": "Quorum Federal Credit Union",
-        "renasant bank": "Renasant Bank",
-        "republic bank and trust company": "Republic Bank & Trust Company",
-        "river city bank": "River City Bank",
-        "rockland trust company": "Rockland Trust Company",
-        "rocky mountain bank": "Rocky Mountain Bank",
-        "rogue credit union": "Rogue Credit Union",
-        "salem five bank": "Salem Five Bank",
-        "san diego county credit union": "San Diego County Credit Union",
-        "seattle bank": "Seattle Bank",
-        "service credit union": "Service Credit Union",
-        "shore united bank": "Shore United Bank",
-        "simmons bank": "Simmons Bank",
-        "south state bank": "South State Bank",
-        "southern bank and trust co": "Southern Bank & Trust Co.",
-        "space city credit union": "Space City Credit Union",
-        "stellar one bank": "Stellar One Bank",
-        "stockman bank of montana": "Stockman Bank of Montana",
-        "summit credit union": "Summit Credit Union",
-        "sunflower bank": "Sunflower Bank N.A.",
-        "sunflower bank na": "Sunflower Bank N.A.",
-        "tcf bank": "TCF Bank (now Huntington)",
-        "tcf bank now huntington": "TCF Bank (now Huntington)",
-        "texas bank and trust company": "Texas Bank and Trust Company",
-        "the commerce bank of washington": "The Commerce Bank of Washington",
-        "towpath credit union": "Towpath Credit Union",
-        "tompkins trust company": "Tompkins Trust Company",
-        "tower federal credit union": "Tower Federal Credit Union",
-        "town and country bank": "Town & Country Bank",
-        "tri counties bank": "Tri Counties Bank",
-        "triad bank": "Triad Bank",
-        "tricity credit union": "TriCity Credit Union",
-        "tristate capital bank": "TriState Capital Bank",
-        "trustco bank": "TrustCo Bank",
-        "tulsa federal credit union": "Tulsa Federal Credit Union",
-        "ufirst credit union": "UFirst Credit Union",
-        "umb healthcare services": "UMB Healthcare Services",
-        "unify financial credit union": "Unify Financial Credit Union",
-        "union state bank": "Union State Bank",
-        "united bank": "United Bank (WV)",
-        "united bank wv": "United Bank (WV)",
-        "united community bank": "United Community Bank (GA)",
-        "united community bank ga": "United Community Bank (GA)",
-        "united federal credit union": "United Federal Credit Union",
-        "university federal credit union": "University Federal Credit Union (TX)",
-        "university federal credit union tx": "University Federal Credit Union (TX)",
-        "university of wisconsin credit union": "University of Wisconsin Credit Union",
-        "usaa federal savings bank": "USAA Federal Savings Bank",
-        "utah first credit union": "Utah First Credit Union",
-        "valley strong credit union": "Valley Strong Credit Union",
-        "veritex community bank": "Veritex Community Bank",
-        "vermont federal credit union": "Vermont Federal Credit Union",
-        "vibe credit union": "Vibe Credit Union",
-        "virginia credit union": "Virginia Credit Union",
-        "visions federal credit union": "Visions Federal Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "wafd bank": "WaFd Bank (Washington Federal Bank)",
-        "wafd bank washington federal bank": "WaFd Bank (Washington Federal Bank)",
-        "wallis bank": "Wallis Bank",
-        "waterstone bank": "WaterStone Bank",
-        "waukesha state bank": "Waukesha State Bank",
-        "webster five cents savings bank": "Webster Five Cents Savings Bank",
-        "wesbanco bank": "WesBanco Bank Inc.",
-        "wesbanco bank inc": "WesBanco Bank Inc.",
-        "westfield bank": "Westfield Bank",
-        "wheaton bank and trust": "Wheaton Bank & Trust",
-        "whitefish credit union": "Whitefish Credit Union",
-        "wilmington savings fund society": "Wilmington Savings Fund Society (WSFS Bank)",
-        "wilmington savings fund society wsfs bank": "Wilmington Savings Fund Society (WSFS Bank)",
-        "winchester savings bank": "Winchester Savings Bank",
-        "wintrust financial corp": "Wintrust Financial Corp.",
-        "wright patt credit union": "Wright-Patt Credit Union",
-        "wyhy federal credit union": "WyHy Federal Credit Union",
-        "xceed financial credit union": "Xceed Financial Credit Union",
-        "abbybank": "AbbyBank",
-        "adams bank and trust": "Adams Bank & Trust",
-        "adirondack bank": "Adirondack Bank",
-        "advantage bank": "Advantage Bank",
-        "aimbank": "AIMBank",
-        "alabama credit union": "Alabama Credit Union",
-        "albina community bank": "Albina Community Bank",
-        "alliance bank central texas": "Alliance Bank Central Texas",
-        "alpine bank": "Alpine Bank",
-        "amalgamated bank of chicago": "Amalgamated Bank of Chicago",
-        "amboy bank": "Amboy Bank",
-        "american bank and trust": "American Bank & Trust (SD)",
-        "american bank and trust sd": "American Bank & Trust (SD)",
-        "american bank and trust company": "American Bank & Trust Company (LA)",
-        "american bank and trust company la": "American Bank & Trust Company (LA)",
-        "american eagle financial credit union": "American Eagle Financial Credit Union",
-        "american first credit union": "American First Credit Union",
-        "american heritage bank": "American Heritage Bank",
-        "american heritage credit union": "American Heritage Credit Union",
-        "americu credit union": "AmeriCU Credit Union",
-        "androscoggin bank": "Androscoggin Bank",
-        "anstaff bank": "Anstaff Bank",
-        "appalachian community fcu": "Appalachian Community FCU",
-        "apple bank for savings": "Apple Bank for Savings",
-        "aptiva bank": "Aptiva Bank",
-        "arbor bank": "Arbor Bank",
-        "arcola first bank": "Arcola First Bank",
-        "armed forces bank": "Armed Forces Bank",
-        "arrowhead credit union": "Arrowhead Credit Union",
-        "artisans bank": "Artisans Bank",
-        "ascentra credit union": "Ascentra Credit Union",
-        "asheville savings bank": "Asheville Savings Bank",
-        "atlantic city federal credit union": "Atlantic City Federal Credit Union",
-        "atlantic federal credit union": "Atlantic Federal Credit Union (ME)",
-        "atlantic federal credit union me": "Atlantic Federal Credit Union (ME)",
-        "atlantic stewardship bank": "Atlantic Stewardship Bank",
-        "auburn community federal credit union": "Auburn Community Federal Credit Union",
-        "austin bank": "Austin Bank",
-        "baker boyer bank": "Baker Boyer Bank",
-        "ballston spa national bank": "Ballston Spa National Bank",
-        "bank five nine": "Bank Five Nine",
-        "bank iowa": "Bank Iowa",
-        "bank midwest": "Bank Midwest (MN)",
-        "bank midwest mn": "Bank Midwest (MN)",
-        "bank of bozeman": "Bank of Bozeman",
-        "bank of clarke county": "Bank of Clarke County",
-        "bank of colorado": "Bank of Colorado",
-        "bank of desoto": "Bank of Desoto",
-        "bank of eastern oregon": "Bank of Eastern Oregon",
-        "bank of george": "Bank of George",
-        "bank of hawaii": "Bank of Hawaii (HSA Division)",
-        "bank of hawaii hsa division": "Bank of Hawaii (HSA Division)",
-        "bank of jackson hole": "Bank of Jackson Hole",
-        "bank of little rock": "Bank of Little Rock",
-        "bank of north carolina": "Bank of North Carolina (merged with Pinnacle)",
-        "bank of north carolina merged with pinnacle": "Bank of North Carolina (merged with Pinnacle)",
-        "bank of prairie du sac": "Bank of Prairie du Sac",
-        "bank of san francisco": "Bank of San Francisco",
-        "bank of tennessee": "Bank of Tennessee",
-        "bank of travelers rest": "Bank of Travelers Rest",
-        "bank of washington": "Bank of Washington",
-        "bank rhode island": "Bank Rhode Island",
-        "bankers trust company": "Bankers Trust Company",
-        "bankfirst financial services": "BankFirst Financial Services",
-        "banner county bank": "Banner County Bank",
-        "baraboo state bank": "Baraboo State Bank",
-        "bath savings institution": "Bath Savings Institution",
-        "baxter credit union": "Baxter Credit Union (BECU subsidiary)",
-        "baxter credit union becu subsidiary": "Baxter Credit Union (BECU subsidiary)",
-        "bay federal credit union": "Bay Federal Credit Union",
-        "baycoast bank": "BayCoast Bank",
-        "bayvanguard bank": "BayVanguard Bank",
-        "beacon credit union": "Beacon Credit Union",
-        "beaumont community credit union": "Beaumont Community Credit Union",
-        "belco community credit union": "Belco Community Credit Union",
-        "bellwood cu": "Bellwood CU",
-        "benchmark bank": "Benchmark Bank (TX)",
-        "benchmark bank tx": "Benchmark Bank (TX)",
-        "beneficial state bank": "Beneficial State Bank",
-        "benton state bank": "Benton State Bank",
-        "berkshire bank": "Berkshire Bank",
-        "beverly bank": "Beverly Bank",
-        "big horn federal savings bank": "Big Horn Federal Savings Bank",
-        "black hills federal credit union": "Black Hills Federal Credit Union",
-        "bluff view bank": "Bluff View Bank",
-        "blue ridge bank": "Blue Ridge Bank N.A.",
-        "blue ridge bank na": "Blue Ridge Bank N.A.",
-        "bmi federal credit union": "BMI Federal Credit Union",
-        "bogota savings bank": "Bogota Savings Bank",
-        "boone bank and trust": "Boone Bank & Trust Co.",
-        "boone bank and trust co": "Boone Bank & Trust Co.",
-        "boston firefighters credit union": "Boston Firefighters Credit Union",
-        "brannen bank": "Brannen Bank",
-        "bridgewater credit union": "Bridgewater Credit Union",
-        "brightstar credit union": "BrightStar Credit Union",
-        "broadview federal credit union": "Broadview Federal Credit Union",
-        "brookline bank": "Brookline Bank",
-        "brotherhood credit union": "Brotherhood Credit Union",
-        "buckeye state bank": "Buckeye State Bank",
-        "buffalo federal bank": "Buffalo Federal Bank",
-        "butte community bank": "Butte Community Bank",
-        "cabot and company bankers": "Cabot & Company Bankers",
-        "california credit union": "California Credit Union",
-        "cambridge savings bank": "Cambridge Savings Bank",
-        "camden national bank": "Camden National Bank",
-        "canandaigua federal credit union": "Canandaigua Federal Credit Union",
-        "cape ann savings bank": "Cape Ann Savings Bank",
-        "capital city bank": "Capital City Bank",
-        "capital community bank": "Capital Community Bank (CCBank)",
-        "capital community bank ccbank": "Capital Community Bank (CCBank)",
-        "capitol federal savings bank": "Capitol Federal Savings Bank",
-        "carolina foothills federal credit union": "Carolina Foothills Federal Credit Union",
-        "carter bank and trust": "Carter Bank & Trust",
-        "cascade community credit union": "Cascade Community Credit Union",
-        "cathay bank": "Cathay Bank",
-        "cbs bank": "CB&S Bank",
-        "zia credit union": "Zia Credit Union",
-        "cbi bank and trust": "CBI Bank & Trust",
-        "centennial bank": "Centennial Bank (AR)",
-        "centennial bank ar": "Centennial Bank (AR)",
-        "centerstate bank": "CenterState Bank",
-        "centric bank": "Centric Bank",
-        "central bank": "Central Bank (UT)",
-        "central bank ut": "Central Bank (UT)",
-        "central pacific bank": "Central Pacific Bank",
-        "century bank": "Century Bank (MA)",
-        "century bank ma": "Century Bank (MA)",
-        "chambers bank": "Chambers Bank",
-        "charles river bank": "Charles River Bank",
-        "chelsea state bank": "Chelsea State Bank",
-        "chemung canal trust company": "Chemung Canal Trust Company",
-        "cherokee state bank": "Cherokee State Bank",
-        "chesapeake bank": "Chesapeake Bank",
-        "chittenden bank": "Chittenden Bank",
-        "choiceone bank": "ChoiceOne Bank",
-        "citizens bank of las cruces": "Citizens Bank of Las Cruces",
-        "citizens bank of west virginia": "Citizens Bank of West Virginia",
-        "citizens first bank": "Citizens First Bank (FL)",
-        "citizens first bank fl": "Citizens First Bank (FL)",
-        "citizens national bank of texas": "Citizens National Bank of Texas",
-        "citizens state bank of loyal": "Citizens State Bank of Loyal",
-        "city and county credit union": "City & County Credit Union",
-        "city national bank of florida": "City National Bank of Florida",
-        "clackamas county bank": "Clackamas County Bank",
-        "classic bank": "Classic Bank N.A.",
-        "classic bank na": "Classic Bank N.A.",
-        "clayton bank and trust": "Clayton Bank & Trust",
-        "clinton savings bank": "Clinton Savings Bank",
-        "coastal community bank": "Coastal Community Bank",
-        "coastal heritage bank": "Coastal Heritage Bank",
-        "coastalstates bank": "CoastalStates Bank",
-        "coeur d’alene bank": "Coeur d’Alene Bank",
-        "colfax bank and trust": "Colfax Bank & Trust",
-        "colony bank": "Colony Bank",
-        "columbia state bank": "Columbia State Bank",
-        "commonwealth community bank": "Commonwealth Community Bank",
-        "community 1st credit union": "Community 1st Credit Union (IA)",
-        "community 1st credit union ia": "Community 1st Credit Union (IA)",
-        "community bank of pleasant hill": "Community Bank of Pleasant Hill",
-        "community bank of raymore": "Community Bank of Raymore",
-        "community first bank of indiana": "Community First Bank of Indiana",
-        "community resource credit union": "Community Resource Credit Union",
-        "community trust bank": "Community Trust Bank (KY)",
-        "community trust bank ky": "Community Trust Bank (KY)",
-        "communityamerica financial services": "CommunityAmerica Financial Services",
-        "communitybank of texas": "CommunityBank of Texas N.A.",
-        "communitybank of texas na": "CommunityBank of Texas N.A.",
-        "consumers national bank": "Consumers National Bank",
-        "cornerstone financial credit union": "Cornerstone Financial Credit Union",
-        "corporate america credit union": "Corporate America Credit Union",
-        "county bank": "County Bank (IA)",
-        "county bank ia": "County Bank (IA)",
-        "county national bank": "County National Bank (MI)",
-        "county national bank mi": "County National Bank (MI)",
-        "covenant bank": "Covenant Bank",
-        "crescent credit union": "Crescent Credit Union",
-        "cross river bank": "Cross River Bank",
-        "crystal lake bank and trust": "Crystal Lake Bank & Trust",
-        "cse federal credit union": "CSE Federal Credit Union",
-        "cta bank and trust": "CTA Bank & Trust",
-        "customers bank": "Customers Bank",
-        "dakota community federal cu": "Dakota Community Federal CU",
-        "dakota heritage bank": "Dakota Heritage Bank",
-        "dallas capital bank": "Dallas Capital Bank",
-        "danbury savings bank": "Danbury Savings Bank",
-        "day air credit union": "Day Air Credit Union",
-        "dedham institution for savings": "Dedham Institution for Savings",
-        "delta bank": "Delta Bank",
-        "denison state bank": "Denison State Bank",
-        "deposit bank of frankfort": "Deposit Bank of Frankfort",
-        "deseret first credit union": "Deseret First Credit Union",
-        "diamond credit union": "Diamond Credit Union",
-        "dime community bank": "Dime Community Bank",
-        "dnb first bank": "DNB First Bank",
-        "dorchester savings bank": "Dorchester Savings Bank",
-        "dover federal credit union": "Dover Federal Credit Union",
-        "drummond community bank": "Drummond Community Bank",
-        "dupage credit union": "DuPage Credit Union",
-        "dupaco community credit union": "Dupaco Community Credit Union",
-        "durden bank and trust": "Durden Bank & Trust",
-        "eagle community credit union": "Eagle Community Credit Union",
-        "eagle federal credit union": "Eagle Federal Credit Union",
-        "eagle savings bank": "Eagle Savings Bank",
-        "east bank": "East Bank (East Chicago, IN)",
-        "east bank east chicago": "East Bank (East Chicago, IN)",
-        "east boston savings bank": "East Boston Savings Bank",
-        "east cambridge savings bank": "East Cambridge Savings Bank",
-        "east river federal credit union": "East River Federal Credit Union",
-        "eastern savings bank": "Eastern Savings Bank (MD)",
-        "eastern savings bank md": "Eastern Savings Bank (MD)",
-        "eaton community bank": "Eaton Community Bank",
-        "educators credit union": "Educators Credit Union (TX)",
-        "educators credit union tx": "Educators Credit Union (TX)",
-        "eecu credit union": "EECU Credit Union (TX)",
-        "eecu credit union tx": "EECU Credit Union (TX)",
-        "el paso area teachers federal credit union": "El Paso Area Teachers Federal Credit Union",
-        "elevate bank": "Elevate Bank",
-        "elk river bank": "Elk River Bank",
-        "elmira savings bank": "Elmira Savings Bank",
-        "embassy bank for the lehigh valley": "Embassy Bank for the Lehigh Valley",
-        "empower federal credit union": "Empower Federal Credit Union",
-        "endura financial credit union": "Endura Financial Credit Union",
-        "enterprise bank and trust": "Enterprise Bank & Trust",
-        "envista credit union": "Envista Credit Union",
-        "equitable bank": "Equitable Bank (NE)",
-        "equitable bank ne": "Equitable Bank (NE)",
-        "erie federal credit union": "Erie Federal Credit Union",
-        "evertrust bank": "EverTrust Bank",
-        "exchange state bank": "Exchange State Bank",
-        "excite credit union": "Excite Credit Union",
-        "f&m bank": "F&M Bank (NC)",
-        "f&m bank nc": "F&M Bank (NC)",
-        "f&m trust": "F&M Trust (Franklin Co. PA)",
-        "f&m trust franklin co pa": "F&M Trust (Franklin Co. PA)",
-        "fairfield county bank": "Fairfield County Bank",
-        "farmers and drovers bank": "Farmers & Drovers Bank",
-        "farmers and merchants bank of central california": "Farmers & Merchants Bank of Central California",
-        "farmers bank and trust": "Farmers Bank & Trust (AR)",
-        "farmers bank and trust ar": "Farmers Bank & Trust (AR)",
-        "farmers state bank in": "Farmers State Bank (IN)",
-        "farmers state bank ia": "Farmers State Bank (IA)",
-        "farmers state bank mt": "Farmers State Bank (MT)",
-        "fayette county bank": "Fayette County Bank",
-        "fidelity bank of florida": "Fidelity Bank of Florida",
-        "fidelity deposit and discount bank": "Fidelity Deposit and Discount Bank",
-        "financial partners credit union": "Financial Partners Credit Union",
-        "finex credit union": "Finex Credit Union",
-        "first alliance credit union": "First Alliance Credit Union",
-        "first american trust fsb": "First American Trust FSB",
-        "first arkansas bank and trust": "First Arkansas Bank & Trust",
-        "first bank hampton": "First Bank Hampton",
-        "first bank kansas": "First Bank Kansas",
-        "first bank richmond": "First Bank Richmond",
-        "first bankers trust company": "First Bankers Trust Company N.A.",
-        "first bankers trust company na": "First Bankers Trust Company N.A.",
-        "first basin credit union": "First Basin Credit Union",
-        "first capital federal credit union": "First Capital Federal Credit Union",
-        "first central state bank": "First Central State Bank",
-        "first chatham bank": "First Chatham Bank",
-        "first citizens national bank": "First Citizens National Bank (TN)",
-        "first citizens national bank tn": "First Citizens National Bank (TN)",
-        "first city credit union": "First City Credit Union",
-        "first commerce credit union": "First Commerce Credit Union",
-        "first community credit union": "First Community Credit Union (MO)",
-        "first community credit union mo": "First Community Credit Union (MO)",
-        "first community credit union tx": "First Community Credit Union (TX)",
-        "first county bank": "First County Bank",
-        "first dakota national bank": "First Dakota National Bank",
-        "first eagle bank": "First Eagle Bank",
-        "first enterprise bank": "First Enterprise Bank",
-        "first federal bank": "First Federal Bank (KY)",
-        "first federal bank ky": "First Federal Bank (KY)",
-        "first federal savings bank of champaign urbana": "First Federal Savings Bank of Champaign-Urbana",
-        "first financial bank": "First Financial Bank (OH)",
-        "first financial bank oh": "First Financial Bank (OH)",
-        "first financial northwest bank": "First Financial Northwest Bank",
-        "first florida credit union": "First Florida Credit Union",
-        "first freedom bank": "First Freedom Bank",
-        "first hawaiian bank": "First Hawaiian Bank (HSA Division)",
-        "first hawaiian bank hsa division": "First Hawaiian Bank (HSA Division)",
-        "first hope bank": "First Hope Bank",
-        "first independent bank": "First Independent Bank (NV)",
-        "first independent bank nv": "First Independent Bank (NV)",
-        "first international bank and trust": "First International Bank & Trust",
-        "first interstate credit union": "First Interstate Credit Union",
-        "first mid illinois bank and trust": "First Mid-Illinois Bank & Trust",
-        "first midwest bank": "First Midwest Bank (IL)",
-        "first midwest bank il": "First Midwest Bank (IL)",
-        "first national bank in sioux falls": "First National Bank in Sioux Falls",
-        "first national bank north": "First National Bank North",
-        "first national bank of bastrop": "First National Bank of Bastrop",
-        "first national bank of brookfield": "First National Bank of Brookfield",
-        "first national bank of durango": "First National Bank of Durango",
-        "first national bank of hutchinson": "First National Bank of Hutchinson",
-        "first national bank of mcgregor": "First National Bank of McGregor",
-        "first national bank of pennsylvania": "First National Bank of Pennsylvania",
-        "first national bank of pulaski": "First National Bank of Pulaski",
-        "first national bank of st louis": "First National Bank of St. Louis",
-        "first national bank of waseca": "First National Bank of Waseca",
-        "first national bank of winnsboro": "First National Bank of Winnsboro",
-        "first national community bank": "First National Community Bank (GA)",
-        "first national community bank ga": "First National Community Bank (GA)",
-        "first northern credit union": "First Northern Credit Union",
-        "first oklahoma bank": "First Oklahoma Bank",
-        "first premier bank": "First PREMIER Bank",
-        "first robinson savings bank": "First Robinson Savings Bank",
-        "first savings bank": "First Savings Bank (IN)",
-        "first savings bank in": "First Savings Bank (IN)",
-        "first security bank": "First Security Bank (AR)",
-        "first security bank ar": "First Security Bank (AR)",
-        "first security bank of missoula": "First Security Bank of Missoula",
-        "first service bank": "First Service Bank",
-        "first southern bank": "First Southern Bank (IL)",
-        "first southern bank il": "First Southern Bank (IL)",
-        "first state bank": "First State Bank (IL)",
-        "first state bank il": "First State Bank (IL)",
-        "first state bank mi": "First State Bank (MI)",
-        "first state bank tx": "First State Bank (TX)",
-        "first state bank nebraska": "First State Bank Nebraska",
-        "first state community bank": "First State Community Bank",
-        "first state credit union": "First State Credit Union",
-        "first tennessee bank": "First Tennessee Bank (now Truist)",
-        "first tennessee bank now truist": "First Tennessee Bank (now Truist)",
-        "first texas bank": "First Texas Bank",
-        "first united bank": "First United Bank (OK)",
-        "first united bank ok": "First United Bank (OK)",
-        "first western bank and trust": "First Western Bank & Trust",
-        "first western federal savings bank": "First Western Federal Savings Bank",
-        "firstbank": "FirstBank (CO)",
-        "firstbank co": "FirstBank (CO)",
-        "firstbank of nebraska": "FirstBank of Nebraska",
-        "five star bank": "Five Star Bank",
-        "flagship bank minnesota": "Flagship Bank Minnesota",
-        "fnb bank": "FNB Bank (KY)",
-        "fnb bank ky": "FNB Bank (KY)",
-        "fnbc bank": "FNBC Bank (AR)",
-        "fnbc bank ar": "FNBC Bank (AR)",
-        "foothill credit union": "Foothill Credit Union",
-        "forest park bank": "Forest Park Bank",
-        "fort knox federal credit union": "Fort Knox Federal Credit Union",
-        "fort sill federal credit union": "Fort Sill Federal Credit Union",
-        "forward bank": "Forward Bank",
-        "fox communities credit union": "Fox Communities Credit Union",
-        "freedom bank of virginia": "Freedom Bank of Virginia",
-        "freedom credit union": "Freedom Credit Union (MA)",
-        "freedom credit union ma": "Freedom Credit Union (MA)",
-        "frontier bank": "Frontier Bank (NE)",
-        "frontier bank ne": "Frontier Bank (NE)",
-        "frontwave credit union": "Frontwave Credit Union",
-        "fsnb national bank": "FSNB National Bank",
-    
-        "fulton bank of new jersey": "Fulton Bank of New Jersey",
-        "g bank": "G Bank (Bank of Guam USA)",
-        "g bank bank of guam usa": "G Bank (Bank of Guam USA)",
-        "gainesville bank and trust": "Gainesville Bank & Trust",
-        "gannon bank": "Gannon Bank",
-        "generations bank": "Generations Bank",
-        "generations credit union": "Generations Credit Union",
-        "george d warthen bank": "George D. Warthen Bank",
-        "georgia banking company": "Georgia Banking Company",
-        "germantown trust and savings bank": "Germantown Trust & Savings Bank",
-        "gnb bank": "GNB Bank",
-        "goldenwest credit union": "Goldenwest Credit Union",
-        "goodfield state bank": "Goodfield State Bank",
-        "gorham savings bank": "Gorham Savings Bank",
-        "grand ridge national bank": "Grand Ridge National Bank",
-        "granite bank": "Granite Bank",
-        "granite state credit union": "Granite State Credit Union",
-        "great lakes credit union": "Great Lakes Credit Union",
-        "great river federal credit union": "Great River Federal Credit Union",
-        "greater nevada credit union": "Greater Nevada Credit Union",
-        "greater texas credit union": "Greater Texas Credit Union",
-        "green cove springs state bank": "Green Cove Springs State Bank",
-        "green dot bank": "Green Dot Bank",
-        "greenfield savings bank": "Greenfield Savings Bank",
-        "greenleaf bank": "Greenleaf Bank",
-        "greenville national bank": "Greenville National Bank",
-        "greylock federal credit union": "Greylock Federal Credit Union",
-        "guaranty bank and trust": "Guaranty Bank & Trust (IA)",
-        "guaranty bank and trust ia": "Guaranty Bank & Trust (IA)",
-        "gulf coast federal credit union": "Gulf Coast Federal Credit Union",
-        "gulf winds credit union": "Gulf Winds Credit Union",
-        "hancock county savings bank": "Hancock County Savings Bank",
-        "hancock whitney bank": "Hancock Whitney Bank (HSA Dept.)",
-        "hancock whitney bank hsa dept": "Hancock Whitney Bank (HSA Dept.)",
-        "happy state bank": "Happy State Bank",
-        "harborone bank": "HarborOne Bank",
-        "harrison county bank": "Harrison County Bank",
-        "hartford federal credit union": "Hartford Federal Credit Union",
-        "hawaiiusa federal credit union": "HawaiiUSA Federal Credit Union",
-        "heartland credit union": "Heartland Credit Union (WI)",
-        "heartland credit union wi": "Heartland Credit Union (WI)",
-        "heartland tri state bank": "Heartland Tri-State Bank",
-        "helena community credit union": "Helena Community Credit Union",
-        "heritage family credit union": "Heritage Family Credit Union",
-        "heritage grove federal credit union": "Heritage Grove Federal Credit Union",
-        "heritage south credit union": "Heritage South Credit Union",
-        "heritage west credit union": "Heritage West Credit Union",
-        "highland community bank": "Highland Community Bank",
-        "hilltop national bank": "Hilltop National Bank",
-        "hingham institution for savings": "Hingham Institution for Savings",
-        "horizon bank": "Horizon Bank (MI)",
-        "horizon bank mi": "Horizon Bank (MI)",
-        "horizon community bank": "Horizon Community Bank (AZ)",
-        "horizon community bank az": "Horizon Community Bank (AZ)",
-        "horizon credit union": "Horizon Credit Union (WA)",
-        "horizon credit union wa": "Horizon Credit Union (WA)",
-        "horizon federal credit union": "Horizon Federal Credit Union (PA)",
-        "horizon federal credit union pa": "Horizon Federal Credit Union (PA)",
-        "houston federal credit union": "Houston Federal Credit Union",
-        "howard county bank": "Howard County Bank",
-        "hudson city savings bank": "Hudson City Savings Bank",
-        "hudson heritage federal credit union": "Hudson Heritage Federal Credit Union",
-        "hughes federal credit union": "Hughes Federal Credit Union",
-        "huntingdon valley bank": "Huntingdon Valley Bank",
-        "ic federal credit union": "IC Federal Credit Union",
-        "idb bank": "IDB Bank (Industrial Bank of Israel)",
-        "idb bank industrial bank of israel": "IDB Bank (Industrial Bank of Israel)",
-        "ih mississippi valley credit union": "IH Mississippi Valley Credit Union",
-        "illinois state credit union": "Illinois State Credit Union",
-        "incrediblebank": "IncredibleBank",
-        "industrial bank": "Industrial Bank (Washington DC)",
-        "industrial bank washington dc": "Industrial Bank (Washington DC)",
-        "inland northwest bank": "Inland Northwest Bank",
-        "inspirus credit union": "Inspirus Credit Union",
-        "integrity bank for business": "Integrity Bank for Business",
-        "interamerican bank": "Interamerican Bank (Miami)",
-        "interamerican bank miami": "Interamerican Bank (Miami)",
-        "international bank of commerce": "International Bank of Commerce (IBC Bank)",
-        "international bank of commerce ibc bank": "International Bank of Commerce (IBC Bank)",
-        "investar bank": "Investar Bank N.A.",
-        "investar bank na": "Investar Bank N.A.",
-        "ion bank": "ION Bank",
-        "iowa heartland credit union": "Iowa Heartland Credit Union",
-        "iowa state bank and trust": "Iowa State Bank & Trust (Iowa City)",
-        "iowa state bank and trust iowa city": "Iowa State Bank & Trust (Iowa City)",
-        "iron bank": "Iron Bank (St. Louis)",
-        "iron bank st louis": "Iron Bank (St. Louis)",
-        "ironworkers bank": "Ironworkers Bank",
-        "jersey shore state bank": "Jersey Shore State Bank",
-        "john marshall bank": "John Marshall Bank",
-        "johnson city bank": "Johnson City Bank",
-        "joplin metro credit union": "Joplin Metro Credit Union",
-        "jupiter miners bank": "Jupiter Miners Bank",
-        "national financial services llc": "National Financial Services LLC",
-        "national financial serves llc": "National Financial Services LLC",
-        "bank of america": "Bank of America",
-        "bark of america": "Bank of America",
-        "bank of amerlca": "Bank of America",
-        "bank of amerlca na": "Bank of America",
-
-        # --- Major HSA / Financial Admins ---
-        "healthequity corporate": "HealthEquity Corporate",
-        "healthequity corp": "HealthEquity Corporate",
-        "health equity corporate": "HealthEquity Corporate",
-        "health equity corp": "HealthEquity Corporate",
-        "healthequity": "HealthEquity Inc.",
-        "healthequity inc": "HealthEquity Inc.",
-        "optum bank": "Optum Bank Inc.",
-        "optum bank inc": "Optum Bank Inc.",
-        "fidelity investments": "Fidelity Investments",
-        "webster bank": "Webster Bank N.A.",
-        "webster bank n a": "Webster Bank N.A.",
-        "lively hsa": "Lively HSA Inc.",
-        "lively hsa inc": "Lively HSA Inc.",
-
-        # --- Large Banks ---
-        "umb bank": "UMB Bank N.A.",
-        "umb bank n a": "UMB Bank N.A.",
-        "first american bank": "First American Bank",
-        "wells fargo": "Wells Fargo Bank N.A.",
-        "wells fargo bank": "Wells Fargo Bank N.A.",
-        "jpmorgan chase": "JPMorgan Chase Bank N.A.",
-        "chase bank": "JPMorgan Chase Bank N.A.",
-        "associated bank": "Associated Bank N.A.",
-        "fifth third": "Fifth Third Bank N.A.",
-        "keybank": "KeyBank N.A.",
-        "bend hsa": "Bend HSA Inc.",
-        "elements financial": "Elements Financial Credit Union",
-        "patelco": "Patelco Credit Union",
-        "digital federal credit union": "Digital Federal Credit Union (DCU)",
-        "america first credit union": "America First Credit Union",
-        "golden 1 credit union": "Golden 1 Credit Union",
-        "truist": "Truist Bank",
-        "pnc": "PNC Bank N.A.",
-        "regions bank": "Regions Bank",
-        "us bank": "US Bank N.A.",
-        "comerica": "Comerica Bank",
-        "citizens bank": "Citizens Bank N.A.",
-        "first horizon": "First Horizon Bank",
-        "hancock whitney": "Hancock Whitney Bank",
-        "zions bank": "Zions Bank N.A.",
-        "frost bank": "Frost Bank",
-        "old national": "Old National Bank",
-        "synovus": "Synovus Bank",
-        "commerce bank": "Commerce Bank",
-        "first interstate": "First Interstate Bank",
-        "glacier bank": "Glacier Bank",
-        "banner bank": "Banner Bank",
-        "first citizens": "First Citizens Bank",
-        "huntington national": "Huntington National Bank",
-
-        # --- Credit Unions ---
-        "associated healthcare credit union": "Associated Healthcare Credit Union",
-        "advia credit union": "Advia Credit Union",
-        "premier america credit union": "Premier America Credit Union",
-        "bethpage federal credit union": "Bethpage Federal Credit Union",
-        "mountain america credit union": "Mountain America Credit Union",
-        "alliant credit union": "Alliant Credit Union",
-        "penfed": "PenFed Credit Union",
-        "navy federal": "Navy Federal Credit Union",
-        "schoolsfirst": "SchoolsFirst Federal Credit Union",
-        "becu": "Boeing Employees Credit Union (BECU)",
-        "boeing employees credit union": "Boeing Employees Credit Union (BECU)",
-        "space coast": "Space Coast Credit Union",
-        "redstone federal": "Redstone Federal Credit Union",
-        "desert financial": "Desert Financial Credit Union",
-        "gesa credit union": "Gesa Credit Union",
-        "bellco credit union": "Bellco Credit Union",
-        "ent credit union": "Ent Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "randolph brooks": "Randolph-Brooks Federal Credit Union",
-        "american airlines federal credit union": "American Airlines Federal Credit Union",
-        "delta community credit union": "Delta Community Credit Union",
-        "state employees credit union": "State Employees’ Credit Union (SECU)",
-        "vantage west": "Vantage West Credit Union",
-        "oregon community": "Oregon Community Credit Union",
-        "truwest": "TruWest Credit Union",
-
-        # --- MSA / Health-related Plans ---
-        "lasso healthcare": "Lasso Healthcare MSA",
-        "unitedhealthcare": "UnitedHealthcare MSA Plans",
-        "humana": "Humana MSA Plans",
-        "blue cross blue shield": "Blue Cross Blue Shield MSA Plans",
-        "vibrant usa": "Vibrant USA MSA Plans",
-        "wex": "WEX Inc.",
-                # --- Additional Financial Institutions (Extension Set) ---
-        "pioneer trust bank": "Pioneer Trust Bank (ND)",
-        "pioneer trust bank nd": "Pioneer Trust Bank (ND)",
-
-        "planters first bank": "Planters First Bank",
-        "platte valley bank": "Platte Valley Bank (NE)",
-        "platte valley bank ne": "Platte Valley Bank (NE)",
-        "platte valley national bank": "Platte Valley National Bank",
-
-        "pnc financial services": "PNC Financial Services Group",
-        "pnc financial services group": "PNC Financial Services Group",
-
-        "point breeze credit union": "Point Breeze Credit Union (MD)",
-        "point breeze credit union md": "Point Breeze Credit Union (MD)",
-        "police and fire federal credit union": "Police and Fire Federal Credit Union",
-        "popular bank": "Popular Bank (NY)",
-        "popular bank ny": "Popular Bank (NY)",
-
-        "port washington state bank": "Port Washington State Bank",
-        "prairie bank": "Prairie Bank",
-        "prairie mountain bank": "Prairie Mountain Bank",
-
-        "premier bank": "Premier Bank (Rochester MN)",
-        "premier bank rochester": "Premier Bank (Rochester MN)",
-        "premier bank rochester mn": "Premier Bank (Rochester MN)",
-
-        "premier members credit union": "Premier Members Credit Union (CO)",
-        "premier members credit union co": "Premier Members Credit Union (CO)",
-
-        "presidential bank": "Presidential Bank (FSB)",
-        "presidential bank fsb": "Presidential Bank (FSB)",
-
-        "primeway federal credit union": "PrimeWay Federal Credit Union (TX)",
-        "primeway federal credit union tx": "PrimeWay Federal Credit Union (TX)",
-
-        "princeton state bank": "Princeton State Bank",
-        "professional bank": "Professional Bank (FL)",
-        "professional bank fl": "Professional Bank (FL)",
-        "progressive bank": "Progressive Bank (LA)",
-        "progressive bank la": "Progressive Bank (LA)",
-        "prosperity bank": "Prosperity Bank (TX)",
-        "prosperity bank tx": "Prosperity Bank (TX)",
-
-        "provident bank of maryland": "Provident Bank of Maryland",
-        "provident credit union": "Provident Credit Union (CA)",
-        "provident credit union ca": "Provident Credit Union (CA)",
-
-        "ps bank": "PS Bank (Pa.)",
-        "ps bank pa": "PS Bank (Pa.)",
-        "public service credit union": "Public Service Credit Union (CO)",
-        "public service credit union co": "Public Service Credit Union (CO)",
-
-        "publix employees federal credit union": "Publix Employees Federal Credit Union",
-        "puget sound bank": "Puget Sound Bank",
-
-        "quad city bank": "Quad City Bank and Trust",
-        "quad city bank and trust": "Quad City Bank and Trust",
-
-        "queenstown bank of maryland": "Queenstown Bank of Maryland",
-        "quincy state bank": "Quincy State Bank (FL)",
-        "quincy state bank fl": "Quincy State Bank (FL)",
-
-        "quorum federal credit union": "Quorum Federal Credit Union (NY)",
-        "quorum federal credit union ny": "Quorum Federal Credit Union (NY)",
-
-        "raccoon valley bank": "Raccoon Valley Bank",
-        "randolph savings bank": "Randolph Savings Bank",
-
-        "raymond james bank": "Raymond James Bank",
-        "red river bank": "Red River Bank",
-        "red river employees federal credit union": "Red River Employees Federal Credit Union",
-
-        "redwood capital bank": "Redwood Capital Bank",
-        "reliabank dakota": "Reliabank Dakota",
-        "reliant community credit union": "Reliant Community Credit Union (NY)",
-        "reliant community credit union ny": "Reliant Community Credit Union (NY)",
-
-        "republic bank of arizona": "Republic Bank of Arizona",
-        "republic bank of chicago": "Republic Bank of Chicago",
-
-                # --- Additional Banks and Credit Unions (Requested) ---
-        "republic first bank": "Republic First Bank (Philadelphia PA)",
-        "republic first bank philadelphia": "Republic First Bank (Philadelphia PA)",
-        "republic first bank philadelphia pa": "Republic First Bank (Philadelphia PA)",
-
-        "resurgens bank": "Resurgens Bank",
-        "ridgewood savings bank": "Ridgewood Savings Bank (NY)",
-        "ridgewood savings bank ny": "Ridgewood Savings Bank (NY)",
-
-        "rising community federal credit union": "Rising Community Federal Credit Union",
-        "river bank": "River Bank (WI)",
-        "river bank wi": "River Bank (WI)",
-        "river city federal credit union": "River City Federal Credit Union (TX)",
-        "river city federal credit union tx": "River City Federal Credit Union (TX)",
-        "river falls state bank": "River Falls State Bank",
-        "river valley credit union": "River Valley Credit Union (OH)",
-        "river valley credit union oh": "River Valley Credit Union (OH)",
-        "riverland federal credit union": "RiverLand Federal Credit Union (LA)",
-        "riverland federal credit union la": "RiverLand Federal Credit Union (LA)",
-        "riverset credit union": "Riverset Credit Union (PA)",
-        "riverset credit union pa": "Riverset Credit Union (PA)",
-        "riverview community bank": "Riverview Community Bank (WA)",
-        "riverview community bank wa": "Riverview Community Bank (WA)",
-        "rock canyon bank": "Rock Canyon Bank (UT)",
-        "rock canyon bank ut": "Rock Canyon Bank (UT)",
-        "rockland federal credit union": "Rockland Federal Credit Union (MA)",
-        "rockland federal credit union ma": "Rockland Federal Credit Union (MA)",
-        "rockville bank": "Rockville Bank",
-        "rogue federal credit union": "Rogue Federal Credit Union (OR)",
-        "rogue federal credit union or": "Rogue Federal Credit Union (OR)",
-        "rolling hills bank": "Rolling Hills Bank and Trust (IA)",
-        "rolling hills bank and trust": "Rolling Hills Bank and Trust (IA)",
-        "rolling hills bank ia": "Rolling Hills Bank and Trust (IA)",
-        "roundbank": "Roundbank (Fairbault MN)",
-        "roundbank fairbault": "Roundbank (Fairbault MN)",
-        "roundbank fairbault mn": "Roundbank (Fairbault MN)",
-        "royal business bank": "Royal Business Bank (CA)",
-        "royal business bank ca": "Royal Business Bank (CA)",
-                "kahoka state bank": "Kahoka State Bank",
-        "katahdin trust co": "Katahdin Trust Co. (HSA Dept.)",
-        "katahdin trust co hsa dept": "Katahdin Trust Co. (HSA Dept.)",
-        "kaw valley bank": "Kaw Valley Bank",
-        "keystone bank": "Keystone Bank (Austin TX)",
-        "keystone bank austin": "Keystone Bank (Austin TX)",
-        "keystone bank austin tx": "Keystone Bank (Austin TX)",
-        "kish bank": "Kish Bank",
-        "kitsap credit union": "Kitsap Credit Union",
-        "kodabank": "KodaBank",
-        "kohler credit union": "Kohler Credit Union",
-        "ks statebank": "KS StateBank",
-        "la capitol federal credit union": "La Capitol Federal Credit Union",
-        "la salle state bank": "La Salle State Bank",
-        "labor credit union": "Labor Credit Union",
-        "ladue bank": "Ladue Bank",
-        "lake city federal bank": "Lake City Federal Bank",
-        "lake sunapee bank": "Lake Sunapee Bank",
-        "lakeland bank": "Lakeland Bank",
-        "lakeside bank of salina": "Lakeside Bank of Salina",
-        "lamar bank and trust": "Lamar Bank and Trust Co.",
-        "lamar bank and trust co": "Lamar Bank and Trust Co.",
-        "landmark national bank": "Landmark National Bank",
-        "langley state bank": "Langley State Bank",
-        "lansdale bank": "Lansdale Bank",
-        "laramie plains federal credit union": "Laramie Plains Federal Credit Union",
-        "laramie plains bank": "Laramie Plains Bank",
-        "lawson bank": "Lawson Bank",
-        "leader one bank": "Leader One Bank",
-        "legacy community federal credit union": "Legacy Community Federal Credit Union",
-        "legend bank": "Legend Bank",
-        "lehigh valley educators credit union": "Lehigh Valley Educators Credit Union",
-        "lewiston state bank": "Lewiston State Bank",
-        "liberty bank": "Liberty Bank (CT)",
-        "liberty bank ct": "Liberty Bank (CT)",
-        "liberty national bank": "Liberty National Bank (OH)",
-        "liberty national bank oh": "Liberty National Bank (OH)",
-        "lincoln national bank": "Lincoln National Bank (Hodgenville KY)",
-        "lincoln national bank hodgenville": "Lincoln National Bank (Hodgenville KY)",
-        "lincoln national bank hodgenville ky": "Lincoln National Bank (Hodgenville KY)",
-        "linn co op credit union": "Linn Co-op Credit Union",
-        "lisbon bank and trust": "Lisbon Bank & Trust",
-        "little horn state bank": "Little Horn State Bank",
-        "lnb community bank": "LNB Community Bank",
-        "logan bank and trust": "Logan Bank & Trust Co.",
-        "logan bank and trust co": "Logan Bank & Trust Co.",
-        "lone star credit union": "Lone Star Credit Union",
-        "lormet community federal credit union": "LorMet Community Federal Credit Union",
-        "los padres bank": "Los Padres Bank",
-        "louisiana federal credit union": "Louisiana Federal Credit Union",
-        "louisiana national bank": "Louisiana National Bank",
-        "lowell five savings bank": "Lowell Five Savings Bank",
-        "luther burbank savings": "Luther Burbank Savings",
-        "lyons national bank": "Lyons National Bank",
-        "macon bank and trust": "Macon Bank & Trust Co.",
-        "macon bank and trust co": "Macon Bank & Trust Co.",
-        "magnolia bank": "Magnolia Bank Inc.",
-        "magnolia bank inc": "Magnolia Bank Inc.",
-        "main street bank": "Main Street Bank (MA)",
-        "main street bank ma": "Main Street Bank (MA)",
-        "malvern bank": "Malvern Bank (National Association)",
-        "malvern bank national association": "Malvern Bank (National Association)",
-        "manasquan bank": "Manasquan Bank",
-        "mansfield bank": "Mansfield Bank",
-        "manufacturers bank of lewiston": "Manufacturers Bank of Lewiston",
-        "marblehead bank": "Marblehead Bank",
-        "marine midland bank": "Marine Midland Bank",
-        "marion county bank": "Marion County Bank",
-        "markesan state bank": "Markesan State Bank",
-        "marquette bank of chicago": "Marquette Bank of Chicago",
-        "marshall and ilsley bank": "Marshall & Ilsley Bank",
-        "massmutual federal credit union": "MassMutual Federal Credit Union",
-        "mayville state bank": "Mayville State Bank",
-        "mcfarland state bank": "McFarland State Bank",
-        "mcintosh county bank": "McIntosh County Bank",
-        "mediapolis savings bank": "Mediapolis Savings Bank",
-        "members 1st federal credit union": "Members 1st Federal Credit Union",
-        "members choice credit union": "Members Choice Credit Union",
-        "members heritage credit union": "Members Heritage Credit Union",
-        "merrimack county savings bank": "Merrimack County Savings Bank",
-        "metairie bank and trust": "Metairie Bank & Trust Co.",
-        "metairie bank and trust co": "Metairie Bank & Trust Co.",
-        "metro health services federal credit union": "Metro Health Services Federal Credit Union",
-        "metropolitan commercial bank": "Metropolitan Commercial Bank",
-        "meyers savings bank": "Meyers Savings Bank",
-        "michigan schools and government credit union": "Michigan Schools & Government Credit Union",
-        "midamerica credit union": "MidAmerica Credit Union",
-        "midcountry federal credit union": "MidCountry Federal Credit Union",
-
-
-        "midfirst credit union": "MidFirst Credit Union",
-
-
-        "midland community credit union": "Midland Community Credit Union",
-
-
-        "midminnesota federal credit union": "MidMinnesota Federal Credit Union",
-
-
-        "midsouth bank": "MidSouth Bank",
-
-
-        "midstate bank": "Midstate Bank",
-
-
-        "midstates bank": "Midstates Bank N.A.",
-
-
-        "midstates bank na": "Midstates Bank N.A.",
-
-
-        "midwestone credit union": "MidWestOne Credit Union",
-
-
-        "millbury federal credit union": "Millbury Federal Credit Union",
-
-
-        "minnco credit union": "Minnco Credit Union",
-
-
-        "minnesota bank and trust": "Minnesota Bank & Trust",
-
-
-        "minnstar bank": "MinnStar Bank N.A.",
-
-
-        "minnstar bank na": "MinnStar Bank N.A.",
-
-
-        "mississippi federal credit union": "Mississippi Federal Credit Union",
-
-
-        "modern woodmen bank": "Modern Woodmen Bank",
-
-
-        "monroe bank and trust": "Monroe Bank & Trust",
-
-
-        "monroe federal savings bank": "Monroe Federal Savings Bank",
-
-
-        "montana credit union": "Montana Credit Union",
-
-
-        "mountain valley bank": "Mountain Valley Bank (NH)",
-
-
-        "mountain valley bank nh": "Mountain Valley Bank (NH)",
-
-
-        "mountain west bank": "Mountain West Bank (ID)",
-
-
-        "mountain west bank id": "Mountain West Bank (ID)",
-
-
-        "mutual bank": "Mutual Bank (MA)",
-
-
-        "mutual bank ma": "Mutual Bank (MA)",
-
-
-        "mutual federal savings bank": "Mutual Federal Savings Bank",
-
-
-        "nantucket bank": "Nantucket Bank",
-
-
-        "national bank of commerce": "National Bank of Commerce (Duluth MN)",
-
-
-        "national bank of commerce duluth": "National Bank of Commerce (Duluth MN)",
-
-
-        "national bank of middlebury": "National Bank of Middlebury",
-
-
-        "national exchange bank and trust": "National Exchange Bank & Trust",
-
-
-        "national grid us federal credit union": "National Grid US Federal Credit Union",
-
-
-        "national jersey bank": "National Jersey Bank",
-
-
-        "national parks federal credit union": "National Parks Federal Credit Union",
-
-
-        "nebraska bank": "Nebraska Bank",
-
-
-        "nebraska energy federal credit union": "Nebraska Energy Federal Credit Union",
-
-
-        "neighborhood national bank": "Neighborhood National Bank",
-
-
-        "netbank federal savings bank": "NetBank Federal Savings Bank",
-
-
-        "new alliance bank": "New Alliance Bank",
-
-
-        "new century bank": "New Century Bank",
-
-
-        "new dominion bank": "New Dominion Bank",
-
-
-        "new haven county credit union": "New Haven County Credit Union",
-
-
-        "new milford bank and trust": "New Milford Bank & Trust Co.",
-
-
-        "new tripoli bank": "New Tripoli Bank",
-
-
-        "new york community bank": "New York Community Bank",
-
-
-        "newburyport five cents savings bank": "Newburyport Five Cents Savings Bank",
-
-
-        "newtown savings bank": "Newtown Savings Bank",
-
-
-        "nicolet federal credit union": "Nicolet Federal Credit Union",
-
-
-        "nodaway valley bank": "Nodaway Valley Bank",
-
-
-        "north american bank and trust": "North American Bank & Trust Co.",
-
-
-        "north brookfield savings bank": "North Brookfield Savings Bank",
-
-
-        "north community bank": "North Community Bank",
-
-
-        "north country federal credit union": "North Country Federal Credit Union",
-
-
-        "north easton savings bank": "North Easton Savings Bank",
-
-
-        "north island federal credit union": "North Island Federal Credit Union",
-
-
-        "north shore federal credit union": "North Shore Federal Credit Union",
-
-
-        "north state bank": "North State Bank (NC)",
-
-
-        "north state bank nc": "North State Bank (NC)",
-
-
-        "northeast bank": "Northeast Bank (ME)",
-
-
-        "northeast bank me": "Northeast Bank (ME)",
-
-
-        "northern interstate bank": "Northern Interstate Bank N.A.",
-
-
-        "northern interstate bank na": "Northern Interstate Bank N.A.",
-
-
-        "northern skies federal credit union": "Northern Skies Federal Credit Union",
-
-
-        "northern trust bank": "Northern Trust Bank",
-
-
-        "northfield savings bank": "Northfield Savings Bank (VT)",
-
-
-        "northfield savings bank vt": "Northfield Savings Bank (VT)",
-
-
-        "northland area federal credit union": "Northland Area Federal Credit Union",
-
-
-        "northwest community credit union": "Northwest Community Credit Union (OR)",
-
-
-        "northwest community credit union or": "Northwest Community Credit Union (OR)",
-
-
-        "northwest federal credit union": "Northwest Federal Credit Union (VA)",
-
-
-        "northwest federal credit union va": "Northwest Federal Credit Union (VA)",
-
-
-        "norway savings bank": "Norway Savings Bank",
-
-
-        "notre dame federal credit union": "Notre Dame Federal Credit Union (IN)",
-
-
-        "notre dame federal credit union in": "Notre Dame Federal Credit Union (IN)",
-
-
-        "nuvision credit union": "NuVision Credit Union (CA)",
-
-
-        "nuvision credit union ca": "NuVision Credit Union (CA)",
-
-
-        "oak bank": "Oak Bank (WI)",
-
-
-        "oak bank wi": "Oak Bank (WI)",
-
-
-        "oakstar bank": "OakStar Bank",
-
-
-        "ocean financial federal credit union": "Ocean Financial Federal Credit Union",
-
-
-        "oceanfirst bank": "OceanFirst Bank (NJ)",
-
-
-        "oceanfirst bank nj": "OceanFirst Bank (NJ)",
-
-
-        "oceanview federal credit union": "OceanView Federal Credit Union",
-
-
-        "ohio catholic federal credit union": "Ohio Catholic Federal Credit Union",
-
-
-        "ohio savings bank": "Ohio Savings Bank",
-
-
-        "old dominion national bank": "Old Dominion National Bank",
-
-
-        "old point trust": "Old Point Trust and Financial Services",
-
-
-        "old point trust and financial services": "Old Point Trust and Financial Services",
-
-
-        "old second national bank": "Old Second National Bank (IL)",
-
-
-        "old second national bank il": "Old Second National Bank (IL)",
-
-
-        "old west federal credit union": "Old West Federal Credit Union",
-
-
-        "olean area federal credit union": "Olean Area Federal Credit Union",
-
-
-        "onpoint community credit union": "OnPoint Community Credit Union",
-
-
-        "orange bank and trust": "Orange Bank & Trust Company",
-
-
-        "orange bank and trust company": "Orange Bank & Trust Company",
-
-
-        "oregon pacific bank": "Oregon Pacific Bank",
-
-
-        "oriental bank": "Oriental Bank (Puerto Rico division excluded)",
-
-
-        "oriental bank puerto rico": "Oriental Bank (Puerto Rico division excluded)",
-
-
-        "orrstown bank": "Orrstown Bank",
-        "oswego county federal credit union": "Oswego County Federal Credit Union",
-        "ouachita valley federal credit union": "Ouachita Valley Federal Credit Union",
-        "ozark bank": "Ozark Bank",
-        "ozark federal credit union": "Ozark Federal Credit Union",
-        "pacific crest federal credit union": "Pacific Crest Federal Credit Union",
-        "pacific premier bank": "Pacific Premier Bank",
-        "pacific service credit union": "Pacific Service Credit Union",
-        "pacific valley bank": "Pacific Valley Bank",
-        "palmetto citizens federal credit union": "Palmetto Citizens Federal Credit Union",
-        "palo savings bank": "Palo Savings Bank",
-        "park national bank": "Park National Bank",
-        "parkway bank and trust": "Parkway Bank & Trust Co.",
-        "parkway bank and trust co": "Parkway Bank & Trust Co.",
-        "partners federal credit union": "Partners Federal Credit Union",
-        "pathways financial credit union": "Pathways Financial Credit Union",
-        "patriot bank": "Patriot Bank (Norwalk CT)",
-        "patriot bank norwalk": "Patriot Bank (Norwalk CT)",
-        "patriot bank norwalk ct": "Patriot Bank (Norwalk CT)",
-        "paul federated credit union": "Paul Federated Credit Union",
-        "peach state federal credit union": "Peach State Federal Credit Union",
-        "peapack gladstone financial corp": "Peapack-Gladstone Financial Corp.",
-        "pella state bank": "Pella State Bank",
-        "penair federal credit union": "PenAir Federal Credit Union",
-        "peninsula federal credit union": "Peninsula Federal Credit Union",
-        "peoples bank": "Peoples Bank (Bellingham WA)",
-        "peoples bank bellingham": "Peoples Bank (Bellingham WA)",
-        "peoples bank bellingham wa": "Peoples Bank (Bellingham WA)",
-        "peoples bank of alabama": "Peoples Bank of Alabama",
-        "peoples bank of kankakee": "Peoples Bank of Kankakee County",
-        "peoples bank of kankakee county": "Peoples Bank of Kankakee County",
-        "peoples community bank": "Peoples Community Bank (MO)",
-        "peoples community bank mo": "Peoples Community Bank (MO)",
-        "peoples exchange bank": "Peoples Exchange Bank",
-        "peoples national bank": "Peoples National Bank (TN)",
-        "peoples national bank tn": "Peoples National Bank (TN)",
-        "peoples state bank": "Peoples State Bank (IN)",
-        "peoples state bank in": "Peoples State Bank (IN)",
-        "peoples trust federal credit union": "Peoples Trust Federal Credit Union",
-        "perkins state bank": "Perkins State Bank",
-        "perpetual federal savings bank": "Perpetual Federal Savings Bank",
-        "piedmont advantage credit union": "Piedmont Advantage Credit Union",
-        "pima federal credit union": "Pima Federal Credit Union",
-        "pinnacle bank": "Pinnacle Bank (NE)",
-        "pinnacle bank ne": "Pinnacle Bank (NE)",
-        "pioneer bank": "Pioneer Bank (NY)",
-        "pioneer bank ny": "Pioneer Bank (NY)",
-        "pioneer credit union": "Pioneer Credit Union",
-        "pioneer federal credit union": "Pioneer Federal Credit Union (ID)",
-        "pioneer federal credit union id": "Pioneer Federal Credit Union (ID)"
-
-    }
-
-   
     normalized_text = normalize_text(text)
-    for key, val in OVERRIDES.items():
-        if key in normalized_text:
-            return val
+    known = INSTITUTIONS.lookup("hsa_trustees", normalized_text)
+    if known:
+        return known
     # --- Rule 0: Handle glued "Form 1099-SA From an HSA" ---
     for L in lines:
         if re.search(r"form\s*1099-sa.*from an hsa", L, flags=re.IGNORECASE):
@@ -3468,6 +3642,70 @@ def clean_bookmark(name: str) -> str:
     name = re.sub(r"[^\w\s.,&-]+$", "", name)  # strip trailing junk
     return name
 
+# 1098-Mortgage lender overrides, highest priority first. They are merged
+# into one alternation inside a lookahead, so a single pass over each line
+# reports the best rule matching at every position.
+MORTGAGE_LENDER_OVERRIDES = [
+    # (pattern, bookmark, rule label)
+    (r"\bphh\s+mortgage\s+corporation\b", "PHH MORTGAGE CORPORATION", "PHH Mortgage"),
+    (r"rocket\s+mortgage", "ROCKET MORTGAGE LLC", "Rocket Mortgage"),
+    (r"dovenmuehle\s+mortgage", "DOVENMUEHLE MORTGAGE, INC", "Dovenmuehle"),
+    (r"\bhuntington\s+national\s+bank\b", "THE HUNTINGTON NATIONAL BANK", "Huntington Bank"),
+    (r"\bunited\s+nations\s+fcu\b", "UNITED NATIONS FCU", "United Nations FCU"),
+    (r"\bloan\s*depot\s*com\s*llc\b", "LOANDEPOT.COM LLC", "LoanDepot"),
+    (r"jp\s*morgan\s+chase", "JPMORGAN CHASE BANK, N.A.", "JPMorgan Chase"),
+    (r"\bfor\s+return\s+service\s+only\b", "FOR RETURN SERVICE ONLY", "FOR RETURN SERVICE ONLY"),
+    # clean and OCR-distorted variations of 'Citizens Bank'
+    (r"cit[i1l]zens?\s*(bank|banx|banc)", "CITIZENS BANK, N.A.", "Citizens Bank"),
+]
+_MORTGAGE_OVERRIDE_RE = re.compile(
+    "(?=" + "|".join(f"(?P<r{i}>{pat})" for i, (pat, _, _) in enumerate(MORTGAGE_LENDER_OVERRIDES)) + ")",
+    re.IGNORECASE,
+)
+
+
+# Per-line patterns used by extract_1098mortgage_bookmark, compiled once.
+_LENDER_HINT_RE = re.compile(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp|inc)", re.IGNORECASE)
+_LENDER_WORDS_RE = re.compile(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp)", re.IGNORECASE)
+_LENDER_CORE_RE = re.compile(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust)", re.IGNORECASE)
+_LENDER_COMPANY_RE = re.compile(r"(llc|bank|mortgage|servicing|fcu|trust|credit|dba|company|corp)", re.IGNORECASE)
+_LENDER_CONTINUATION_RE = re.compile(r"(mortgage|servicing|bank|llc|trust|credit|company|dba|corp|inc)", re.IGNORECASE)
+_LENDER_NEXT_LINE_RE = re.compile(r"(mortgage|servicing|bank|llc|fcu|credit|company|association|trust|loan)", re.IGNORECASE)
+_LENDER_ANY_RE = re.compile(r"(bank|mortgage|servicing|llc|fcu|trust|corp|company|association|credit|dba|corporation)", re.IGNORECASE)
+_LENDER_TAIL_JUNK_RE = re.compile(r"(?i)\band\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully.*")
+_LENDER_INLINE_JUNK_RE = re.compile(r"(?i)\band\s+the\s+cost.*|may\s+not\s+be\s+fully.*|Form.*|Department.*|Treasury.*|Caution.*")
+_LENDER_BLOCK_JUNK_RE = re.compile(
+    r"and\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully\s+deductible.*|Limits\s+based.*|1\s*0*98\s*Mortgage.*|Interest\s+Received\s+From.*|Outstanding\s+Mortgage.*|Payer.*|Borrower.*|Box\s*\d+",
+    re.IGNORECASE,
+)
+_TELEPHONE_HEADER_RE = re.compile(r"(?i)^.*telephone\s*(no\.?|number)?:?\s*")
+_RECIPIENT_LINE_CUT_RE = re.compile(r"may\s+not\s+be\s+fully\s+deductible|OMB|Form|Department|Treasury|Caution", re.IGNORECASE)
+_RECIPIENT_NEXT_JUNK_RE = re.compile(r"may\s+not\s+be\s+fully\s+deductible.*|OMB.*|Form.*|Department.*|Treasury.*|Caution.*", re.IGNORECASE)
+_POSTAL_LINE_CUT_RE = re.compile(r"limits\s+based|may\s+not\s+be\s+fully\s+deductible|OMB|Form|Department|Treasury|Caution", re.IGNORECASE)
+_POSTAL_NEXT_JUNK_RE = re.compile(r"and\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully\s+deductible.*", re.IGNORECASE)
+_HAS_WORD_RE = re.compile(r"[A-Za-z]{3,}")
+_FCU_RE = re.compile(r"\bfcu\b", re.IGNORECASE)
+_UP_TO_FCU_RE = re.compile(r"(.*?FCU)\b", re.IGNORECASE)
+_IRS_BOILERPLATE_RE = re.compile(r"(department of the treasury|irs|payer|borrower|form 1098|instructions)", re.IGNORECASE)
+_NON_NAME_CHARS_RE = re.compile(r"[^A-Za-z0-9&.,' ]+")
+
+
+def match_mortgage_override(lines: List[str]) -> Tuple[str, str] | None:
+    """(bookmark, label) of the highest-priority override found on any line."""
+    best = None
+    for L in lines:
+        for m in _MORTGAGE_OVERRIDE_RE.finditer(L):
+            rank = int(m.lastgroup[1:])
+            if best is None or rank < best:
+                best = rank
+        if best == 0:
+            break
+    if best is None:
+        return None
+    _, bookmark, label = MORTGAGE_LENDER_OVERRIDES[best]
+    return bookmark, label
+
+
 def extract_1098mortgage_bookmark(text: str) -> str:
     """
     Extract lender name for Form 1098-Mortgage.
@@ -3478,103 +3716,35 @@ def extract_1098mortgage_bookmark(text: str) -> str:
     lower_lines = [L.lower() for L in lines]
     bookmark = ""
 
-    # 7) PHH Mortgage Corporation override
-    for L in lines:
-        if re.search(r"\bphh\s+mortgage\s+corporation\b", L, flags=re.IGNORECASE):
-            bookmark = "PHH MORTGAGE CORPORATION"
-            print(f"[1098-MORTGAGE] Rule: PHH Mortgage override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-    # 1) Rocket Mortgage override
-    for L in lines:
-        if re.search(r"rocket\s+mortgage", L, flags=re.IGNORECASE):
-            bookmark = "ROCKET MORTGAGE LLC"
-            print(f"[1098-MORTGAGE] Rule: Rocket Mortgage override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
+    # 1)–9) Known lender overrides: one merged pattern, earliest table entry wins
+    override = match_mortgage_override(lines)
+    if override:
+        bookmark, label = override
+        print(f"[1098-MORTGAGE] Rule: {label} override → {bookmark}", file=sys.stderr)
+        return finalize_bookmark(bookmark)
 
-    # 2) Dovenmuehle Mortgage override
-    for L in lines:
-        if re.search(r"dovenmuehle\s+mortgage", L, flags=re.IGNORECASE):
-            bookmark = "DOVENMUEHLE MORTGAGE, INC"
-            print(f"[1098-MORTGAGE] Rule: Dovenmuehle override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
+    for i, line in enumerate(lines):
+        lline = line.lower()
 
-    # 3) Huntington National Bank override
-    for L in lines:
-        if re.search(r"\bhuntington\s+national\s+bank\b", L, flags=re.IGNORECASE):
-            bookmark = "THE HUNTINGTON NATIONAL BANK"
-            print(f"[1098-MORTGAGE] Rule: Huntington Bank override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-
-    # 4) UNITED NATIONS FCU override
-    for L in lines:
-        if re.search(r"\bunited\s+nations\s+fcu\b", L, flags=re.IGNORECASE):
-            bookmark = "UNITED NATIONS FCU"
-            print(f"[1098-MORTGAGE] Rule: United Nations FCU override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-
-    # 5) LOANDEPOT COM LLC override
-    for L in lines:
-        if re.search(r"\bloan\s*depot\s*com\s*llc\b", L, flags=re.IGNORECASE):
-            bookmark = "LOANDEPOT.COM LLC"
-            print(f"[1098-MORTGAGE] Rule: LoanDepot override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-
-    # 6) JPMORGAN CHASE BANK, N.A.
-    for L in lines:
-        if re.search(r"jp\s*morgan\s+chase", L, flags=re.IGNORECASE):
-            bookmark = "JPMORGAN CHASE BANK, N.A."
-            print(f"[1098-MORTGAGE] Rule: JPMorgan Chase override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-            # 🔹 NEW Rule: handle "RECIPIENT'S/LENDER'S name..." header pattern
-    # 8) FOR RETURN SERVICE ONLY override
-    for L in lines:
-        if re.search(r"\bfor\s+return\s+service\s+only\b", L, flags=re.IGNORECASE):
-            bookmark = "FOR RETURN SERVICE ONLY"
-            print(f"[1098-MORTGAGE] Rule: FOR RETURN SERVICE ONLY override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-    # 9) Citizens Bank override
-        # 8) Citizens Bank override
-    for L in lines:
-        # Match clean and OCR-distorted variations of 'Citizens Bank'
-        if re.search(r"cit[i1l]zens?\s*(bank|banx|banc)", L, flags=re.IGNORECASE):
-            bookmark = "CITIZENS BANK, N.A."
-            print(f"[1098-MORTGAGE] Rule: Citizens Bank override → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(bookmark)
-
-    for i, line in enumerate(lines):
-        lline = line.lower()
-
-    # detect the header line for lender section
-        if "foreign postal code" in lline and "telephone" in lline:
-        # --- CASE 1: lender name might be on the next line ---
-            if i + 1 < len(lines):
-                nxt = lines[i + 1].strip()
+    # detect the header line for lender section
+        if "foreign postal code" in lline and "telephone" in lline:
+        # --- CASE 1: lender name might be on the next line ---
+            if i + 1 < len(lines):
+                nxt = lines[i + 1].strip()
 
             # 🧹 Remove common junk that appears after lender name
-                nxt = re.sub(
-                    r"(?i)\band\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully.*",
-                    "",
-                    nxt
-                ).strip(" *-,.:;")
+                nxt = _LENDER_TAIL_JUNK_RE.sub("", nxt).strip(" *-,.:;")
 
             # if next line has lender-like keywords, it’s the company name
-                if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp|inc)", nxt, re.IGNORECASE):
+                if _LENDER_HINT_RE.search(nxt):
                     print(f"[1098-MORTGAGE] Rule: Next line after FOREIGN POSTAL header → {nxt}", file=sys.stderr)
                     return finalize_bookmark(trim_lender_text(nxt))
 
         # --- CASE 2: lender name might be on the same line (rare OCR merge) ---
-        if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp|inc)", line, re.IGNORECASE):
+        if _LENDER_HINT_RE.search(line):
             # Trim the header portion and keep the right-side company name
-            same_line = re.sub(
-                r"(?i)^.*telephone\s*(no\.?|number)?:?\s*",
-                "",
-                line
-            )
-            same_line = re.sub(
-                r"(?i)\band\s+the\s+cost.*|may\s+not\s+be\s+fully.*|Form.*|Department.*|Treasury.*|Caution.*",
-                "",
-                same_line
-            ).strip(" *-,.:;")
+            same_line = _TELEPHONE_HEADER_RE.sub("", line)
+            same_line = _LENDER_INLINE_JUNK_RE.sub("", same_line).strip(" *-,.:;")
 
             print(f"[1098-MORTGAGE] Rule: Inline FOREIGN POSTAL line → {same_line}", file=sys.stderr)
             return finalize_bookmark(trim_lender_text(same_line))
@@ -3591,23 +3761,18 @@ def extract_1098mortgage_bookmark(text: str) -> str:
                     nxt = lines[i + j].strip()
 
                     # Clean obvious junk
-                    nxt = re.sub(
-                        r"and\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully\s+deductible.*|Limits\s+based.*|1\s*0*98\s*Mortgage.*|Interest\s+Received\s+From.*|Outstanding\s+Mortgage.*|Payer.*|Borrower.*|Box\s*\d+",
-                        "",
-                        nxt,
-                        flags=re.IGNORECASE
-                    ).strip(" *-,")
+                    nxt = _LENDER_BLOCK_JUNK_RE.sub("", nxt).strip(" *-,")
                     if len(nxt) < 4:
                         continue
 
                 # If it contains company indicators, merge continuation lines
-                    if re.search(r"(llc|bank|mortgage|servicing|fcu|trust|credit|dba|company|corp)", nxt, re.IGNORECASE):
+                    if _LENDER_COMPANY_RE.search(nxt):
                         merged = nxt
                         # Merge up to next two lines if they continue the name
                         for k in range(1, 3):
                             if i + j + k < len(lines):
                                 nxt2 = lines[i + j + k].strip()
-                                if re.search(r"(mortgage|servicing|bank|llc|trust|credit|company|dba|corp|inc)", nxt2, re.IGNORECASE):
+                                if _LENDER_CONTINUATION_RE.search(nxt2):
                                     merged += " " + nxt2
                                 else:
                                     break
@@ -3622,31 +3787,21 @@ def extract_1098mortgage_bookmark(text: str) -> str:
 
         if "recipient" in lline and "lender" in lline and "telephone" in lline:
             # check the same line for lender name (sometimes merged)
-            if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust)", line, re.IGNORECASE):
+            if _LENDER_CORE_RE.search(line):
                 # Extract only up to the first "may not be fully deductible" or "OMB" etc.
-                cleaned = re.split(
-                    r"may\s+not\s+be\s+fully\s+deductible|OMB|Form|Department|Treasury|Caution",
-                    line,
-                    maxsplit=1,
-                    flags=re.IGNORECASE
-                )[0].strip(" *-,")
+                cleaned = _RECIPIENT_LINE_CUT_RE.split(line, maxsplit=1)[0].strip(" *-,")
 
                 # If name seems valid, finalize it
-                if len(cleaned) > 5 and re.search(r"[A-Za-z]{3,}", cleaned):
+                if len(cleaned) > 5 and _HAS_WORD_RE.search(cleaned):
                     print(f"[1098-MORTGAGE] Rule: Inline RECIPIENT/LENDER line → {cleaned}", file=sys.stderr)
                     return finalize_bookmark(cleaned)
 
             # otherwise look at next line (most common pattern)
             if i + 1 < len(lines):
                 nxt = lines[i + 1].strip()
-                nxt = re.sub(
-                    r"may\s+not\s+be\s+fully\s+deductible.*|OMB.*|Form.*|Department.*|Treasury.*|Caution.*",
-                    "",
-                    nxt,
-                    flags=re.IGNORECASE
-                ).strip(" *-,")
-
-                if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust)", nxt, re.IGNORECASE):
+                nxt = _RECIPIENT_NEXT_JUNK_RE.sub("", nxt).strip(" *-,")
+
+                if _LENDER_CORE_RE.search(nxt):
                     print(f"[1098-MORTGAGE] Rule: Next-line after RECIPIENT/LENDER header → {nxt}", file=sys.stderr)
                     #return finalize_bookmark(nxt)
                     return finalize_bookmark(trim_lender_text(nxt))
@@ -3659,1719 +3814,240 @@ def extract_1098mortgage_bookmark(text: str) -> str:
         # match the header line that includes the phrase "foreign postal code, and telephone no."
         if "foreign postal code" in lline and "telephone" in lline:
             # check the same line for any lender name words (rare but possible)
-            if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp)", line, re.IGNORECASE):
-                cleaned = re.split(
-                    r"limits\s+based|may\s+not\s+be\s+fully\s+deductible|OMB|Form|Department|Treasury|Caution",
-                    line,
-                    maxsplit=1,
-                    flags=re.IGNORECASE
-                )[0].strip(" *-,")
-                if len(cleaned) > 5 and re.search(r"[A-Za-z]{3,}", cleaned):
+            if _LENDER_WORDS_RE.search(line):
+                cleaned = _POSTAL_LINE_CUT_RE.split(line, maxsplit=1)[0].strip(" *-,")
+                if len(cleaned) > 5 and _HAS_WORD_RE.search(cleaned):
                     print(f"[1098-MORTGAGE] Rule: Inline FOREIGN POSTAL line → {cleaned}", file=sys.stderr)
                     #return finalize_bookmark(cleaned)
                     return finalize_bookmark(trim_lender_text(cleaned))
 
             # otherwise look at the next line (typical OCR pattern)
-            if i + 1 < len(lines):
-                nxt = lines[i + 1].strip()
-
-                # remove OCR junk like “and the cost…” or “Form…”
-                nxt = re.sub(
-                    r"and\s+the\s+cost.*|Form.*|OMB.*|Department.*|Treasury.*|Caution.*|may\s+not\s+be\s+fully\s+deductible.*",
-                    "",
-                    nxt,
-                    flags=re.IGNORECASE
-                ).strip(" *-,")
-
-                # check if line contains any lender indicators
-                if re.search(r"(bank|mortgage|servicing|loan|llc|fcu|credit|trust|dba|company|corp)", nxt, re.IGNORECASE):
-                    # optionally merge with next line if it continues (like "MORTGAGE SERVICING")
-                    if i + 2 < len(lines):
-                        nxt2 = lines[i + 2].strip()
-                        if re.search(
-                            r"(mortgage|servicing|bank|llc|fcu|credit|company|association|trust|loan)",
-                            nxt2,
-                            re.IGNORECASE,
-                        ):
-                            nxt = f"{nxt} {nxt2}"
-                    print(f"[1098-MORTGAGE] Rule: Next-line after FOREIGN POSTAL header → {nxt}", file=sys.stderr)
-                    return finalize_bookmark(trim_lender_text(nxt))
-
-
-    # 9) FCU fallback
-    for L in lines:
-        if re.search(r"\bfcu\b", L, flags=re.IGNORECASE):
-            m = re.search(r"(.*?FCU)\b", L, flags=re.IGNORECASE)
-            bookmark = m.group(1) if m else L.strip()
-            print(f"[1098-MORTGAGE] Rule: FCU fallback → {bookmark}", file=sys.stderr)
-            return finalize_bookmark(trim_lender_text(bookmark))
-
-    # 11) Global fallback: scan all lines for any valid lender name if earlier logic failed
-    for L in lines:
-        if re.search(r"(bank|mortgage|servicing|llc|fcu|trust|corp|company|association|credit|dba|corporation)", L, re.IGNORECASE):
-        # Skip if line looks like IRS or instruction text
-            if re.search(r"(department of the treasury|irs|payer|borrower|form 1098|instructions)", L, re.IGNORECASE):
-                continue
-            clean = re.sub(r"[^A-Za-z0-9&.,' ]+", " ", L).strip()
-            if len(clean) > 8:
-                print(f"[1098-MORTGAGE] Rule: Global lender fallback → {clean}", file=sys.stderr)
-                #return finalize_bookmark(clean)
-                return finalize_bookmark(trim_lender_text(clean))
-    # Final fallback if nothing matched
-    return finalize_bookmark(trim_lender_text(bookmark or text))
-
-
-def trim_lender_text(raw: str) -> str:
-    """
-    Clean OCR text to isolate the lender name for 1098-Mortgage.
-    Keeps real names like 'NVR Mortgage Finance, Inc'
-    but trims junk like 'On The Loan Amount Mortgage West Gate Bank...'
-    """
-    if not raw or not isinstance(raw, str):
-        return ""
-
-    cleaned = raw.strip()
-
-    # --- Step 1: detect if 'Mortgage' seems part of company name ---
-    # If 'Mortgage' is followed by Finance, LLC, Inc, Bank, Company, etc. -> keep everything
-    if re.search(r"(?i)mortgage\s+(finance|llc|inc|bank|company|corp|servicing)", cleaned):
-        pass  # Don't trim anything
-    else:
-        # --- Step 2: only trim prefixes if there are junk words before 'Mortgage'
-        # (like "On The Loan Amount Mortgage West Gate Bank...")
-        if re.search(r"(?i)(on the|loan amount|understanding|page|box|form)", cleaned):
-            cleaned = re.sub(r"(?i)^.*?\bmortgage\b\s*", "", cleaned)
-
-    # --- Step 3: remove junk that appears *after* company name ---
-    cleaned = re.split(
-        r"(?i)\band\s+the\s+cost|\bmay\s+not\s+be\s+fully|\blimits\s+based|\byou\s+may\s+only|\bform\b|\bdepartment\b|\btreasury\b|\bcaution\b",
-        cleaned,
-        maxsplit=1
-    )[0]
-
-    # --- Step 4: fix OCR noise ---
-    cleaned = cleaned.replace(" ang ", " and ").replace(" apoly", " apply")
-    cleaned = cleaned.replace(" may ", " ")
-
-    # --- Step 5: remove boilerplate phrases ---
-    phrases_to_trim = [
-        "on the loan amount",
-        "limits based",
-        "interest statement",
-        "mortgage interest statement",
-        "internal revenue service",
-        "form 1098",
-        "keep for your records",
-        "statement",
-        "page",
-    ]
-    for phrase in phrases_to_trim:
-        cleaned = re.sub(phrase, "", cleaned, flags=re.IGNORECASE)
-
-    # --- Step 6: normalize spaces/punctuation ---
-    cleaned = re.sub(r"\s{2,}", " ", cleaned).strip(" ,.-")
-
-    return cleaned
-
-
-
-def finalize_bookmark(bookmark: str) -> str:
-    """Final cleanup of extracted 1098-Mortgage bookmark without removing 'Mortgage' from real company names."""
-    bookmark = clean_bookmark(bookmark)
-
-    # 1) Remove leading boilerplate phrases
-    bookmark = re.sub(
-        r'^(limits\s+based.*?|caution[:\s].*?|may\s+not\s+be\s+fully\s+deductible.*?)\b',
-        '',
-        bookmark,
-        flags=re.IGNORECASE
-    ).strip(" ,.-")
-
-    # 2) Remove trailing boilerplate tails
-    bookmark = re.sub(
-        r'\b(and\s+the\s+cost.*|may\s+apply.*|you\s+may\s+only.*)$',
-        '',
-        bookmark,
-        flags=re.IGNORECASE
-    ).strip(" ,.-")
-
-    # 3) Kill generic headers like "1098 Mortgage" or "Mortgage Interest Statement"
-    bookmark = re.sub(
-        r'^(?:form\s*)?1098\s*mortgage\b|\bmortgage\s+interest\s+statement\b',
-        '',
-        bookmark,
-        flags=re.IGNORECASE
-    ).strip(" ,.-")
-
-    # 4) If we captured a chunk like "... MORTGAGE SERVICING ...", prefer that segment
-    m = re.search(
-        r'([A-Z][A-Za-z0-9&.,\'\- ]*?\b(?:MORTGAGE\s+SERVICING|MORTGAGE\s+COMPANY|MORTGAGE\s+BANK|MORTGAGE\s+GROUP)\b[^\n,]*)',
-        bookmark,
-        flags=re.IGNORECASE
-    )
-    if m:
-        bookmark = m.group(1).strip(" ,.-")
-
-    # 5️⃣ Preserve Mortgage in legitimate company names (now includes "Corporation")
-    safe_suffixes = r'(LLC|INC\.?|N\.A\.|BANK|SERVICING|COMPANY|CORP\.?|FCU|ASSOCIATION|CORPORATION)'
-    if not re.search(rf'\b{safe_suffixes}\b', bookmark, re.IGNORECASE):
-        # Safe-strip standalone "Mortgage" if not followed by legit suffix
-        bookmark = re.sub(
-            rf'\bmortgage\b(?!\s+{safe_suffixes}\b)',
-            '',
-            bookmark,
-            flags=re.IGNORECASE
-        )
-        bookmark = re.sub(r'\s{2,}', ' ', bookmark).strip(" ,.-")
-
-    # 6) Trim internal noise fragments
-    noise_markers = [
-        "not be fully deductible",
-        "limits based on",
-        "interest received from",
-        "outstanding mortgage principal",
-        "payer",
-        "borrower",
-        "department of the treasury",
-        "irs",
-    ]
-    low = bookmark.lower()
-    for marker in noise_markers:
-        idx = low.find(marker)
-        if idx != -1:
-            bookmark = bookmark[:idx].strip(" ,.-")
-            break
-
-    # 7) Normalize spacing
-    bookmark = re.sub(r'\s{2,}', ' ', bookmark).strip(" ,.-")
-
-    # 8) Smart-case: Title-case but preserve common suffixes
-    def smart_case(s: str) -> str:
-        s = s.title()
-        replacements = {
-            r'\bLlc\b': 'LLC',
-            r'\bInc\b\.?': 'INC',
-            r'\bCorp\b\.?': 'CORP',
-            r'\bCorporation\b': 'Corporation',
-            r'\bFcu\b': 'FCU',
-            r'\bDba\b': 'DBA',
-            r'\bN\.?A\b\.?': 'N.A.',
-            r'\bUsa\b': 'USA',
-        }
-        for pat, rep in replacements.items():
-            s = re.sub(pat, rep, s)
-        return s
-
-    bookmark = smart_case(bookmark)
-    return bookmark
-
-
-
-
-def group_by_type(entries: List[Tuple[str,int,str]]) -> Dict[str,List[Tuple[str,int,str]]]:
-    d=defaultdict(list)
-    for e in entries: d[e[2]].append(e)
-    return d
-#---------------------------1098-Mortgage----------------------------------#
-#---------------------------529-Plan ----------------------------------#
-def extract_529_bookmark(text: str) -> str:
-    # Try to detect Indiana or state-specific plan first
-   
-
-    # Fallback for generic 529 terms
-    if re.search(r'\b529\b', text, re.IGNORECASE):
-        return "529 Plan"
-
-    # Default fallback
-    return "529-Plan"
-
-#---------------------------529-Plan ----------------------------------#
-#5498-SA
-
-
-def clean_bookmark(name: str) -> str:
-    """Normalize bookmark string."""
-    name = name.strip()
-    name = re.sub(r"[^\w\s.&-]", "", name)
-    return name
-
-def extract_5498sa_bookmark(text: str) -> str:
-    """
-    Extract trustee/institution name for Form 5498-SA.
-    Works even when the name is glued with address/ZIP or preceded by junk text.
-    Cleans common OCR headers like 'Do Not Cut', 'Separate Forms on This Page', etc.
-    """
-    import re
-
-    # --- Normalize spaces ---
-    cleaned = text.replace("\n", " ").replace("  ", " ")
-      # --- Step 6: Apply known OCR-based overrides ---
-    OVERRIDES = {
-    # --- Known OCR Fixes / Existing ---
-        # --- New: Bank of New York Mellon variations ---
-        "the bank of new york mellon": "The Bank of New York Mellon",
-        "the bank of new yok mellon": "The Bank of New York Mellon",   # common OCR missing 'r'
-        "bank of new york mellon": "The Bank of New York Mellon",
-        "bank of new yok mellon": "The Bank of New York Mellon",
-        "coudl u add for thi stex t also": "The Bank of New York Mellon", 
-        "healthequity inc": "HealthEquity Inc.",
-        "optum bank inc": "Optum Bank Inc.",
-        "fidelity investments hsa": "Fidelity Investments HSA",
-        "hsa bank": "HSA Bank (Webster Bank N.A.)",
-        "hsa bank webster bank": "HSA Bank (Webster Bank N.A.)",
-        "hsa bank webster bank na": "HSA Bank (Webster Bank N.A.)",
-        "lively hsa inc": "Lively HSA Inc.",
-        "bank of america hsa services": "Bank of America HSA Services",
-        "umb bank": "UMB Bank N.A.",
-        "umb bank na": "UMB Bank N.A.",
-        "first american bank": "First American Bank",
-        "wells fargo bank": "Wells Fargo Bank N.A.",
-        "wells fargo bank na": "Wells Fargo Bank N.A.",
-        "jpmorgan chase bank": "JPMorgan Chase Bank N.A.",
-        "jpmorgan chase bank na": "JPMorgan Chase Bank N.A.",
-        "associated bank": "Associated Bank N.A.",
-        "associated bank na": "Associated Bank N.A.",
-        "fifth third bank": "Fifth Third Bank N.A.",
-        "fifth third bank na": "Fifth Third Bank N.A.",
-        "keybank": "KeyBank N.A.",
-        "keybank na": "KeyBank N.A.",
-        "payflex": "PayFlex (Aetna)",
-        "payflex aetna": "PayFlex (Aetna)",
-        "benefitwallet": "BenefitWallet (Conduent)",
-        "benefitwallet conduent": "BenefitWallet (Conduent)",
-        "bend hsa inc": "Bend HSA Inc.",
-        "saturna capital": "Saturna Capital (HSA Investing)",
-        "saturna capital hsa investing": "Saturna Capital (HSA Investing)",
-        "further": "Further (Health Savings Admin by BCBS MN)",
-        "further health savings admin": "Further (Health Savings Admin by BCBS MN)",
-        "elements financial credit union": "Elements Financial Credit Union",
-        "patelco credit union": "Patelco Credit Union",
-        "digital federal credit union": "Digital Federal Credit Union (DCU)",
-        "digital federal credit union dcu": "Digital Federal Credit Union (DCU)",
-        "america first credit union": "America First Credit Union",
-        "golden 1 credit union": "Golden 1 Credit Union",
-        "truist bank": "Truist Bank",
-        "pnc bank": "PNC Bank N.A.",
-        "pnc bank na": "PNC Bank N.A.",
-        "regions bank": "Regions Bank",
-        "us bank": "U.S. Bank N.A.",
-        "us bank na": "U.S. Bank N.A.",
-        "comerica bank": "Comerica Bank",
-        "citizens bank": "Citizens Bank N.A.",
-        "citizens bank na": "Citizens Bank N.A.",
-        "first horizon bank": "First Horizon Bank",
-        "hancock whitney bank": "Hancock Whitney Bank",
-        "zions bank": "Zions Bank N.A.",
-        "zions bank na": "Zions Bank N.A.",
-        "frost bank": "Frost Bank",
-        "old national bank": "Old National Bank",
-        "synovus bank": "Synovus Bank",
-        "bok financial": "BOK Financial (Bank of Oklahoma)",
-        "bok financial bank of oklahoma": "BOK Financial (Bank of Oklahoma)",
-        "commerce bank": "Commerce Bank",
-        "first interstate bank": "First Interstate Bank",
-        "glacier bank": "Glacier Bank",
-        "banner bank": "Banner Bank",
-        "first citizens bank": "First Citizens Bank",
-        "huntington national bank": "Huntington National Bank",
-        "associated healthcare credit union": "Associated Healthcare Credit Union",
-        "advia credit union": "Advia Credit Union",
-        "premier america credit union": "Premier America Credit Union",
-        "bethpage federal credit union": "Bethpage Federal Credit Union",
-        "mountain america credit union": "Mountain America Credit Union",
-        "alliant credit union": "Alliant Credit Union",
-        "penfed credit union": "PenFed Credit Union",
-        "navy federal credit union": "Navy Federal Credit Union",
-        "schoolsfirst federal credit union": "SchoolsFirst Federal Credit Union",
-        "boeing employees credit union": "Boeing Employees Credit Union (BECU)",
-        "boeing employees credit union becu": "Boeing Employees Credit Union (BECU)",
-        "space coast credit union": "Space Coast Credit Union",
-        "redstone federal credit union": "Redstone Federal Credit Union",
-        "desert financial credit union": "Desert Financial Credit Union",
-        "gesa credit union": "Gesa Credit Union",
-        "bellco credit union": "Bellco Credit Union",
-        "ent credit union": "Ent Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "randolph brooks federal credit union": "Randolph-Brooks Federal Credit Union (RBFCU)",
-        "randolph brooks federal credit union rbfcu": "Randolph-Brooks Federal Credit Union (RBFCU)",
-        "american airlines federal credit union": "American Airlines Federal Credit Union",
-        "delta community credit union": "Delta Community Credit Union",
-        "state employees credit union": "State Employees’ Credit Union (SECU)",
-        "vantage west credit union": "Vantage West Credit Union",
-        "oregon community credit union": "Oregon Community Credit Union",
-        "truwest credit union": "TruWest Credit Union",
-        "lasso healthcare msa": "Lasso Healthcare MSA",
-        "unitedhealthcare msa plans": "UnitedHealthcare MSA Plans",
-        "humana msa plans": "Humana MSA Plans",
-        "blue cross blue shield msa plans": "Blue Cross Blue Shield MSA Plans",
-        "vibrant usa msa plans": "Vibrant USA MSA Plans",
-        "healthsavings administrators": "HealthSavings Administrators",
-        "connectyourcare": "ConnectYourCare (now Optum)",
-        "connectyourcare now optum": "ConnectYourCare (now Optum)",
-        "benefit resource inc": "Benefit Resource Inc.",
-        "hsa authority": "HSA Authority (Old National Bank Division)",
-        "hsa authority old national bank division": "HSA Authority (Old National Bank Division)",
-        "selectaccount": "SelectAccount (HealthEquity)",
-        "selectaccount healthequity": "SelectAccount (HealthEquity)",
-        "starship hsa": "Starship HSA",
-        "first bank and trust": "First Bank & Trust",
-        "peoples bank midwest": "Peoples Bank Midwest",
-        "choice bank": "Choice Bank",
-        "midwestone bank": "MidWestOne Bank",
-        "first financial bank": "First Financial Bank",
-        "cadence bank": "Cadence Bank",
-        "great southern bank": "Great Southern Bank",
-        "independent bank": "Independent Bank",
-        "origin bank": "Origin Bank",
-        "texas capital bank": "Texas Capital Bank",
-        "pinnacle financial partners": "Pinnacle Financial Partners",
-        "columbia bank": "Columbia Bank",
-        "townebank": "TowneBank",
-        "bank ozk": "Bank OZK",
-        "firstbank": "FirstBank (TN)",
-        "firstbank tn": "FirstBank (TN)",
-        "glacier hills credit union": "Glacier Hills Credit Union",
-        "security health savings": "Security Health Savings",
-        "bell bank": "Bell Bank",
-        "banner life insurance co": "Banner Life Insurance Co.",
-        "farmers and merchants bank": "Farmers & Merchants Bank",
-        "first national bank of omaha": "First National Bank of Omaha",
-        "arvest bank": "Arvest Bank",
-        "bancorpsouth bank": "BancorpSouth Bank",
-        "bank of tampa": "Bank of Tampa",
-        "bank of the west": "Bank of the West",
-        "bb&t": "BB&T (now Truist)",
-        "bb&t now truist": "BB&T (now Truist)",
-        "beneficial bank": "Beneficial Bank",
-        "bmo harris bank": "BMO Harris Bank N.A.",
-        "bmo harris bank na": "BMO Harris Bank N.A.",
-        "california bank and trust": "California Bank & Trust",
-        "cambridge trust company": "Cambridge Trust Company",
-        "capital one bank": "Capital One Bank N.A.",
-        "capital one bank na": "Capital One Bank N.A.",
-        "centier bank": "Centier Bank",
-        "central bank and trust co": "Central Bank & Trust Co.",
-        "citizens equity first credit union": "Citizens Equity First Credit Union (CEFCU)",
-        "citizens equity first credit union cefcu": "Citizens Equity First Credit Union (CEFCU)",
-        "community america credit union": "Community America Credit Union",
-        "community bank": "Community Bank N.A.",
-        "community bank na": "Community Bank N.A.",
-        "cornerstone community credit union": "Cornerstone Community Credit Union",
-        "country bank for savings": "Country Bank for Savings",
-        "credit human federal credit union": "Credit Human Federal Credit Union",
-        "dearborn federal savings bank": "Dearborn Federal Savings Bank",
-        "dedham savings bank": "Dedham Savings Bank",
-        "deere employees credit union": "Deere Employees Credit Union",
-        "denali federal credit union": "Denali Federal Credit Union",
-        "dugood federal credit union": "DuGood Federal Credit Union",
-        "elevations credit union": "Elevations Credit Union",
-        "emprise bank": "Emprise Bank",
-        "everence federal credit union": "Everence Federal Credit Union",
-        "farm bureau bank": "Farm Bureau Bank FSB",
-        "farm bureau bank fsb": "Farm Bureau Bank FSB",
-        "first community bank": "First Community Bank",
-        "first federal bank of the midwest": "First Federal Bank of the Midwest",
-        "first merchants bank": "First Merchants Bank",
-        "first mid bank and trust": "First Mid Bank & Trust",
-        "first republic bank": "First Republic Bank",
-        "first united bank and trust": "First United Bank & Trust Co.",
-        "first united bank and trust co": "First United Bank & Trust Co.",
-        "flagstar bank": "Flagstar Bank",
-        "fulton bank": "Fulton Bank N.A.",
-        "fulton bank na": "Fulton Bank N.A.",
-        "gateway bank": "Gateway Bank",
-        "georgias own credit union": "Georgia’s Own Credit Union",
-        "great plains bank": "Great Plains Bank",
-        "great western bank": "Great Western Bank",
-        "greenstate credit union": "GreenState Credit Union",
-        "guaranty bank and trust company": "Guaranty Bank & Trust Company",
-        "heritage bank of commerce": "Heritage Bank of Commerce",
-        "homestreet bank": "HomeStreet Bank",
-        "intouch credit union": "InTouch Credit Union",
-        "investors bank": "Investors Bank",
-        "johnson financial group bank": "Johnson Financial Group Bank",
-        "kinecta federal credit union": "Kinecta Federal Credit Union",
-        "lake city bank": "Lake City Bank",
-        "liberty bank": "Liberty Bank N.A.",
-        "liberty bank na": "Liberty Bank N.A.",
-        "lincoln savings bank": "Lincoln Savings Bank",
-        "mainstreet credit union": "Mainstreet Credit Union",
-        "marine federal credit union": "Marine Federal Credit Union",
-        "marquette bank": "Marquette Bank",
-        "mechanics bank": "Mechanics Bank",
-        "merchants bank of indiana": "Merchants Bank of Indiana",
-        "midfirst bank": "MidFirst Bank",
-        "midland states bank": "Midland States Bank",
-        "mutualone bank": "MutualOne Bank",
-        "nicolet national bank": "Nicolet National Bank",
-        "north island credit union": "North Island Credit Union",
-        "north shore bank": "North Shore Bank",
-        "northwest bank": "Northwest Bank",
-        "old point national bank": "Old Point National Bank",
-        "p1fcu": "P1FCU (Potlatch No. 1 Financial CU)",
-        "pathfinder bank": "Pathfinder Bank",
-        "patriot federal credit union": "Patriot Federal Credit Union",
-        "peoples trust credit union": "Peoples Trust Credit Union",
-        "provident bank of new jersey": "Provident Bank of New Jersey",
-        "quorum federal credit union": "Quorum Federal Credit Union",
-        "renasant bank": "Renasant Bank",
-        "republic bank and trust company": "Republic Bank & Trust Company",
-        "river city bank": "River City Bank",
-        "rockland trust company": "Rockland Trust Company",
-        "rocky mountain bank": "Rocky Mountain Bank",
-        "rogue credit union": "Rogue Credit Union",
-        "salem five bank": "Salem Five Bank",
-        "san diego county credit union": "San Diego County Credit Union",
-        "seattle bank": "Seattle Bank",
-        "service credit union": "Service Credit Union",
-        "shore united bank": "Shore United Bank",
-        "simmons bank": "Simmons Bank",
-        "south state bank": "South State Bank",
-        "southern bank and trust co": "Southern Bank & Trust Co.",
-        "space city credit union": "Space City Credit Union",
-        "stellar one bank": "Stellar One Bank",
-        "stockman bank of montana": "Stockman Bank of Montana",
-        "summit credit union": "Summit Credit Union",
-        "sunflower bank": "Sunflower Bank N.A.",
-        "sunflower bank na": "Sunflower Bank N.A.",
-        "tcf bank": "TCF Bank (now Huntington)",
-        "tcf bank now huntington": "TCF Bank (now Huntington)",
-        "texas bank and trust company": "Texas Bank and Trust Company",
-        "the commerce bank of washington": "The Commerce Bank of Washington",
-        "towpath credit union": "Towpath Credit Union",
-        "tompkins trust company": "Tompkins Trust Company",
-        "tower federal credit union": "Tower Federal Credit Union",
-        "town and country bank": "Town & Country Bank",
-        "tri counties bank": "Tri Counties Bank",
-        "triad bank": "Triad Bank",
-        "tricity credit union": "TriCity Credit Union",
-        "tristate capital bank": "TriState Capital Bank",
-        "trustco bank": "TrustCo Bank",
-        "tulsa federal credit union": "Tulsa Federal Credit Union",
-        "ufirst credit union": "UFirst Credit Union",
-        "umb healthcare services": "UMB Healthcare Services",
-        "unify financial credit union": "Unify Financial Credit Union",
-        "union state bank": "Union State Bank",
-        "united bank": "United Bank (WV)",
-        "united bank wv": "United Bank (WV)",
-        "united community bank": "United Community Bank (GA)",
-        "united community bank ga": "United Community Bank (GA)",
-        "united federal credit union": "United Federal Credit Union",
-        "university federal credit union": "University Federal Credit Union (TX)",
-        "university federal credit union tx": "University Federal Credit Union (TX)",
-        "university of wisconsin credit union": "University of Wisconsin Credit Union",
-        "usaa federal savings bank": "USAA Federal Savings Bank",
-        "utah first credit union": "Utah First Credit Union",
-        "valley strong credit union": "Valley Strong Credit Union",
-        "veritex community bank": "Veritex Community Bank",
-        "vermont federal credit union": "Vermont Federal Credit Union",
-        "vibe credit union": "Vibe Credit Union",
-        "virginia credit union": "Virginia Credit Union",
-        "visions federal credit union": "Visions Federal Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "wafd bank": "WaFd Bank (Washington Federal Bank)",
-        "wafd bank washington federal bank": "WaFd Bank (Washington Federal Bank)",
-        "wallis bank": "Wallis Bank",
-        "waterstone bank": "WaterStone Bank",
-        "waukesha state bank": "Waukesha State Bank",
-        "webster five cents savings bank": "Webster Five Cents Savings Bank",
-        "wesbanco bank": "WesBanco Bank Inc.",
-        "wesbanco bank inc": "WesBanco Bank Inc.",
-        "westfield bank": "Westfield Bank",
-        "wheaton bank and trust": "Wheaton Bank & Trust",
-        "whitefish credit union": "Whitefish Credit Union",
-        "wilmington savings fund society": "Wilmington Savings Fund Society (WSFS Bank)",
-        "wilmington savings fund society wsfs bank": "Wilmington Savings Fund Society (WSFS Bank)",
-        "winchester savings bank": "Winchester Savings Bank",
-        "wintrust financial corp": "Wintrust Financial Corp.",
-        "wright patt credit union": "Wright-Patt Credit Union",
-        "wyhy federal credit union": "WyHy Federal Credit Union",
-        "xceed financial credit union": "Xceed Financial Credit Union",
-        "abbybank": "AbbyBank",
-        "adams bank and trust": "Adams Bank & Trust",
-        "adirondack bank": "Adirondack Bank",
-        "advantage bank": "Advantage Bank",
-        "aimbank": "AIMBank",
-        "alabama credit union": "Alabama Credit Union",
-        "albina community bank": "Albina Community Bank",
-        "alliance bank central texas": "Alliance Bank Central Texas",
-        "alpine bank": "Alpine Bank",
-        "amalgamated bank of chicago": "Amalgamated Bank of Chicago",
-        "amboy bank": "Amboy Bank",
-        "american bank and trust": "American Bank & Trust (SD)",
-        "american bank and trust sd": "American Bank & Trust (SD)",
-        "american bank and trust company": "American Bank & Trust Company (LA)",
-        "american bank and trust company la": "American Bank & Trust Company (LA)",
-        "american eagle financial credit union": "American Eagle Financial Credit Union",
-        "american first credit union": "American First Credit Union",
-        "american heritage bank": "American Heritage Bank",
-        "american heritage credit union": "American Heritage Credit Union",
-        "americu credit union": "AmeriCU Credit Union",
-        "androscoggin bank": "Androscoggin Bank",
-        "anstaff bank": "Anstaff Bank",
-        "appalachian community fcu": "Appalachian Community FCU",
-        "apple bank for savings": "Apple Bank for Savings",
-        "aptiva bank": "Aptiva Bank",
-        "arbor bank": "Arbor Bank",
-        "arcola first bank": "Arcola First Bank",
-        "armed forces bank": "Armed Forces Bank",
-        "arrowhead credit union": "Arrowhead Credit Union",
-        "artisans bank": "Artisans Bank",
-        "ascentra credit union": "Ascentra Credit Union",
-        "asheville savings bank": "Asheville Savings Bank",
-        "atlantic city federal credit union": "Atlantic City Federal Credit Union",
-        "atlantic federal credit union": "Atlantic Federal Credit Union (ME)",
-        "atlantic federal credit union me": "Atlantic Federal Credit Union (ME)",
-        "atlantic stewardship bank": "Atlantic Stewardship Bank",
-        "auburn community federal credit union": "Auburn Community Federal Credit Union",
-        "austin bank": "Austin Bank",
-        "baker boyer bank": "Baker Boyer Bank",
-        "ballston spa national bank": "Ballston Spa National Bank",
-        "bank five nine": "Bank Five Nine",
-        "bank iowa": "Bank Iowa",
-        "bank midwest": "Bank Midwest (MN)",
-        "bank midwest mn": "Bank Midwest (MN)",
-        "bank of bozeman": "Bank of Bozeman",
-        "bank of clarke county": "Bank of Clarke County",
-        "bank of colorado": "Bank of Colorado",
-        "bank of desoto": "Bank of Desoto",
-        "bank of eastern oregon": "Bank of Eastern Oregon",
-        "bank of george": "Bank of George",
-        "bank of hawaii": "Bank of Hawaii (HSA Division)",
-        "bank of hawaii hsa division": "Bank of Hawaii (HSA Division)",
-        "bank of jackson hole": "Bank of Jackson Hole",
-        "bank of little rock": "Bank of Little Rock",
-        "bank of north carolina": "Bank of North Carolina (merged with Pinnacle)",
-        "bank of north carolina merged with pinnacle": "Bank of North Carolina (merged with Pinnacle)",
-        "bank of prairie du sac": "Bank of Prairie du Sac",
-        "bank of san francisco": "Bank of San Francisco",
-        "bank of tennessee": "Bank of Tennessee",
-        "bank of travelers rest": "Bank of Travelers Rest",
-        "bank of washington": "Bank of Washington",
-        "bank rhode island": "Bank Rhode Island",
-        "bankers trust company": "Bankers Trust Company",
-        "bankfirst financial services": "BankFirst Financial Services",
-        "banner county bank": "Banner County Bank",
-        "baraboo state bank": "Baraboo State Bank",
-        "bath savings institution": "Bath Savings Institution",
-        "baxter credit union": "Baxter Credit Union (BECU subsidiary)",
-        "baxter credit union becu subsidiary": "Baxter Credit Union (BECU subsidiary)",
-        "bay federal credit union": "Bay Federal Credit Union",
-        "baycoast bank": "BayCoast Bank",
-        "bayvanguard bank": "BayVanguard Bank",
-        "beacon credit union": "Beacon Credit Union",
-        "beaumont community credit union": "Beaumont Community Credit Union",
-        "belco community credit union": "Belco Community Credit Union",
-        "bellwood cu": "Bellwood CU",
-        "benchmark bank": "Benchmark Bank (TX)",
-        "benchmark bank tx": "Benchmark Bank (TX)",
-        "beneficial state bank": "Beneficial State Bank",
-        "benton state bank": "Benton State Bank",
-        "berkshire bank": "Berkshire Bank",
-        "beverly bank": "Beverly Bank",
-        "big horn federal savings bank": "Big Horn Federal Savings Bank",
-        "black hills federal credit union": "Black Hills Federal Credit Union",
-        "bluff view bank": "Bluff View Bank",
-        "blue ridge bank": "Blue Ridge Bank N.A.",
-        "blue ridge bank na": "Blue Ridge Bank N.A.",
-        "bmi federal credit union": "BMI Federal Credit Union",
-        "bogota savings bank": "Bogota Savings Bank",
-        "boone bank and trust": "Boone Bank & Trust Co.",
-        "boone bank and trust co": "Boone Bank & Trust Co.",
-        "boston firefighters credit union": "Boston Firefighters Credit Union",
-        "brannen bank": "Brannen Bank",
-        "bridgewater credit union": "Bridgewater Credit Union",
-        "brightstar credit union": "BrightStar Credit Union",
-        "broadview federal credit union": "Broadview Federal Credit Union",
-        "brookline bank": "Brookline Bank",
-        "brotherhood credit union": "Brotherhood Credit Union",
-        "buckeye state bank": "Buckeye State Bank",
-        "buffalo federal bank": "Buffalo Federal Bank",
-        "butte community bank": "Butte Community Bank",
-        "cabot and company bankers": "Cabot & Company Bankers",
-        "california credit union": "California Credit Union",
-        "cambridge savings bank": "Cambridge Savings Bank",
-        "camden national bank": "Camden National Bank",
-        "canandaigua federal credit union": "Canandaigua Federal Credit Union",
-        "cape ann savings bank": "Cape Ann Savings Bank",
-        "capital city bank": "Capital City Bank",
-        "capital community bank": "Capital Community Bank (CCBank)",
-        "capital community bank ccbank": "Capital Community Bank (CCBank)",
-        "capitol federal savings bank": "Capitol Federal Savings Bank",
-        "carolina foothills federal credit union": "Carolina Foothills Federal Credit Union",
-        "carter bank and trust": "Carter Bank & Trust",
-        "cascade community credit union": "Cascade Community Credit Union",
-        "cathay bank": "Cathay Bank",
-        "cbs bank": "CB&S Bank",
-        "zia credit union": "Zia Credit Union",
-        "cbi bank and trust": "CBI Bank & Trust",
-        "centennial bank": "Centennial Bank (AR)",
-        "centennial bank ar": "Centennial Bank (AR)",
-        "centerstate bank": "CenterState Bank",
-        "centric bank": "Centric Bank",
-        "central bank": "Central Bank (UT)",
-        "central bank ut": "Central Bank (UT)",
-        "central pacific bank": "Central Pacific Bank",
-        "century bank": "Century Bank (MA)",
-        "century bank ma": "Century Bank (MA)",
-        "chambers bank": "Chambers Bank",
-        "charles river bank": "Charles River Bank",
-        "chelsea state bank": "Chelsea State Bank",
-        "chemung canal trust company": "Chemung Canal Trust Company",
-        "cherokee state bank": "Cherokee State Bank",
-        "chesapeake bank": "Chesapeake Bank",
-        "chittenden bank": "Chittenden Bank",
-        "choiceone bank": "ChoiceOne Bank",
-        "citizens bank of las cruces": "Citizens Bank of Las Cruces",
-        "citizens bank of west virginia": "Citizens Bank of West Virginia",
-        "citizens first bank": "Citizens First Bank (FL)",
-        "citizens first bank fl": "Citizens First Bank (FL)",
-        "citizens national bank of texas": "Citizens National Bank of Texas",
-        "citizens state bank of loyal": "Citizens State Bank of Loyal",
-        "city and county credit union": "City & County Credit Union",
-        "city national bank of florida": "City National Bank of Florida",
-        "clackamas county bank": "Clackamas County Bank",
-        "classic bank": "Classic Bank N.A.",
-        "classic bank na": "Classic Bank N.A.",
-        "clayton bank and trust": "Clayton Bank & Trust",
-        "clinton savings bank": "Clinton Savings Bank",
-        "coastal community bank": "Coastal Community Bank",
-        "coastal heritage bank": "Coastal Heritage Bank",
-        "coastalstates bank": "CoastalStates Bank",
-        "coeur d’alene bank": "Coeur d’Alene Bank",
-        "colfax bank and trust": "Colfax Bank & Trust",
-        "colony bank": "Colony Bank",
-        "columbia state bank": "Columbia State Bank",
-        "commonwealth community bank": "Commonwealth Community Bank",
-        "community 1st credit union": "Community 1st Credit Union (IA)",
-        "community 1st credit union ia": "Community 1st Credit Union (IA)",
-        "community bank of pleasant hill": "Community Bank of Pleasant Hill",
-        "community bank of raymore": "Community Bank of Raymore",
-        "community first bank of indiana": "Community First Bank of Indiana",
-        "community resource credit union": "Community Resource Credit Union",
-        "community trust bank": "Community Trust Bank (KY)",
-        "community trust bank ky": "Community Trust Bank (KY)",
-        "communityamerica financial services": "CommunityAmerica Financial Services",
-        "communitybank of texas": "CommunityBank of Texas N.A.",
-        "communitybank of texas na": "CommunityBank of Texas N.A.",
-        "consumers national bank": "Consumers National Bank",
-        "cornerstone financial credit union": "Cornerstone Financial Credit Union",
-        "corporate america credit union": "Corporate America Credit Union",
-        "county bank": "County Bank (IA)",
-        "county bank ia": "County Bank (IA)",
-        "county national bank": "County National Bank (MI)",
-        "county national bank mi": "County National Bank (MI)",
-        "covenant bank": "Covenant Bank",
-        "crescent credit union": "Crescent Credit Union",
-        "cross river bank": "Cross River Bank",
-        "crystal lake bank and trust": "Crystal Lake Bank & Trust",
-        "cse federal credit union": "CSE Federal Credit Union",
-        "cta bank and trust": "CTA Bank & Trust",
-        "customers bank": "Customers Bank",
-        "dakota community federal cu": "Dakota Community Federal CU",
-        "dakota heritage bank": "Dakota Heritage Bank",
-        "dallas capital bank": "Dallas Capital Bank",
-        "danbury savings bank": "Danbury Savings Bank",
-        "day air credit union": "Day Air Credit Union",
-        "dedham institution for savings": "Dedham Institution for Savings",
-        "delta bank": "Delta Bank",
-        "denison state bank": "Denison State Bank",
-        "deposit bank of frankfort": "Deposit Bank of Frankfort",
-        "deseret first credit union": "Deseret First Credit Union",
-        "diamond credit union": "Diamond Credit Union",
-        "dime community bank": "Dime Community Bank",
-        "dnb first bank": "DNB First Bank",
-        "dorchester savings bank": "Dorchester Savings Bank",
-        "dover federal credit union": "Dover Federal Credit Union",
-        "drummond community bank": "Drummond Community Bank",
-        "dupage credit union": "DuPage Credit Union",
-        "dupaco community credit union": "Dupaco Community Credit Union",
-        "durden bank and trust": "Durden Bank & Trust",
-        "eagle community credit union": "Eagle Community Credit Union",
-        "eagle federal credit union": "Eagle Federal Credit Union",
-        "eagle savings bank": "Eagle Savings Bank",
-        "east bank": "East Bank (East Chicago, IN)",
-        "east bank east chicago": "East Bank (East Chicago, IN)",
-        "east boston savings bank": "East Boston Savings Bank",
-        "east cambridge savings bank": "East Cambridge Savings Bank",
-        "east river federal credit union": "East River Federal Credit Union",
-        "eastern savings bank": "Eastern Savings Bank (MD)",
-        "eastern savings bank md": "Eastern Savings Bank (MD)",
-        "eaton community bank": "Eaton Community Bank",
-        "educators credit union": "Educators Credit Union (TX)",
-        "educators credit union tx": "Educators Credit Union (TX)",
-        "eecu credit union": "EECU Credit Union (TX)",
-        "eecu credit union tx": "EECU Credit Union (TX)",
-        "el paso area teachers federal credit union": "El Paso Area Teachers Federal Credit Union",
-        "elevate bank": "Elevate Bank",
-        "elk river bank": "Elk River Bank",
-        "elmira savings bank": "Elmira Savings Bank",
-        "embassy bank for the lehigh valley": "Embassy Bank for the Lehigh Valley",
-        "empower federal credit union": "Empower Federal Credit Union",
-        "endura financial credit union": "Endura Financial Credit Union",
-        "enterprise bank and trust": "Enterprise Bank & Trust",
-        "envista credit union": "Envista Credit Union",
-        "equitable bank": "Equitable Bank (NE)",
-        "equitable bank ne": "Equitable Bank (NE)",
-        "erie federal credit union": "Erie Federal Credit Union",
-        "evertrust bank": "EverTrust Bank",
-        "exchange state bank": "Exchange State Bank",
-        "excite credit union": "Excite Credit Union",
-        "f&m bank": "F&M Bank (NC)",
-        "f&m bank nc": "F&M Bank (NC)",
-        "f&m trust": "F&M Trust (Franklin Co. PA)",
-        "f&m trust franklin co pa": "F&M Trust (Franklin Co. PA)",
-        "fairfield county bank": "Fairfield County Bank",
-        "farmers and drovers bank": "Farmers & Drovers Bank",
-        "farmers and merchants bank of central california": "Farmers & Merchants Bank of Central California",
-        "farmers bank and trust": "Farmers Bank & Trust (AR)",
-        "farmers bank and trust ar": "Farmers Bank & Trust (AR)",
-        "farmers state bank in": "Farmers State Bank (IN)",
-        "farmers state bank ia": "Farmers State Bank (IA)",
-        "farmers state bank mt": "Farmers State Bank (MT)",
-        "fayette county bank": "Fayette County Bank",
-        "fidelity bank of florida": "Fidelity Bank of Florida",
-        "fidelity deposit and discount bank": "Fidelity Deposit and Discount Bank",
-        "financial partners credit union": "Financial Partners Credit Union",
-        "finex credit union": "Finex Credit Union",
-        "first alliance credit union": "First Alliance Credit Union",
-        "first american trust fsb": "First American Trust FSB",
-        "first arkansas bank and trust": "First Arkansas Bank & Trust",
-        "first bank hampton": "First Bank Hampton",
-        "first bank kansas": "First Bank Kansas",
-        "first bank richmond": "First Bank Richmond",
-        "first bankers trust company": "First Bankers Trust Company N.A.",
-        "first bankers trust company na": "First Bankers Trust Company N.A.",
-        "first basin credit union": "First Basin Credit Union",
-        "first capital federal credit union": "First Capital Federal Credit Union",
-        "first central state bank": "First Central State Bank",
-        "first chatham bank": "First Chatham Bank",
-        "first citizens national bank": "First Citizens National Bank (TN)",
-        "first citizens national bank tn": "First Citizens National Bank (TN)",
-        "first city credit union": "First City Credit Union",
-        "first commerce credit union": "First Commerce Credit Union",
-        "first community credit union": "First Community Credit Union (MO)",
-        "first community credit union mo": "First Community Credit Union (MO)",
-        "first community credit union tx": "First Community Credit Union (TX)",
-        "first county bank": "First County Bank",
-        "first dakota national bank": "First Dakota National Bank",
-        "first eagle bank": "First Eagle Bank",
-        "first enterprise bank": "First Enterprise Bank",
-        "first federal bank": "First Federal Bank (KY)",
-        "first federal bank ky": "First Federal Bank (KY)",
-        "first federal savings bank of champaign urbana": "First Federal Savings Bank of Champaign-Urbana",
-        "first financial bank": "First Financial Bank (OH)",
-        "first financial bank oh": "First Financial Bank (OH)",
-        "first financial northwest bank": "First Financial Northwest Bank",
-        "first florida credit union": "First Florida Credit Union",
-        "first freedom bank": "First Freedom Bank",
-        "first hawaiian bank": "First Hawaiian Bank (HSA Division)",
-        "first hawaiian bank hsa division": "First Hawaiian Bank (HSA Division)",
-        "first hope bank": "First Hope Bank",
-        "first independent bank": "First Independent Bank (NV)",
-        "first independent bank nv": "First Independent Bank (NV)",
-        "first international bank and trust": "First International Bank & Trust",
-        "first interstate credit union": "First Interstate Credit Union",
-        "first mid illinois bank and trust": "First Mid-Illinois Bank & Trust",
-        "first midwest bank": "First Midwest Bank (IL)",
-        "first midwest bank il": "First Midwest Bank (IL)",
-        "first national bank in sioux falls": "First National Bank in Sioux Falls",
-        "first national bank north": "First National Bank North",
-        "first national bank of bastrop": "First National Bank of Bastrop",
-        "first national bank of brookfield": "First National Bank of Brookfield",
-        "first national bank of durango": "First National Bank of Durango",
-        "first national bank of hutchinson": "First National Bank of Hutchinson",
-        "first national bank of mcgregor": "First National Bank of McGregor",
-        "first national bank of pennsylvania": "First National Bank of Pennsylvania",
-        "first national bank of pulaski": "First National Bank of Pulaski",
-        "first national bank of st louis": "First National Bank of St. Louis",
-        "first national bank of waseca": "First National Bank of Waseca",
-        "first national bank of winnsboro": "First National Bank of Winnsboro",
-        "first national community bank": "First National Community Bank (GA)",
-        "first national community bank ga": "First National Community Bank (GA)",
-        "first northern credit union": "First Northern Credit Union",
-        "first oklahoma bank": "First Oklahoma Bank",
-        "first premier bank": "First PREMIER Bank",
-        "first robinson savings bank": "First Robinson Savings Bank",
-        "first savings bank": "First Savings Bank (IN)",
-        "first savings bank in": "First Savings Bank (IN)",
-        "first security bank": "First Security Bank (AR)",
-        "first security bank ar": "First Security Bank (AR)",
-        "first security bank of missoula": "First Security Bank of Missoula",
-        "first service bank": "First Service Bank",
-        "first southern bank": "First Southern Bank (IL)",
-        "first southern bank il": "First Southern Bank (IL)",
-        "first state bank": "First State Bank (IL)",
-        "first state bank il": "First State Bank (IL)",
-        "first state bank mi": "First State Bank (MI)",
-        "first state bank tx": "First State Bank (TX)",
-        "first state bank nebraska": "First State Bank Nebraska",
-        "first state community bank": "First State Community Bank",
-        "first state credit union": "First State Credit Union",
-        "first tennessee bank": "First Tennessee Bank (now Truist)",
-        "first tennessee bank now truist": "First Tennessee Bank (now Truist)",
-        "first texas bank": "First Texas Bank",
-        "first united bank": "First United Bank (OK)",
-        "first united bank ok": "First United Bank (OK)",
-        "first western bank and trust": "First Western Bank & Trust",
-        "first western federal savings bank": "First Western Federal Savings Bank",
-        "firstbank": "FirstBank (CO)",
-        "firstbank co": "FirstBank (CO)",
-        "firstbank of nebraska": "FirstBank of Nebraska",
-        "five star bank": "Five Star Bank",
-        "flagship bank minnesota": "Flagship Bank Minnesota",
-        "fnb bank": "FNB Bank (KY)",
-        "fnb bank ky": "FNB Bank (KY)",
-        "fnbc bank": "FNBC Bank (AR)",
-        "fnbc bank ar": "FNBC Bank (AR)",
-        "foothill credit union": "Foothill Credit Union",
-        "forest park bank": "Forest Park Bank",
-        "fort knox federal credit union": "Fort Knox Federal Credit Union",
-        "fort sill federal credit union": "Fort Sill Federal Credit Union",
-        "forward bank": "Forward Bank",
-        "fox communities credit union": "Fox Communities Credit Union",
-        "freedom bank of virginia": "Freedom Bank of Virginia",
-        "freedom credit union": "Freedom Credit Union (MA)",
-        "freedom credit union ma": "Freedom Credit Union (MA)",
-        "frontier bank": "Frontier Bank (NE)",
-        "frontier bank ne": "Frontier Bank (NE)",
-        "frontwave credit union": "Frontwave Credit Union",
-        "fsnb national bank": "FSNB National Bank",
-    
-        "fulton bank of new jersey": "Fulton Bank of New Jersey",
-        "g bank": "G Bank (Bank of Guam USA)",
-        "g bank bank of guam usa": "G Bank (Bank of Guam USA)",
-        "gainesville bank and trust": "Gainesville Bank & Trust",
-        "gannon bank": "Gannon Bank",
-        "generations bank": "Generations Bank",
-        "generations credit union": "Generations Credit Union",
-        "george d warthen bank": "George D. Warthen Bank",
-        "georgia banking company": "Georgia Banking Company",
-        "germantown trust and savings bank": "Germantown Trust & Savings Bank",
-        "gnb bank": "GNB Bank",
-        "goldenwest credit union": "Goldenwest Credit Union",
-        "goodfield state bank": "Goodfield State Bank",
-        "gorham savings bank": "Gorham Savings Bank",
-        "grand ridge national bank": "Grand Ridge National Bank",
-        "granite bank": "Granite Bank",
-        "granite state credit union": "Granite State Credit Union",
-        "great lakes credit union": "Great Lakes Credit Union",
-        "great river federal credit union": "Great River Federal Credit Union",
-        "greater nevada credit union": "Greater Nevada Credit Union",
-        "greater texas credit union": "Greater Texas Credit Union",
-        "green cove springs state bank": "Green Cove Springs State Bank",
-        "green dot bank": "Green Dot Bank",
-        "greenfield savings bank": "Greenfield Savings Bank",
-        "greenleaf bank": "Greenleaf Bank",
-        "greenville national bank": "Greenville National Bank",
-        "greylock federal credit union": "Greylock Federal Credit Union",
-        "guaranty bank and trust": "Guaranty Bank & Trust (IA)",
-        "guaranty bank and trust ia": "Guaranty Bank & Trust (IA)",
-        "gulf coast federal credit union": "Gulf Coast Federal Credit Union",
-        "gulf winds credit union": "Gulf Winds Credit Union",
-        "hancock county savings bank": "Hancock County Savings Bank",
-        "hancock whitney bank": "Hancock Whitney Bank (HSA Dept.)",
-        "hancock whitney bank hsa dept": "Hancock Whitney Bank (HSA Dept.)",
-        "happy state bank": "Happy State Bank",
-        "harborone bank": "HarborOne Bank",
-        "harrison county bank": "Harrison County Bank",
-        "hartford federal credit union": "Hartford Federal Credit Union",
-        "hawaiiusa federal credit union": "HawaiiUSA Federal Credit Union",
-        "heartland credit union": "Heartland Credit Union (WI)",
-        "heartland credit union wi": "Heartland Credit Union (WI)",
-        "heartland tri state bank": "Heartland Tri-State Bank",
-        "helena community credit union": "Helena Community Credit Union",
-        "heritage family credit union": "Heritage Family Credit Union",
-        "heritage grove federal credit union": "Heritage Grove Federal Credit Union",
-        "heritage south credit union": "Heritage South Credit Union",
-        "heritage west credit union": "Heritage West Credit Union",
-        "highland community bank": "Highland Community Bank",
-        "hilltop national bank": "Hilltop National Bank",
-        "hingham institution for savings": "Hingham Institution for Savings",
-        "horizon bank": "Horizon Bank (MI)",
-        "horizon bank mi": "Horizon Bank (MI)",
-        "horizon community bank": "Horizon Community Bank (AZ)",
-        "horizon community bank az": "Horizon Community Bank (AZ)",
-        "horizon credit union": "Horizon Credit Union (WA)",
-        "horizon credit union wa": "Horizon Credit Union (WA)",
-        "horizon federal credit union": "Horizon Federal Credit Union (PA)",
-        "horizon federal credit union pa": "Horizon Federal Credit Union (PA)",
-        "houston federal credit union": "Houston Federal Credit Union",
-        "howard county bank": "Howard County Bank",
-        "hudson city savings bank": "Hudson City Savings Bank",
-        "hudson heritage federal credit union": "Hudson Heritage Federal Credit Union",
-        "hughes federal credit union": "Hughes Federal Credit Union",
-        "huntingdon valley bank": "Huntingdon Valley Bank",
-        "ic federal credit union": "IC Federal Credit Union",
-        "idb bank": "IDB Bank (Industrial Bank of Israel)",
-        "idb bank industrial bank of israel": "IDB Bank (Industrial Bank of Israel)",
-        "ih mississippi valley credit union": "IH Mississippi Valley Credit Union",
-        "illinois state credit union": "Illinois State Credit Union",
-        "incrediblebank": "IncredibleBank",
-        "industrial bank": "Industrial Bank (Washington DC)",
-        "industrial bank washington dc": "Industrial Bank (Washington DC)",
-        "inland northwest bank": "Inland Northwest Bank",
-        "inspirus credit union": "Inspirus Credit Union",
-        "integrity bank for business": "Integrity Bank for Business",
-        "interamerican bank": "Interamerican Bank (Miami)",
-        "interamerican bank miami": "Interamerican Bank (Miami)",
-        "international bank of commerce": "International Bank of Commerce (IBC Bank)",
-        "international bank of commerce ibc bank": "International Bank of Commerce (IBC Bank)",
-        "investar bank": "Investar Bank N.A.",
-        "investar bank na": "Investar Bank N.A.",
-        "ion bank": "ION Bank",
-        "iowa heartland credit union": "Iowa Heartland Credit Union",
-        "iowa state bank and trust": "Iowa State Bank & Trust (Iowa City)",
-        "iowa state bank and trust iowa city": "Iowa State Bank & Trust (Iowa City)",
-        "iron bank": "Iron Bank (St. Louis)",
-        "iron bank st louis": "Iron Bank (St. Louis)",
-        "ironworkers bank": "Ironworkers Bank",
-        "jersey shore state bank": "Jersey Shore State Bank",
-        "john marshall bank": "John Marshall Bank",
-        "johnson city bank": "Johnson City Bank",
-        "joplin metro credit union": "Joplin Metro Credit Union",
-        "jupiter miners bank": "Jupiter Miners Bank",
-        "national financial services llc": "National Financial Services LLC",
-        "national financial serves llc": "National Financial Services LLC",
-        "bank of america": "Bank of America",
-        "bark of america": "Bank of America",
-        "bank of amerlca": "Bank of America",
-        "bank of amerlca na": "Bank of America",
-
-        # --- Major HSA / Financial Admins ---
-        "healthequity corporate": "HealthEquity Corporate",
-        "healthequity corp": "HealthEquity Corporate",
-        "health equity corporate": "HealthEquity Corporate",
-        "health equity corp": "HealthEquity Corporate",
-        "healthequity": "HealthEquity Inc.",
-        "healthequity inc": "HealthEquity Inc.",
-        "optum bank": "Optum Bank Inc.",
-        "optum bank inc": "Optum Bank Inc.",
-        "fidelity investments": "Fidelity Investments",
-        "webster bank": "Webster Bank N.A.",
-        "webster bank n a": "Webster Bank N.A.",
-        "lively hsa": "Lively HSA Inc.",
-        "lively hsa inc": "Lively HSA Inc.",
-
-        # --- Large Banks ---
-        "umb bank": "UMB Bank N.A.",
-        "umb bank n a": "UMB Bank N.A.",
-        "first american bank": "First American Bank",
-        "wells fargo": "Wells Fargo Bank N.A.",
-        "wells fargo bank": "Wells Fargo Bank N.A.",
-        "jpmorgan chase": "JPMorgan Chase Bank N.A.",
-        "chase bank": "JPMorgan Chase Bank N.A.",
-        "associated bank": "Associated Bank N.A.",
-        "fifth third": "Fifth Third Bank N.A.",
-        "keybank": "KeyBank N.A.",
-        "bend hsa": "Bend HSA Inc.",
-        "elements financial": "Elements Financial Credit Union",
-        "patelco": "Patelco Credit Union",
-        "digital federal credit union": "Digital Federal Credit Union (DCU)",
-        "america first credit union": "America First Credit Union",
-        "golden 1 credit union": "Golden 1 Credit Union",
-        "truist": "Truist Bank",
-        "pnc": "PNC Bank N.A.",
-        "regions bank": "Regions Bank",
-        "us bank": "US Bank N.A.",
-        "comerica": "Comerica Bank",
-        "citizens bank": "Citizens Bank N.A.",
-        "first horizon": "First Horizon Bank",
-        "hancock whitney": "Hancock Whitney Bank",
-        "zions bank": "Zions Bank N.A.",
-        "frost bank": "Frost Bank",
-        "old national": "Old National Bank",
-        "synovus": "Synovus Bank",
-        "commerce bank": "Commerce Bank",
-        "first interstate": "First Interstate Bank",
-        "glacier bank": "Glacier Bank",
-        "banner bank": "Banner Bank",
-        "first citizens": "First Citizens Bank",
-        "huntington national": "Huntington National Bank",
-
-        # --- Credit Unions ---
-        "associated healthcare credit union": "Associated Healthcare Credit Union",
-        "advia credit union": "Advia Credit Union",
-        "premier america credit union": "Premier America Credit Union",
-        "bethpage federal credit union": "Bethpage Federal Credit Union",
-        "mountain america credit union": "Mountain America Credit Union",
-        "alliant credit union": "Alliant Credit Union",
-        "penfed": "PenFed Credit Union",
-        "navy federal": "Navy Federal Credit Union",
-        "schoolsfirst": "SchoolsFirst Federal Credit Union",
-        "becu": "Boeing Employees Credit Union (BECU)",
-        "boeing employees credit union": "Boeing Employees Credit Union (BECU)",
-        "space coast": "Space Coast Credit Union",
-        "redstone federal": "Redstone Federal Credit Union",
-        "desert financial": "Desert Financial Credit Union",
-        "gesa credit union": "Gesa Credit Union",
-        "bellco credit union": "Bellco Credit Union",
-        "ent credit union": "Ent Credit Union",
-        "vystar credit union": "VyStar Credit Union",
-        "randolph brooks": "Randolph-Brooks Federal Credit Union",
-        "american airlines federal credit union": "American Airlines Federal Credit Union",
-        "delta community credit union": "Delta Community Credit Union",
-        "state employees credit union": "State Employees’ Credit Union (SECU)",
-        "vantage west": "Vantage West Credit Union",
-        "oregon community": "Oregon Community Credit Union",
-        "truwest": "TruWest Credit Union",
-
-        # --- MSA / Health-related Plans ---
-        "lasso healthcare": "Lasso Healthcare MSA",
-        "unitedhealthcare": "UnitedHealthcare MSA Plans",
-        "humana": "Humana MSA Plans",
-        "blue cross blue shield": "Blue Cross Blue Shield MSA Plans",
-        "vibrant usa": "Vibrant USA MSA Plans",
-        "wex": "WEX Inc.",
-                # --- Additional Financial Institutions (Extension Set) ---
-        "pioneer trust bank": "Pioneer Trust Bank (ND)",
-        "pioneer trust bank nd": "Pioneer Trust Bank (ND)",
-
-        "planters first bank": "Planters First Bank",
-        "platte valley bank": "Platte Valley Bank (NE)",
-        "platte valley bank ne": "Platte Valley Bank (NE)",
-        "platte valley national bank": "Platte Valley National Bank",
-
-        "pnc financial services": "PNC Financial Services Group",
-        "pnc financial services group": "PNC Financial Services Group",
-
-        "point breeze credit union": "Point Breeze Credit Union (MD)",
-        "point breeze credit union md": "Point Breeze Credit Union (MD)",
-        "police and fire federal credit union": "Police and Fire Federal Credit Union",
-        "popular bank": "Popular Bank (NY)",
-        "popular bank ny": "Popular Bank (NY)",
-
-        "port washington state bank": "Port Washington State Bank",
-        "prairie bank": "Prairie Bank",
-        "prairie mountain bank": "Prairie Mountain Bank",
-
-        "premier bank": "Premier Bank (Rochester MN)",
-        "premier bank rochester": "Premier Bank (Rochester MN)",
-        "premier bank rochester mn": "Premier Bank (Rochester MN)",
-
-        "premier members credit union": "Premier Members Credit Union (CO)",
-        "premier members credit union co": "Premier Members Credit Union (CO)",
-
-        "presidential bank": "Presidential Bank (FSB)",
-        "presidential bank fsb": "Presidential Bank (FSB)",
-
-        "primeway federal credit union": "PrimeWay Federal Credit Union (TX)",
-        "primeway federal credit union tx": "PrimeWay Federal Credit Union (TX)",
-
-        "princeton state bank": "Princeton State Bank",
-        "professional bank": "Professional Bank (FL)",
-        "professional bank fl": "Professional Bank (FL)",
-        "progressive bank": "Progressive Bank (LA)",
-        "progressive bank la": "Progressive Bank (LA)",
-        "prosperity bank": "Prosperity Bank (TX)",
-        "prosperity bank tx": "Prosperity Bank (TX)",
-
-        "provident bank of maryland": "Provident Bank of Maryland",
-        "provident credit union": "Provident Credit Union (CA)",
-        "provident credit union ca": "Provident Credit Union (CA)",
-
-        "ps bank": "PS Bank (Pa.)",
-        "ps bank pa": "PS Bank (Pa.)",
-        "public service credit union": "Public Service Credit Union (CO)",
-        "public service credit union co": "Public Service Credit Union (CO)",
-
-        "publix employees federal credit union": "Publix Employees Federal Credit Union",
-        "puget sound bank": "Puget Sound Bank",
-
-        "quad city bank": "Quad City Bank and Trust",
-        "quad city bank and trust": "Quad City Bank and Trust",
-
-        "queenstown bank of maryland": "Queenstown Bank of Maryland",
-        "quincy state bank": "Quincy State Bank (FL)",
-        "quincy state bank fl": "Quincy State Bank (FL)",
-
-        "quorum federal credit union": "Quorum Federal Credit Union (NY)",
-        "quorum federal credit union ny": "Quorum Federal Credit Union (NY)",
-
-        "raccoon valley bank": "Raccoon Valley Bank",
-        "randolph savings bank": "Randolph Savings Bank",
-
-        "raymond james bank": "Raymond James Bank",
-        "red river bank": "Red River Bank",
-        "red river employees federal credit union": "Red River Employees Federal Credit Union",
-
-        "redwood capital bank": "Redwood Capital Bank",
-        "reliabank dakota": "Reliabank Dakota",
-        "reliant community credit union": "Reliant Community Credit Union (NY)",
-        "reliant community credit union ny": "Reliant Community Credit Union (NY)",
-
-        "republic bank of arizona": "Republic Bank of Arizona",
-        "republic bank of chicago": "Republic Bank of Chicago",
-
-                # --- Additional Banks and Credit Unions (Requested) ---
-        "republic first bank": "Republic First Bank (Philadelphia PA)",
-        "republic first bank philadelphia": "Republic First Bank (Philadelphia PA)",
-        "republic first bank philadelphia pa": "Republic First Bank (Philadelphia PA)",
-
-        "resurgens bank": "Resurgens Bank",
-        "ridgewood savings bank": "Ridgewood Savings Bank (NY)",
-        "ridgewood savings bank ny": "Ridgewood Savings Bank (NY)",
-
-        "rising community federal credit union": "Rising Community Federal Credit Union",
-        "river bank": "River Bank (WI)",
-        "river bank wi": "River Bank (WI)",
-        "river city federal credit union": "River City Federal Credit Union (TX)",
-        "river city federal credit union tx": "River City Federal Credit Union (TX)",
-        "river falls state bank": "River Falls State Bank",
-        "river valley credit union": "River Valley Credit Union (OH)",
-        "river valley credit union oh": "River Valley Credit Union (OH)",
-        "riverland federal credit union": "RiverLand Federal Credit Union (LA)",
-        "riverland federal credit union la": "RiverLand Federal Credit Union (LA)",
-        "riverset credit union": "Riverset Credit Union (PA)",
-        "riverset credit union pa": "Riverset Credit Union (PA)",
-        "riverview community bank": "Riverview Community Bank (WA)",
-        "riverview community bank wa": "Riverview Community Bank (WA)",
-        "rock canyon bank": "Rock Canyon Bank (UT)",
-        "rock canyon bank ut": "Rock Canyon Bank (UT)",
-        "rockland federal credit union": "Rockland Federal Credit Union (MA)",
-        "rockland federal credit union ma": "Rockland Federal Credit Union (MA)",
-        "rockville bank": "Rockville Bank",
-        "rogue federal credit union": "Rogue Federal Credit Union (OR)",
-        "rogue federal credit union or": "Rogue Federal Credit Union (OR)",
-        "rolling hills bank": "Rolling Hills Bank and Trust (IA)",
-        "rolling hills bank and trust": "Rolling Hills Bank and Trust (IA)",
-        "rolling hills bank ia": "Rolling Hills Bank and Trust (IA)",
-        "roundbank": "Roundbank (Fairbault MN)",
-        "roundbank fairbault": "Roundbank (Fairbault MN)",
-        "roundbank fairbault mn": "Roundbank (Fairbault MN)",
-        "royal business bank": "Royal Business Bank (CA)",
-        "royal business bank ca": "Royal Business Bank (CA)",
-                "kahoka state bank": "Kahoka State Bank",
-        "katahdin trust co": "Katahdin Trust Co. (HSA Dept.)",
-        "katahdin trust co hsa dept": "Katahdin Trust Co. (HSA Dept.)",
-        "kaw valley bank": "Kaw Valley Bank",
-        "keystone bank": "Keystone Bank (Austin TX)",
-        "keystone bank austin": "Keystone Bank (Austin TX)",
-        "keystone bank austin tx": "Keystone Bank (Austin TX)",
-        "kish bank": "Kish Bank",
-        "kitsap credit union": "Kitsap Credit Union",
-        "kodabank": "KodaBank",
-        "kohler credit union": "Kohler Credit Union",
-        "ks statebank": "KS StateBank",
-        "la capitol federal credit union": "La Capitol Federal Credit Union",
-        "la salle state bank": "La Salle State Bank",
-        "labor credit union": "Labor Credit Union",
-        "ladue bank": "Ladue Bank",
-        "lake city federal bank": "Lake City Federal Bank",
-        "lake sunapee bank": "Lake Sunapee Bank",
-        "lakeland bank": "Lakeland Bank",
-        "lakeside bank of salina": "Lakeside Bank of Salina",
-        "lamar bank and trust": "Lamar Bank and Trust Co.",
-        "lamar bank and trust co": "Lamar Bank and Trust Co.",
-        "landmark national bank": "Landmark National Bank",
-        "langley state bank": "Langley State Bank",
-        "lansdale bank": "Lansdale Bank",
-        "laramie plains federal credit union": "Laramie Plains Federal Credit Union",
-        "laramie plains bank": "Laramie Plains Bank",
-        "lawson bank": "Lawson Bank",
-        "leader one bank": "Leader One Bank",
-        "legacy community federal credit union": "Legacy Community Federal Credit Union",
-        "legend bank": "Legend Bank",
-        "lehigh valley educators credit union": "Lehigh Valley Educators Credit Union",
-        "lewiston state bank": "Lewiston State Bank",
-        "liberty bank": "Liberty Bank (CT)",
-        "liberty bank ct": "Liberty Bank (CT)",
-        "liberty national bank": "Liberty National Bank (OH)",
-        "liberty national bank oh": "Liberty National Bank (OH)",
-        "lincoln national bank": "Lincoln National Bank (Hodgenville KY)",
-        "lincoln national bank hodgenville": "Lincoln National Bank (Hodgenville KY)",
-        "lincoln national bank hodgenville ky": "Lincoln National Bank (Hodgenville KY)",
-        "linn co op credit union": "Linn Co-op Credit Union",
-        "lisbon bank and trust": "Lisbon Bank & Trust",
-        "little horn state bank": "Little Horn State Bank",
-        "lnb community bank": "LNB Community Bank",
-        "logan bank and trust": "Logan Bank & Trust Co.",
-        "logan bank and trust co": "Logan Bank & Trust Co.",
-        "lone star credit union": "Lone Star Credit Union",
-        "lormet community federal credit union": "LorMet Community Federal Credit Union",
-        "los padres bank": "Los Padres Bank",
-        "louisiana federal credit union": "Louisiana Federal Credit Union",
-        "louisiana national bank": "Louisiana National Bank",
-        "lowell five savings bank": "Lowell Five Savings Bank",
-        "luther burbank savings": "Luther Burbank Savings",
-        "lyons national bank": "Lyons National Bank",
-        "macon bank and trust": "Macon Bank & Trust Co.",
-        "macon bank and trust co": "Macon Bank & Trust Co.",
-        "magnolia bank": "Magnolia Bank Inc.",
-        "magnolia bank inc": "Magnolia Bank Inc.",
-        "main street bank": "Main Street Bank (MA)",
-        "main street bank ma": "Main Street Bank (MA)",
-        "malvern bank": "Malvern Bank (National Association)",
-        "malvern bank national association": "Malvern Bank (National Association)",
-        "manasquan bank": "Manasquan Bank",
-        "mansfield bank": "Mansfield Bank",
-        "manufacturers bank of lewiston": "Manufacturers Bank of Lewiston",
-        "marblehead bank": "Marblehead Bank",
-        "marine midland bank": "Marine Midland Bank",
-        "marion county bank": "Marion County Bank",
-        "markesan state bank": "Markesan State Bank",
-        "marquette bank of chicago": "Marquette Bank of Chicago",
-        "marshall and ilsley bank": "Marshall & Ilsley Bank",
-        "massmutual federal credit union": "MassMutual Federal Credit Union",
-        "mayville state bank": "Mayville State Bank",
-        "mcfarland state bank": "McFarland State Bank",
-        "mcintosh county bank": "McIntosh County Bank",
-        "mediapolis savings bank": "Mediapolis Savings Bank",
-        "members 1st federal credit union": "Members 1st Federal Credit Union",
-        "members choice credit union": "Members Choice Credit Union",
-        "members heritage credit union": "Members Heritage Credit Union",
-        "merrimack county savings bank": "Merrimack County Savings Bank",
-        "metairie bank and trust": "Metairie Bank & Trust Co.",
-        "metairie bank and trust co": "Metairie Bank & Trust Co.",
-        "metro health services federal credit union": "Metro Health Services Federal Credit Union",
-        "metropolitan commercial bank": "Metropolitan Commercial Bank",
-        "meyers savings bank": "Meyers Savings Bank",
-        "michigan schools and government credit union": "Michigan Schools & Government Credit Union",
-        "midamerica credit union": "MidAmerica Credit Union",
-        "midcountry federal credit union": "MidCountry Federal Credit Union",
-
-
-        "midfirst credit union": "MidFirst Credit Union",
-
-
-        "midland community credit union": "Midland Community Credit Union",
-
-
-        "midminnesota federal credit union": "MidMinnesota Federal Credit Union",
-
-
-        "midsouth bank": "MidSouth Bank",
-
-
-        "midstate bank": "Midstate Bank",
-
-
-        "midstates bank": "Midstates Bank N.A.",
-
-
-        "midstates bank na": "Midstates Bank N.A.",
-
-
-        "midwestone credit union": "MidWestOne Credit Union",
-
-
-        "millbury federal credit union": "Millbury Federal Credit Union",
-
-
-        "minnco credit union": "Minnco Credit Union",
-
-
-        "minnesota bank and trust": "Minnesota Bank & Trust",
-
-
-        "minnstar bank": "MinnStar Bank N.A.",
-
-
-        "minnstar bank na": "MinnStar Bank N.A.",
-
-
-        "mississippi federal credit union": "Mississippi Federal Credit Union",
-
-
-        "modern woodmen bank": "Modern Woodmen Bank",
-
-
-        "monroe bank and trust": "Monroe Bank & Trust",
-
-
-        "monroe federal savings bank": "Monroe Federal Savings Bank",
-
-
-        "montana credit union": "Montana Credit Union",
-
-
-        "mountain valley bank": "Mountain Valley Bank (NH)",
-
-
-        "mountain valley bank nh": "Mountain Valley Bank (NH)",
-
-
-        "mountain west bank": "Mountain West Bank (ID)",
-
-
-        "mountain west bank id": "Mountain West Bank (ID)",
-
-
-        "mutual bank": "Mutual Bank (MA)",
-
-
-        "mutual bank ma": "Mutual Bank (MA)",
-
-
-        "mutual federal savings bank": "Mutual Federal Savings Bank",
-
-
-        "nantucket bank": "Nantucket Bank",
-
-
-        "national bank of commerce": "National Bank of Commerce (Duluth MN)",
-
-
-        "national bank of commerce duluth": "National Bank of Commerce (Duluth MN)",
-
-
-        "national bank of middlebury": "National Bank of Middlebury",
-
-
-        "national exchange bank and trust": "National Exchange Bank & Trust",
-
-
-        "national grid us federal credit union": "National Grid US Federal Credit Union",
-
-
-        "national jersey bank": "National Jersey Bank",
-
-
-        "national parks federal credit union": "National Parks Federal Credit Union",
-
-
-        "nebraska bank": "Nebraska Bank",
-
-
-        "nebraska energy federal credit union": "Nebraska Energy Federal Credit Union",
-
-
-        "neighborhood national bank": "Neighborhood National Bank",
-
-
-        "netbank federal savings bank": "NetBank Federal Savings Bank",
-
-
-        "new alliance bank": "New Alliance Bank",
-
-
-        "new century bank": "New Century Bank",
-
-
-        "new dominion bank": "New Dominion Bank",
-
-
-        "new haven county credit union": "New Haven County Credit Union",
-
-
-        "new milford bank and trust": "New Milford Bank & Trust Co.",
-
-
-        "new tripoli bank": "New Tripoli Bank",
-
-
-        "new york community bank": "New York Community Bank",
-
-
-        "newburyport five cents savings bank": "Newburyport Five Cents Savings Bank",
-
-
-        "newtown savings bank": "Newtown Savings Bank",
-
-
-        "nicolet federal credit union": "Nicolet Federal Credit Union",
-
-
-        "nodaway valley bank": "Nodaway Valley Bank",
-
-
-        "north american bank and trust": "North American Bank & Trust Co.",
-
-
-        "north brookfield savings bank": "North Brookfield Savings Bank",
-
-
-        "north community bank": "North Community Bank",
-
-
-        "north country federal credit union": "North Country Federal Credit Union",
-
-
-        "north easton savings bank": "North Easton Savings Bank",
-
-
-        "north island federal credit union": "North Island Federal Credit Union",
-
-
-        "north shore federal credit union": "North Shore Federal Credit Union",
-
-
-        "north state bank": "North State Bank (NC)",
-
-
-        "north state bank nc": "North State Bank (NC)",
-
-
-        "northeast bank": "Northeast Bank (ME)",
-
-
-        "northeast bank me": "Northeast Bank (ME)",
-
-
-        "northern interstate bank": "Northern Interstate Bank N.A.",
-
-
-        "northern interstate bank na": "Northern Interstate Bank N.A.",
-
-
-        "northern skies federal credit union": "Northern Skies Federal Credit Union",
-
-
-        "northern trust bank": "Northern Trust Bank",
-
-
-        "northfield savings bank": "Northfield Savings Bank (VT)",
-
-
-        "northfield savings bank vt": "Northfield Savings Bank (VT)",
-
-
-        "northland area federal credit union": "Northland Area Federal Credit Union",
-
-
-        "northwest community credit union": "Northwest Community Credit Union (OR)",
-
-
-        "northwest community credit union or": "Northwest Community Credit Union (OR)",
-
-
-        "northwest federal credit union": "Northwest Federal Credit Union (VA)",
-
-
-        "northwest federal credit union va": "Northwest Federal Credit Union (VA)",
-
-
-        "norway savings bank": "Norway Savings Bank",
-
-
-        "notre dame federal credit union": "Notre Dame Federal Credit Union (IN)",
-
-
-        "notre dame federal credit union in": "Notre Dame Federal Credit Union (IN)",
-
-
-        "nuvision credit union": "NuVision Credit Union (CA)",
-
-
-        "nuvision credit union ca": "NuVision Credit Union (CA)",
-
-
-        "oak bank": "Oak Bank (WI)",
-
-
-        "oak bank wi": "Oak Bank (WI)",
-
-
-        "oakstar bank": "OakStar Bank",
-
-
-        "ocean financial federal credit union": "Ocean Financial Federal Credit Union",
-
-
-        "oceanfirst bank": "OceanFirst Bank (NJ)",
-
-
-        "oceanfirst bank nj": "OceanFirst Bank (NJ)",
-
-
-        "oceanview federal credit union": "OceanView Federal Credit Union",
-
-
-        "ohio catholic federal credit union": "Ohio Catholic Federal Credit Union",
-
-
-        "ohio savings bank": "Ohio Savings Bank",
-
-
-        "old dominion national bank": "Old Dominion National Bank",
-
-
-        "old point trust": "Old Point Trust and Financial Services",
-
-
-        "old point trust and financial services": "Old Point Trust and Financial Services",
-
-
-        "old second national bank": "Old Second National Bank (IL)",
-
-
-        "old second national bank il": "Old Second National Bank (IL)",
-
-
-        "old west federal credit union": "Old West Federal Credit Union",
-
-
-        "olean area federal credit union": "Olean Area Federal Credit Union",
-
-
-        "onpoint community credit union": "OnPoint Community Credit Union",
-
-
-        "orange bank and trust": "Orange Bank & Trust Company",
-
-
-        "orange bank and trust company": "Orange Bank & Trust Company",
-
-
-        "oregon pacific bank": "Oregon Pacific Bank",
-
-
-        "oriental bank": "Oriental Bank (Puerto Rico division excluded)",
-
-
-        "oriental bank puerto rico": "Oriental Bank (Puerto Rico division excluded)",
-
-
-        "orrstown bank": "Orrstown Bank",
-
-
-        "oswego county federal credit union": "Oswego County Federal Credit Union",
-
-
-        "ouachita valley federal credit union": "Ouachita Valley Federal Credit Union",
-
-
-        "ozark bank": "Ozark Bank",
-
-
-        "ozark federal credit union": "Ozark Federal Credit Union",
-
-
-        "pacific crest federal credit union": "Pacific Crest Federal Credit Union",
-
-
-        "pacific premier bank": "Pacific Premier Bank",
-
-
-        "pacific service credit union": "Pacific Service Credit Union",
-
-
-        "pacific valley bank": "Pacific Valley Bank",
-
-
-        "palmetto citizens federal credit union": "Palmetto Citizens Federal Credit Union",
-
-
-        "palo savings bank": "Palo Savings Bank",
-
-
-        "park national bank": "Park National Bank",
-
-
-        "parkway bank and trust": "Parkway Bank & Trust Co.",
-
-
-        "parkway bank and trust co": "Parkway Bank & Trust Co.",
-
-
-        "partners federal credit union": "Partners Federal Credit Union",
-
-
-        "pathways financial credit union": "Pathways Financial Credit Union",
-
-
-        "patriot bank": "Patriot Bank (Norwalk CT)",
-
-
-        "patriot bank norwalk": "Patriot Bank (Norwalk CT)",
-
-
-        "patriot bank norwalk ct": "Patriot Bank (Norwalk CT)",
-
-
-        "paul federated credit union": "Paul Federated Credit Union",
-
-
-        "peach state federal credit union": "Peach State Federal Credit Union",
-
-
-        "peapack gladstone financial corp": "Peapack-Gladstone Financial Corp.",
-
-
-        "pella state bank": "Pella State Bank",
-
-
-        "penair federal credit union": "PenAir Federal Credit Union",
-
-
-        "peninsula federal credit union": "Peninsula Federal Credit Union",
-
-
-        "peoples bank": "Peoples Bank (Bellingham WA)",
-
-
-        "peoples bank bellingham": "Peoples Bank (Bellingham WA)",
-
-
-        "peoples bank bellingham wa": "Peoples Bank (Bellingham WA)",
-
+            if i + 1 < len(lines):
+                nxt = lines[i + 1].strip()
 
-        "peoples bank of alabama": "Peoples Bank of Alabama",
+                # remove OCR junk like “and the cost…” or “Form…”
+                nxt = _POSTAL_NEXT_JUNK_RE.sub("", nxt).strip(" *-,")
 
+                # check if line contains any lender indicators
+                if _LENDER_WORDS_RE.search(nxt):
+                    # optionally merge with next line if it continues (like "MORTGAGE SERVICING")
+                    if i + 2 < len(lines):
+                        nxt2 = lines[i + 2].strip()
+                        if _LENDER_NEXT_LINE_RE.search(nxt2):
+                            nxt = f"{nxt} {nxt2}"
+                    print(f"[1098-MORTGAGE] Rule: Next-line after FOREIGN POSTAL header → {nxt}", file=sys.stderr)
+                    return finalize_bookmark(trim_lender_text(nxt))
 
-        "peoples bank of kankakee": "Peoples Bank of Kankakee County",
 
+    # 9) FCU fallback
+    for L in lines:
+        if _FCU_RE.search(L):
+            m = _UP_TO_FCU_RE.search(L)
+            bookmark = m.group(1) if m else L.strip()
+            print(f"[1098-MORTGAGE] Rule: FCU fallback → {bookmark}", file=sys.stderr)
+            return finalize_bookmark(trim_lender_text(bookmark))
 
-        "peoples bank of kankakee county": "Peoples Bank of Kankakee County",
+    # 11) Global fallback: scan all lines for any valid lender name if earlier logic failed
+    for L in lines:
+        if _LENDER_ANY_RE.search(L):
+        # Skip if line looks like IRS or instruction text
+            if _IRS_BOILERPLATE_RE.search(L):
+                continue
+            clean = _NON_NAME_CHARS_RE.sub(" ", L).strip()
+            if len(clean) > 8:
+                print(f"[1098-MORTGAGE] Rule: Global lender fallback → {clean}", file=sys.stderr)
+                #return finalize_bookmark(clean)
+                return finalize_bookmark(trim_lender_text(clean))
+    # Final fallback if nothing matched
+    return finalize_bookmark(trim_lender_text(bookmark or text))
 
 
-        "peoples community bank": "Peoples Community Bank (MO)",
+# trim_lender_text / finalize_bookmark patterns, compiled once
+_MORTGAGE_COMPANY_RE = re.compile(r"(?i)mortgage\s+(finance|llc|inc|bank|company|corp|servicing)")
+_LENDER_PREFIX_JUNK_RE = re.compile(r"(?i)(on the|loan amount|understanding|page|box|form)")
+_UP_TO_MORTGAGE_RE = re.compile(r"(?i)^.*?\bmortgage\b\s*")
+_LENDER_TAIL_SPLIT_RE = re.compile(
+    r"(?i)\band\s+the\s+cost|\bmay\s+not\s+be\s+fully|\blimits\s+based|\byou\s+may\s+only|\bform\b|\bdepartment\b|\btreasury\b|\bcaution\b"
+)
+# Applied one after another (not as one alternation) so overlapping phrases
+# such as "interest statement" / "mortgage interest statement" trim as before.
+_LENDER_BOILERPLATE_RES = tuple(re.compile(phrase, re.IGNORECASE) for phrase in (
+    "on the loan amount",
+    "limits based",
+    "interest statement",
+    "mortgage interest statement",
+    "internal revenue service",
+    "form 1098",
+    "keep for your records",
+    "statement",
+    "page",
+))
+_MULTI_SPACE_RE = re.compile(r"\s{2,}")
+_BOOKMARK_LEADING_JUNK_RE = re.compile(
+    r'^(limits\s+based.*?|caution[:\s].*?|may\s+not\s+be\s+fully\s+deductible.*?)\b', re.IGNORECASE
+)
+_BOOKMARK_TRAILING_JUNK_RE = re.compile(r'\b(and\s+the\s+cost.*|may\s+apply.*|you\s+may\s+only.*)$', re.IGNORECASE)
+_BOOKMARK_GENERIC_HEADER_RE = re.compile(
+    r'^(?:form\s*)?1098\s*mortgage\b|\bmortgage\s+interest\s+statement\b', re.IGNORECASE
+)
+_BOOKMARK_MORTGAGE_SEGMENT_RE = re.compile(
+    r'([A-Z][A-Za-z0-9&.,\'\- ]*?\b(?:MORTGAGE\s+SERVICING|MORTGAGE\s+COMPANY|MORTGAGE\s+BANK|MORTGAGE\s+GROUP)\b[^\n,]*)',
+    re.IGNORECASE
+)
+_SAFE_LENDER_SUFFIXES = r'(LLC|INC\.?|N\.A\.|BANK|SERVICING|COMPANY|CORP\.?|FCU|ASSOCIATION|CORPORATION)'
+_SAFE_LENDER_SUFFIX_RE = re.compile(rf'\b{_SAFE_LENDER_SUFFIXES}\b', re.IGNORECASE)
+_BARE_MORTGAGE_RE = re.compile(rf'\bmortgage\b(?!\s+{_SAFE_LENDER_SUFFIXES}\b)', re.IGNORECASE)
+_SMART_CASE_FIXES = tuple((re.compile(pat), rep) for pat, rep in (
+    (r'\bLlc\b', 'LLC'),
+    (r'\bInc\b\.?', 'INC'),
+    (r'\bCorp\b\.?', 'CORP'),
+    (r'\bCorporation\b', 'Corporation'),
+    (r'\bFcu\b', 'FCU'),
+    (r'\bDba\b', 'DBA'),
+    (r'\bN\.?A\b\.?', 'N.A.'),
+    (r'\bUsa\b', 'USA'),
+))
 
 
-        "peoples community bank mo": "Peoples Community Bank (MO)",
+def trim_lender_text(raw: str) -> str:
+    """
+    Clean OCR text to isolate the lender name for 1098-Mortgage.
+    Keeps real names like 'NVR Mortgage Finance, Inc'
+    but trims junk like 'On The Loan Amount Mortgage West Gate Bank...'
+    """
+    if not raw or not isinstance(raw, str):
+        return ""
 
+    cleaned = raw.strip()
 
-        "peoples exchange bank": "Peoples Exchange Bank",
+    # --- Step 1: detect if 'Mortgage' seems part of company name ---
+    # If 'Mortgage' is followed by Finance, LLC, Inc, Bank, Company, etc. -> keep everything
+    if _MORTGAGE_COMPANY_RE.search(cleaned):
+        pass  # Don't trim anything
+    else:
+        # --- Step 2: only trim prefixes if there are junk words before 'Mortgage'
+        # (like "On The Loan Amount Mortgage West Gate Bank...")
+        if _LENDER_PREFIX_JUNK_RE.search(cleaned):
+            cleaned = _UP_TO_MORTGAGE_RE.sub("", cleaned)
 
+    # --- Step 3: remove junk that appears *after* company name ---
+    cleaned = _LENDER_TAIL_SPLIT_RE.split(cleaned, maxsplit=1)[0]
 
-        "peoples national bank": "Peoples National Bank (TN)",
+    # --- Step 4: fix OCR noise ---
+    cleaned = cleaned.replace(" ang ", " and ").replace(" apoly", " apply")
+    cleaned = cleaned.replace(" may ", " ")
 
+    # --- Step 5: remove boilerplate phrases ---
+    for phrase_re in _LENDER_BOILERPLATE_RES:
+        cleaned = phrase_re.sub("", cleaned)
 
-        "peoples national bank tn": "Peoples National Bank (TN)",
+    # --- Step 6: normalize spaces/punctuation ---
+    cleaned = _MULTI_SPACE_RE.sub(" ", cleaned).strip(" ,.-")
 
+    return cleaned
 
-        "peoples state bank": "Peoples State Bank (IN)",
 
 
-        "peoples state bank in": "Peoples State Bank (IN)",
+def finalize_bookmark(bookmark: str) -> str:
+    """Final cleanup of extracted 1098-Mortgage bookmark without removing 'Mortgage' from real company names."""
+    bookmark = clean_bookmark(bookmark)
 
+    # 1) Remove leading boilerplate phrases
+    bookmark = _BOOKMARK_LEADING_JUNK_RE.sub('', bookmark).strip(" ,.-")
 
-        "peoples trust federal credit union": "Peoples Trust Federal Credit Union",
+    # 2) Remove trailing boilerplate tails
+    bookmark = _BOOKMARK_TRAILING_JUNK_RE.sub('', bookmark).strip(" ,.-")
 
+    # 3) Kill generic headers like "1098 Mortgage" or "Mortgage Interest Statement"
+    bookmark = _BOOKMARK_GENERIC_HEADER_RE.sub('', bookmark).strip(" ,.-")
 
-        "perkins state bank": "Perkins State Bank",
+    # 4) If we captured a chunk like "... MORTGAGE SERVICING ...", prefer that segment
+    m = _BOOKMARK_MORTGAGE_SEGMENT_RE.search(bookmark)
+    if m:
+        bookmark = m.group(1).strip(" ,.-")
 
+    # 5️⃣ Preserve Mortgage in legitimate company names (now includes "Corporation")
+    if not _SAFE_LENDER_SUFFIX_RE.search(bookmark):
+        # Safe-strip standalone "Mortgage" if not followed by legit suffix
+        bookmark = _BARE_MORTGAGE_RE.sub('', bookmark)
+        bookmark = _MULTI_SPACE_RE.sub(' ', bookmark).strip(" ,.-")
 
-        "perpetual federal savings bank": "Perpetual Federal Savings Bank",
+    # 6) Trim internal noise fragments
+    noise_markers = [
+        "not be fully deductible",
+        "limits based on",
+        "interest received from",
+        "outstanding mortgage principal",
+        "payer",
+        "borrower",
+        "department of the treasury",
+        "irs",
+    ]
+    low = bookmark.lower()
+    for marker in noise_markers:
+        idx = low.find(marker)
+        if idx != -1:
+            bookmark = bookmark[:idx].strip(" ,.-")
+            break
 
+    # 7) Normalize spacing
+    bookmark = _MULTI_SPACE_RE.sub(' ', bookmark).strip(" ,.-")
 
-        "piedmont advantage credit union": "Piedmont Advantage Credit Union",
+    # 8) Smart-case: Title-case but preserve common suffixes
+    def smart_case(s: str) -> str:
+        s = s.title()
+        for pat, rep in _SMART_CASE_FIXES:
+            s = pat.sub(rep, s)
+        return s
 
+    bookmark = smart_case(bookmark)
+    return bookmark
 
-        "pima federal credit union": "Pima Federal Credit Union",
 
 
-        "pinnacle bank": "Pinnacle Bank (NE)",
 
+def group_by_type(entries: List[Tuple[str,int,str]]) -> Dict[str,List[Tuple[str,int,str]]]:
+    d=defaultdict(list)
+    for e in entries: d[e[2]].append(e)
+    return d
+#---------------------------1098-Mortgage----------------------------------#
+#---------------------------529-Plan ----------------------------------#
+def extract_529_bookmark(text: str) -> str:
+    # Try to detect Indiana or state-specific plan first
+   
 
-        "pinnacle bank ne": "Pinnacle Bank (NE)",
+    # Fallback for generic 529 terms
+    if re.search(r'\b529\b', text, re.IGNORECASE):
+        return "529 Plan"
 
+    # Default fallback
+    return "529-Plan"
 
-        "pioneer bank": "Pioneer Bank (NY)",
+#---------------------------529-Plan ----------------------------------#
+#5498-SA
 
 
-        "pioneer bank ny": "Pioneer Bank (NY)",
-        "pioneer credit union": "Pioneer Credit Union",
-        "pioneer federal credit union": "Pioneer Federal Credit Union (ID)",
-        "pioneer federal credit union id": "Pioneer Federal Credit Union (ID)"
+def clean_bookmark(name: str) -> str:
+    """Normalize bookmark string."""
+    name = name.strip()
+    name = re.sub(r"[^\w\s.&-]", "", name)
+    return name
 
-    }
+def extract_5498sa_bookmark(text: str) -> str:
+    """
+    Extract trustee/institution name for Form 5498-SA.
+    Works even when the name is glued with address/ZIP or preceded by junk text.
+    Cleans common OCR headers like 'Do Not Cut', 'Separate Forms on This Page', etc.
+    """
+    import re
 
-   
+    # --- Normalize spaces ---
+    cleaned = text.replace("\n", " ").replace("  ", " ")
+    # --- Known institutions (shared HSA trustee registry, longest match) ---
     normalized_text = normalize_text(text)
-    for key, val in OVERRIDES.items():
-        if key in normalized_text:
-            return val
+    known = INSTITUTIONS.lookup("hsa_trustees", normalized_text)
+    if known:
+        return known
     # ✅ Step 1: Remove known noisy prefixes before the real institution
     cleaned = re.sub(
         r"(?i)\b(do\s+not\s+cut.*?|separate\s+forms?\s+on\s+this\s+page.*?|see\s+instructions\s+on\s+back.*?)\b(?=[A-Z])",
@@ -5621,87 +4297,308 @@ def classify_div_int(text: str) -> str | None:
         return "1099-INT"
     return None
 # SSN TP & SP
+# Pages and SSNs are compared with dashes / spaces dropped and mask
+# characters read as X, so "***-**-1234" and "XXX-XX-1234" look alike.
+_SSN_CLEAN = str.maketrans({"-": None, " ": None, "*": "X", "•": "X"})
+
+
+@lru_cache(maxsize=8)
+def ssn_owner_matcher(tp_ssn: str, sp_ssn: str):
+    """
+    One pattern for both owners, tried at every position: each SSN as
+    given, and for a full SSN also its last four behind a mask. None when
+    neither SSN is known.
+    """
+    alts = []
+    for owner, ssn in (("TP", tp_ssn), ("SP", sp_ssn)):
+        ssn = (ssn or "").translate(_SSN_CLEAN)
+        if not ssn:
+            continue
+        variants = [re.escape(ssn)]
+        if len(ssn) > 4:
+            variants.append("X{5}" + re.escape(ssn[-4:]))
+        alts.append(f"(?P<{owner}>{'|'.join(variants)})")
+    return re.compile("(?=" + "|".join(alts) + ")", re.IGNORECASE) if alts else None
+
+
 def detect_ssn_owner(text, tp_ssn, sp_ssn):
-    clean = text.replace("-", "").replace(" ", "").replace("*", "").replace("•", "")
+    """"TP" if the taxpayer's SSN is on the page, else "SP" for the spouse's, else None."""
+    matcher = ssn_owner_matcher(tp_ssn, sp_ssn)
+    if matcher is None:
+        return None
+    owner = None
+    for m in matcher.finditer(text.translate(_SSN_CLEAN)):
+        if m.lastgroup == "TP":
+            return "TP"
+        owner = "SP"
+    return owner
+
+# ── Page analysis (classification + bookmark title consensus)
+# A page is classified once, on its tiered text. The form's title extractor
+# then runs on candidate texts in confidence order (the re-OCR'd title box of
+# a scanned form, the tiered text, the other extraction methods) and stops
+# as soon as TITLE_AGREEMENT candidates agree on a title. Readings are
+# pulled lazily, so extra backends only run when they are actually needed.
+# Two readings must agree by default, which keeps the cross-method vote the
+# W-2 employer name always had; if no title reaches that, the most-voted
+# (earliest on ties) one is kept.
+from dataclasses import dataclass, field
+
+TITLE_AGREEMENT = max(1, int(os.environ.get("TITLE_AGREEMENT", "2")))
+
+
+# form → (category, title extractor, value meaning "no title found");
+# parse_w2 returns all W-2 fields, the title is its employer_name
+TITLE_EXTRACTORS = {
+    "W-2": ("Income", parse_w2, "N/A"),
+    "1099-INT": ("Income", extract_1099int_bookmark, "1099-INT"),
+    "1099-DIV": ("Income", extract_1099div_bookmark, "1099-DIV"),
+    "1099-SA": ("Income", extract_1099sa_bookmark, "1099-SA"),
+    "1099-R": ("Income", extract_1099r_bookmark, "1099-R"),
+    "1098-Mortgage": ("Expenses", extract_1098mortgage_bookmark, "1098-Mortgage"),
+    "5498-SA": ("Expenses", extract_5498sa_bookmark, "5498-SA"),
+    "1098-T": ("Expenses", extract_1098t_bookmark, "1098-T"),
+    "529-Plan": ("Expenses", extract_529_bookmark, "529-Plan"),
+}
+
 
-    if tp_ssn and tp_ssn in clean:
-        return "TP"
+def _analysis_rules_version() -> str:
+    """
+    Digest of everything a cached PageAnalysis depends on besides the page:
+    this module's source (classifier, extractors, rule tables) and the
+    loaded institution registry.
+    """
+    h = hashlib.blake2b(digest_size=8)
+    try:
+        with open(os.path.abspath(__file__), "rb") as f:
+            h.update(f.read())
+    except OSError:
+        h.update(repr(sorted((form, fn.__name__) for form, (_, fn, _) in TITLE_EXTRACTORS.items())).encode())
+    h.update(json.dumps(INSTITUTIONS.tables, sort_keys=True).encode())
+    return h.hexdigest()
 
-    if sp_ssn and sp_ssn in clean:
-        return "SP"
 
-    return None
+# part of the analysis cache key, so edited rules or institutions.json
+# never serve a classification computed by the old ones
+ANALYSIS_RULES_VERSION = _analysis_rules_version()
 
-# ── Merge + bookmarks + cleanup
-def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
 
-    import json
-    import sys
+@dataclass
+class PageAnalysis:
+    """Classification and bookmark title of one page."""
+    category: str
+    form: str
+    title: str | None = None            # payer / employer / trustee, if found
+    title_source: str | None = None     # candidate the title was first read from
+    fields: Dict[str, str] | None = None  # parse_w2() result behind a W-2 title
+    votes: Counter = field(default_factory=Counter)
+    tried: List[str] = field(default_factory=list)  # candidates the extractor ran on
+    owner: str | None = None            # "TP" / "SP" by the SSN on the page (per run, not cached)
 
 
-    # Default values
-    tp_ssn = ""
-    sp_ssn = ""
-    tp_name = ""
-    sp_name = ""
+def candidate_methods(record: Dict[str, object]) -> Tuple[str, ...]:
+    """Extraction methods ranked by how likely they are to read this page well."""
+    if record.get("ocr"):
+        return ("Tesseract", "PyMuPDF", "PDFMiner", "pdfplumber")
+    return ("PyMuPDF", "PDFMiner", "pdfplumber", "Tesseract")
 
-    # The server now sends JSON as 4th argument
+
+def title_candidates(store: "PageTextStore", path: str, page_index: int, form: str) -> List[tuple]:
+    """
+    (name, get_text) readings of a page for analyse_page, best first: the
+    re-OCR'd title box of a scanned page with a FORM_LAYOUTS entry, the
+    tiered text, the title box read off the word layout, then the other
+    extraction methods.
+    """
+    record = store.record(path, page_index)
+    readings = []
+    if record.get("ocr") and "title" in FORM_LAYOUTS.get(form, {}):
+        readings.append(("roi", lambda: store.region_text(path, page_index, form, "title")))
+    readings.append(("tiered", lambda: record["text"]))
+    readings.append(("layout", lambda: layout_title_text(store.layout(path, page_index), form)))
+    readings += [(m, lambda m=m: store.method_text(path, page_index, m)) for m in candidate_methods(record)]
+    return readings
+
+
+def analyse_page(text: str, candidates=None) -> PageAnalysis:
+    """
+    Classify `text` and find its bookmark title. `candidates(form)` gives
+    the (name, get_text) readings to extract the title from, best first
+    (default: `text` alone); they are pulled only while no title has
+    TITLE_AGREEMENT votes. A full-page method text counts only when it
+    classifies as the same form; texts already seen are skipped.
+    """
+    cat, ft = classify_text(text)
+    analysis = PageAnalysis(cat, ft)
+    spec = TITLE_EXTRACTORS.get(ft)
+    if spec is None or spec[0] != cat:
+        return analysis
+    _, extract, none_value = spec
+
+    seen = set()
+    for name, get_text in (candidates(ft) if candidates else [("tiered", lambda: text)]):
+        txt = get_text() or ""
+        fingerprint = txt.strip()
+        if not fingerprint or fingerprint in seen:
+            continue
+        seen.add(fingerprint)
+        if name in EXTRACT_METHODS and classify_text(txt) != (cat, ft):
+            continue
+        analysis.tried.append(name)
+        result = extract(txt)
+        title = result["employer_name"] if isinstance(result, dict) else result
+        if not title or title == none_value:
+            continue
+        analysis.votes[title] += 1
+        if analysis.title is None or analysis.votes[title] > analysis.votes[analysis.title]:
+            analysis.title, analysis.title_source = title, name
+            analysis.fields = result if isinstance(result, dict) else None
+        if analysis.votes[title] >= TITLE_AGREEMENT:
+            break
+    return analysis
+
+
+# ── Output assembly
+class OutputAssembler:
+    """
+    Builds the merged PDF in memory: pages are cloned straight from the
+    pool's cached PdfReaders into one PdfWriter, so objects a source shares
+    between its pages (fonts, images, XObjects) are copied once per source
+    rather than once per page. Outline items are only recorded while pages
+    are being added and are attached in write(), when every target page
+    exists; the file is then written in a single pass.
+    """
+
+    def __init__(self, pool: DocumentPool):
+        self.pool = pool
+        self.writer = PdfWriter()
+        self._outline: List[tuple] = []   # (title, page_number, parent handle)
+
+    def __len__(self) -> int:
+        return len(self.writer.pages)
+
+    def add_page(self, path: str, page_index: int):
+        self.writer.add_page(self.pool.pypdf_page(path, page_index))
+
+    def add_outline_item(self, title: str, page_number: int, parent: int | None = None) -> int:
+        """Record an outline item; returns a handle to pass as a child's parent."""
+        self._outline.append((title, page_number, parent))
+        return len(self._outline) - 1
+
+    def _build_outline(self):
+        last = len(self.writer.pages) - 1
+        nodes = []
+        for title, page_number, parent in self._outline:
+            # A section opened after the last page has nothing to point at;
+            # anchor it on the final page instead of a dangling destination.
+            page_number = min(page_number, last) if last >= 0 else page_number
+            parent_ref = nodes[parent] if parent is not None else None
+            nodes.append(self.writer.add_outline_item(title, page_number, parent=parent_ref))
+
+    def write(self, path: str):
+        self._build_outline()
+        with open(path, "wb") as f:
+            self.writer.write(f)
+
+
+# ── Merge pipeline stages
+# merge_with_bookmarks runs four stages over one MergeRun, each timed:
+#   ingest   – list the uploads, drop empty and byte-identical files, images → PDF
+#   extract  – fingerprint repeated pages, gate boilerplate, prefetch the rest
+#              on the worker pool (the expensive stage)
+#   analyse  – one PageRecord per page: category, form, title, owner, account
+#   assemble – bookmark tree and merged PDF, from the records alone
+# Page text stays in the PageTextStore; records only carry what later
+# stages decide on, so they are cheap to keep for every page of a run.
+
+
+@dataclass(slots=True)
+class PageRecord:
+    """What the analyse stage settled about one page."""
+    path: str
+    page_index: int
+    category: str = "Others"
+    form: str = ""
+    title: str | None = None            # bookmark title, for TITLE_EXTRACTORS forms
+    owner: str | None = None            # "TP" / "SP" by the SSN on the page
+    account: str | None = None          # account number as printed
+    masked_account: str | None = None   # last digits of a masked account number
+    page_hash: str | None = None        # page_content_hash()
+    text_hash: str | None = None        # md5 of the tiered text
+    duplicate_of: Tuple[str, int] | None = None
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return (self.path, self.page_index)
+
+    @property
+    def entry(self) -> Tuple[str, int, str]:
+        """(path, page_index, form), the shape the bookmark code groups on."""
+        return (self.path, self.page_index, self.form)
+
+
+@dataclass
+class MergeRun:
+    """State handed from stage to stage within one merge_with_bookmarks call."""
+    abs_input: str
+    abs_output: str
+    pool: DocumentPool
+    store: PageTextStore
+    tp_ssn: str = ""
+    sp_ssn: str = ""
+    files: List[str] = field(default_factory=list)             # unique uploads, images converted
+    duplicate_files: List[str] = field(default_factory=list)   # byte-identical re-uploads
+    converted_files: List[str] = field(default_factory=list)   # PDFs made from images
+    pdf_pages: List[Tuple[str, int]] = field(default_factory=list)
+    dup_of: Dict[tuple, tuple] = field(default_factory=dict)    # find_duplicate_pages()
+    records: List[PageRecord] = field(default_factory=list)
+    accounts: AccountIndex = field(default_factory=AccountIndex)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+@contextmanager
+def timed_stage(run: MergeRun, name: str):
+    start = time.perf_counter()
     try:
-        meta = json.loads(meta_json)
-        tp_ssn = meta.get("tpSSN", "")
-        sp_ssn = meta.get("spSSN", "")
-        tp_name = meta.get("tpName", "")
-        sp_name = meta.get("spName", "")
+        yield
+    finally:
+        run.timings[name] = time.perf_counter() - start
+        print(f"[Stage] {name}: {run.timings[name]:.2f}s", file=sys.stderr)
 
-        print(f"[META] TP SSN={tp_ssn}, SP SSN={sp_ssn}", file=sys.stderr)
 
-    except Exception as e:
-        print(f"[META ERROR] Could not parse JSON: {e}", file=sys.stderr)
-    # Prevent storing merged file inside input_dir
-    abs_input = os.path.abspath(input_dir)
-    abs_output = os.path.abspath(output_pdf)
-    if abs_output.startswith(abs_input + os.sep):
-        abs_output = os.path.join(os.path.dirname(abs_input), os.path.basename(abs_output))
-        logger.warning(f"Moved output outside: {abs_output}")
+def ingest_stage(run: MergeRun):
+    """Uploads to process: empty and byte-identical files set aside, images converted to PDF."""
+    abs_input = run.abs_input
     # ✅ Collect all candidate files
     all_files = sorted(
         f for f in os.listdir(abs_input)
         if f.lower().endswith(('.pdf', '.png', '.jpg', '.jpeg', '.tiff'))
-        and f != os.path.basename(abs_output)
+        and f != os.path.basename(run.abs_output)
     )
-    import hashlib
 
-    # --- Detect duplicate PDFs by MD5 hash ---
-    hash_map = {}         # md5 -> first filename
-    duplicate_files = []  # list of duplicate filenames
+    # --- Detect duplicate uploads by content digest (hashed in chunks) ---
+    hash_map = {}         # digest -> first filename
 
     for f in all_files:
         path = os.path.join(abs_input, f)
         try:
-            with open(path, "rb") as fh:
-                md5 = hashlib.md5(fh.read()).hexdigest()
-            if md5 in hash_map:
-                duplicate_files.append(f)
+            # remove any zero‐byte files so PdfReader never sees them
+            if os.path.getsize(path) == 0:
+                logger.warning(f"Skipping empty file: {f}")
+                continue
+            digest = run.store.digest(path)
+            if digest in hash_map:
+                run.duplicate_files.append(f)
             else:
-                hash_map[md5] = f
+                hash_map[digest] = f
         except Exception as e:
             print(f"⚠️ Could not hash {f}: {e}", file=sys.stderr)
 
     # Keep only unique files for processing
     files = sorted(hash_map.values())
-    logger.info(f"Found {len(files)} unique files, {len(duplicate_files)} duplicates.")
+    logger.info(f"Found {len(files)} unique files, {len(run.duplicate_files)} duplicates.")
 
-   
-   # remove any zero‐byte files so PdfReader never sees them
-    files = []
-    for f in all_files:
-        p = os.path.join(abs_input, f)
-        if os.path.getsize(p) == 0:
-           logger.warning(f"Skipping empty file: {f}")
-           continue
-        files.append(f)
     # 🔄 Convert images into PDFs so the rest of the pipeline sees only PDFs
-    converted_files = []
     for f in list(files):
         if f.lower().endswith(('.png', '.jpg', '.jpeg', '.tiff')):
             path = os.path.join(abs_input, f)
@@ -5716,55 +4613,106 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                 # replace the image with its new PDF
                 files.remove(f)
                 files.append(os.path.basename(pdf_path))
-                converted_files.append(pdf_path)
+                run.converted_files.append(pdf_path)
             except Exception as e:
                 print(f"❌ Failed to convert {f}: {e}", file=sys.stderr)
 
     logger.info(f"Found {len(files)} files in {abs_input}")
+    run.files = files
 
-    income, expenses, others = [], [], []
-    # what bookmarks we want in workpapaer shoudl be add in this
-    w2_titles = {}
-    int_titles = {}
-    div_titles = {} # <-- Add this line
-    g1099_titles = {}
-    r1099_titles = {}
-    sa_titles = {}  
-    mort_titles = {}
-    prop_titles = {}
-    sa5498_titles = {}
-    t529_titles = {}
-    t1098_titles = {}
-    account_pages = {}  # {account_number: [(path, page_index, 'Consolidated-1099')]}
-    account_names = {}
-    # ✅ Track seen page text hashes to detect duplicate pages (within or across files)
-    seen_pages = {}
+    for fname in files:
+        if fname.lower().endswith('.pdf'):
+            path = os.path.join(abs_input, fname)
+            try:
+                count = run.pool.page_count(path)
+                if run.store.index_file(path, count):
+                    print(f"[Ingest] {fname} seen before, reusing its cached pages", file=sys.stderr)
+                run.pdf_pages += [(path, i) for i in range(count)]
+            except Exception as e:
+                print(f"⚠️ Could not count pages of {fname}: {e}", file=sys.stderr)
 
-    # --- Skip duplicates in main processing ---
-    files = [f for f in files if f not in duplicate_files]
 
-    for fname in files:
-        path = os.path.join(abs_input, fname)
+def extract_stage(run: MergeRun):
+    """
+    Extract every PDF page's tiered text up front across worker processes.
+    Repeated pages are settled from fingerprints and boilerplate pages from
+    their text layer first; per-method extracts are pulled later, only for
+    title consensus.
+    """
+    run.dup_of = find_duplicate_pages(run.pdf_pages, run.store)
+    todo = [p for p in run.pdf_pages if p not in run.dup_of]
+    run.store.prefetch(run.store.gate_boilerplate(todo), methods=())
+
+
+def analyse_page_record(run: MergeRun, path: str, i: int) -> PageRecord:
+    """Classify one extracted page and read its title, owner and account."""
+    store = run.store
+    # Classify once on the tiered text; other methods only feed title consensus
+    tiered = store.text(path, i)
+    analysis = store.analysis(
+        path, i, lambda: analyse_page(tiered, lambda form: title_candidates(store, path, i, form)))
+    rec = PageRecord(path, i, analysis.category, analysis.form, analysis.title,
+                     page_hash=store.page_hash(path, i))
+    if analysis.title:
+        print(f"--- Chosen {analysis.form} title ({analysis.title_source}): {analysis.title} "
+              f"[tried: {', '.join(analysis.tried)}] ---", file=sys.stderr)
+        if analysis.fields:
+            print_w2_summary(analysis.fields)
+
+    # Owner is settled here once, so bookmarking never re-reads the page
+    rec.owner = detect_ssn_owner(tiered, run.tp_ssn, run.sp_ssn)
+    if rec.owner is None and (run.tp_ssn or run.sp_ssn):
+        # scanned forms: the recipient TIN box re-OCR'd on its own
+        rec.owner = detect_ssn_owner(store.region_text(path, i, rec.form, "ssn"), run.tp_ssn, run.sp_ssn)
+
+    if not skips_account(tiered, rec.form):
+        rec.account, rec.masked_account = page_accounts(tiered, rec.form)
+        if not (rec.account or rec.masked_account):
+            # scanned forms: the account line re-OCR'd on its own reads better
+            rec.account, rec.masked_account = page_accounts(
+                store.region_text(path, i, rec.form, "account"), rec.form)
+    return rec
+
+
+def analyse_stage(run: MergeRun):
+    """
+    One PageRecord per page, in upload order. Pages are analysed
+    independently (analyse_page_record); only the duplicate-text check and
+    filing pages by account depend on the pages before them.
+    """
+    store = run.store
+    # ✅ Track seen page text hashes to detect duplicate pages (within or across files)
+    seen_text = {}
+    for fname in run.files:
+        path = os.path.join(run.abs_input, fname)
         if fname.lower().endswith('.pdf'):
-            total = len(PdfReader(path).pages)
+            total = run.pool.page_count(path)
             for i in range(total):
                 print("=" * 400, file=sys.stderr)
                 print(f"Processing: {fname}, Page {i+1}", file=sys.stderr)
+                if (path, i) in run.dup_of:
+                    first_path, first_i = run.dup_of[(path, i)]
+                    print(f"[DUPLICATE PAGE] {fname} p{i+1} matches {os.path.basename(first_path)} p{first_i+1} "
+                          f"(fingerprint)", file=sys.stderr)
+                    run.records.append(PageRecord(path, i, "Others", "Duplicate", duplicate_of=(first_path, first_i)))
+                    continue
 
                 # ── Print header before basic extract_text
                 print("→ extract_text() output:", file=sys.stderr)
+                text_hash = None
                 try:
-                    text = extract_text(path, i)
+                    text = store.text(path, i)
                     # --- 🆕 Detect duplicate pages across all PDFs ---
-                    import hashlib
-
-                    page_hash = hashlib.md5(text.encode("utf-8", errors="ignore")).hexdigest()
-                    if page_hash in seen_pages:
-                        print(f"[DUPLICATE PAGE] {fname} p{i+1} matches {os.path.basename(seen_pages[page_hash][0])} p{seen_pages[page_hash][1]+1}", file=sys.stderr)
-                        others.append((path, i, "Duplicate"))  # Move this page to Others → Duplicate
-                        continue  # Skip classification for this duplicate page
+                    text_hash = hashlib.md5(text.encode("utf-8", errors="ignore")).hexdigest()
+                    if text_hash in seen_text:
+                        first_path, first_i = seen_text[text_hash]
+                        print(f"[DUPLICATE PAGE] {fname} p{i+1} matches {os.path.basename(first_path)} p{first_i+1}", file=sys.stderr)
+                        # Move this page to Others → Duplicate, skipping classification
+                        run.records.append(PageRecord(path, i, "Others", "Duplicate", text_hash=text_hash,
+                                                      duplicate_of=(first_path, first_i)))
+                        continue
                     else:
-                        seen_pages[page_hash] = (path, i)
+                        seen_text[text_hash] = (path, i)
 
                     print(text or "[NO TEXT]", file=sys.stderr)
                 except Exception as e:
@@ -5772,160 +4720,39 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
 
                 print("=" * 400, file=sys.stderr)
 
-                # Multi-method extraction
-                extracts = {}
-
-                print("→ PDFMiner:", file=sys.stderr)
-                try:
-                    extracts['PDFMiner'] = pdfminer_extract(path, page_numbers=[i], laparams=PDFMINER_LA_PARAMS) or ""
-                    print(extracts['PDFMiner'], file=sys.stderr)
-                except Exception as e:
-                    extracts['PDFMiner'] = ""
-                    print(f"[ERROR] PDFMiner failed: {e}", file=sys.stderr)
-
-               
-
-                print("→ Tesseract OCR:", file=sys.stderr)
-                try:
-                    img = pdf_page_to_image(path, i, dpi=150)  # ✅ use your PyMuPDF helper
-                    extracts['Tesseract'] = pytesseract.image_to_string(img, config="--psm 6") or ""
-                    print(extracts['Tesseract'], file=sys.stderr)
-                except Exception as e:
-                    extracts['Tesseract'] = ""
-                    print(f"[ERROR] Tesseract failed: {e}", file=sys.stderr)
-
-                print("→ pdfplumber:", file=sys.stderr)
-                try:
-                    with pdfplumber.open(path) as pdf:
-                        extracts['pdfplumber'] = pdf.pages[i].extract_text() or ""
-                        print(extracts['pdfplumber'], file=sys.stderr)
-                except Exception as e:
-                    extracts['pdfplumber'] = ""
-                    print(f"[ERROR] pdfplumber failed: {e}", file=sys.stderr)
-
-                print("→ PyMuPDF (fitz):", file=sys.stderr)
-                try:
-                    doc = fitz.open(path)
-                    extracts['PyMuPDF'] = doc.load_page(i).get_text()
-                    doc.close()
-                    print(extracts['PyMuPDF'], file=sys.stderr)
-                except Exception as e:
-                    extracts['PyMuPDF'] = ""
-                    print(f"[ERROR] PyMuPDF failed: {e}", file=sys.stderr)
-
-                print("=" * 400, file=sys.stderr)
-             
-
-                # Collect W-2 employer names across methods
-                info_by_method, names = {}, []
-                for method, txt in extracts.items():
-                    cat, ft = classify_text(txt)
-                    if cat == 'Income' and ft == 'W-2':
-                        info = parse_w2(txt)
-                        if info['employer_name'] != 'N/A':
-                            info_by_method[method] = info
-                            names.append(info['employer_name'])
-                    # --- 1099-INT bookmark extraction ---
-                    if cat == 'Income' and ft == '1099-INT':
-                        title = extract_1099int_bookmark(txt)
-                        if title and title != '1099-INT':
-                            int_titles[(path, i)] = title
-                    # <<< new DIV logic
-                    if cat == 'Income' and ft == '1099-DIV':
-                        title = extract_1099div_bookmark(txt)
-                        if title and title != '1099-DIV':
-                            div_titles[(path, i)] = title
-                    if cat == 'Income' and ft == '1099-SA':
-                        title = extract_1099sa_bookmark(txt)
-                        if title and title != '1099-SA':
-                            sa_titles[(path, i)] = title
-                    
-                    if cat == 'Income' and ft == '1099-R':
-                        title = extract_1099r_bookmark(txt)
-                        if title and title != '1099-R':
-                            r1099_titles[(path, i)] = title
-
-                    if cat == 'Expenses' and ft == '1098-Mortgage':
-                        title = extract_1098mortgage_bookmark(txt)
-                        if title and title != '1098-Mortgage':
-                            mort_titles[(path, i)] = title
-                    if cat == 'Expenses' and ft == '5498-SA':
-                        title = extract_5498sa_bookmark(txt)
-                        if title and title != '5498-SA':
-                            sa5498_titles[(path, i)] = title
-                           
-                    if cat == 'Expenses' and ft == '1098-T':
-                        title = extract_1098t_bookmark(txt)
-                        if title and title != '1098-T':
-                            t1098_titles[(path, i)] = title
-                    if cat == 'Expenses' and ft == '529-Plan':
-                        title = extract_529_bookmark(txt)
-                        if title and title != '529-Plan':
-                            t529_titles[(path, i)] = title
-                    
-
-                if names:
-                    common = Counter(names).most_common(1)[0][0]
-                    chosen = next(m for m,i in info_by_method.items() if i['employer_name'] == common)
-                    print(f"--- Chosen employer ({chosen}): {common} ---", file=sys.stderr)
-                    print_w2_summary(info_by_method[chosen])
-                    w2_titles[(path, i)] = common
-
-                # Classification & grouping
-                    # … after you’ve extracted text …
-                   # NEW: {acct: "Issuer Name"}
-
-                tiered = extract_text(path, i)
-                acctnum = extract_account_number(tiered)
+                rec = analyse_page_record(run, path, i)
+                rec.text_hash = text_hash
+                tiered = store.text(path, i)
                 lowertext = tiered.lower()
 
                 # NEW: acct + Issuer Name
-                if acctnum:
+                acctnum, masked = rec.account, rec.masked_account
+                if acctnum or masked:
                     # --- Only add to Consolidated-1099 if it's truly a 1099 form ---
                     if '1099' in lowertext and not re.search(r'1098-t', lowertext, re.IGNORECASE):
-                        # Check if this account already exists
-                        if acctnum not in account_pages:  # ✅ FIXED: account_pages (with underscore)
-                            # FIRST occurrence - add the full entry
-                            account_pages[acctnum] = [(path, i, 'Consolidated-1099')]
-
-                        # Capture issuer name if present
+                        acct_key, new_acct = run.accounts.add((path, i, 'Consolidated-1099'), acctnum, masked)
+                        if new_acct:
+                            # Capture issuer name off the account's first page
                             issuer = extract_consolidated_issuer(tiered)
                             if issuer:
-                                account_names[acctnum] = issuer  # ✅ FIXED: account_names (with underscore)
-            
-                            print(f"DEBUG: {os.path.basename(path)} p{i+1} => NEW Consolidated-1099 (acct={acctnum})", file=sys.stderr)
+                                run.accounts.set_issuer(acct_key, issuer)
+                            print(f"DEBUG: {os.path.basename(path)} p{i+1} => NEW Consolidated-1099 (acct={acctnum or 'XXXX' + masked})", file=sys.stderr)
                         else:
-                # SUBSEQUENT pages with same account - just track them
-                            account_pages[acctnum].append((path, i, 'Consolidated-1099'))
-                            print(f"DEBUG: {os.path.basename(path)} p{i+1} => Added to EXISTING Consolidated-1099 (acct={acctnum})", file=sys.stderr)
-
+                            print(f"DEBUG: {os.path.basename(path)} p{i+1} => Added to EXISTING Consolidated-1099 (acct={acctnum or 'XXXX' + masked})", file=sys.stderr)
 
-
-
-# Always classify after account checks
-                cat, ft = classify_text(tiered)
-                # 🚫 Skip per-page bookmark creation for K-1 pages (will be grouped later)
-                if cat == "Income" and ft == "K-1":
-                    income.append((path, i, ft))
+                run.records.append(rec)
+                # 🚫 K-1 pages get no per-page bookmark (grouped at assembly)
+                if rec.category == "Income" and rec.form == "K-1":
                     continue
 
-               
                 # NEW: log every classification
                 print(
                     f"[Classification] {os.path.basename(path)} p{i+1} → "
-                    f"Category='{cat}', Form='{ft}', "
+                    f"Category='{rec.category}', Form='{rec.form}', "
                     f"snippet='{tiered[:150].strip().replace(chr(80),' ')}…'",
                     file=sys.stderr
                 )
 
-                entry = (path, i, ft)
-                if cat == 'Income':
-                    income.append(entry)
-                elif cat == 'Expenses':
-                    expenses.append(entry)
-                else:
-                    others.append(entry)
-
         else:
             # Image handling
             print(f"\n=== Image {fname} ===", file=sys.stderr)
@@ -5933,15 +4760,29 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
             print("--- OCR Image ---", file=sys.stderr)
             print(oi, file=sys.stderr)
             cat, ft = classify_text(oi)
-            entry = (path, 0, ft)
-            if cat == 'Income':
-                income.append(entry)
-            elif cat == 'Expenses':
-                expenses.append(entry)
-            else:
-                others.append(entry)
+            run.records.append(PageRecord(path, 0, cat, ft))
+
+
+def assemble_stage(run: MergeRun):
+    """
+    Bookmark tree and merged PDF, built from the PageRecords. Page text is
+    only read back from the store's memory for the per-form label rules.
+    """
+    page_store, doc_pool = run.store, run.pool
+    abs_input, abs_output = run.abs_input, run.abs_output
+    files, duplicate_files = run.files, run.duplicate_files
+    pages_by_key = {rec.key: rec for rec in run.records}
+    titles = {rec.key: rec.title for rec in run.records if rec.title}
+
+    income, expenses, others = [], [], []
+    for rec in run.records:
+        if rec.category == 'Income':
+            income.append(rec.entry)
+        elif rec.category == 'Expenses':
+            expenses.append(rec.entry)
+        else:
+            others.append(rec.entry)
 
-   
     # ---- Consolidated-1099 synthesis (insert this BEFORE income.sort(...)) ----
     consolidated_payload = {}        # key -> list of real page entries
     consolidated_pages = set()       # pages already placed under Consolidated-1099
@@ -5949,6 +4790,7 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
     unused_pages: set[tuple[str, int]] = set()
 
 
+    account_pages, account_names = run.accounts.groups()
     for acct, pages in account_pages.items():
         if len(pages) <= 1:
             continue  # only group repeated accounts
@@ -5971,7 +4813,8 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
 
     for idx, entry in enumerate(income):
         path, page_idx, form_type = entry
-        page_text = extract_text(path, page_idx).lower()
+        # synthetic CONSOLIDATED::<acct> rows have no page to read
+        page_text = "" if path.startswith("CONSOLIDATED::") else page_store.text(path, page_idx).lower()
 
         if "schedule k-1" in page_text or "form 1065" in page_text:
           # 
@@ -6008,18 +4851,18 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
 
 
     # merge & bookmarks
-    merger = PdfMerger()
+    merger = OutputAssembler(doc_pool)
     page_num = 0
     stop_after_na = False
     import mimetypes
-    #seen_pages = set()
+    appended = set()  # (path, page_index) already in the output
     def append_and_bookmark(entry, parent, title, with_bookmark=True, owner_override="detect"):
-        nonlocal page_num, seen_pages
+        nonlocal page_num
         sig = (entry[0], entry[1])
-        if sig in seen_pages:
+        if sig in appended:
             print(f"[DUPLICATE] Skipping {os.path.basename(entry[0])} page {entry[1]+1}", file=sys.stderr)
             return
-        seen_pages[sig] = True
+        appended.add(sig)
 
         p, idx, _ = entry
         mime_type, _ = mimetypes.guess_type(p)
@@ -6028,28 +4871,18 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
             print(f"⚠️  Skipping non-PDF file: {p}", file=sys.stderr)
             return
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp:
-            w = PdfWriter()
-            try:
-                w.add_page(PdfReader(p).pages[idx])
-                w.write(tmp)
-                tmp.flush()
-                os.fsync(tmp.fileno())
-            except Exception:
-                print(f"Temp write failed: {p} p{idx+1}", file=sys.stderr)
-                traceback.print_exc()
-                return
-            tmp_path = tmp.name
-
-        with open(tmp_path, 'rb') as fh:
-            merger.append(fileobj=fh)
-        os.unlink(tmp_path)
+        try:
+            merger.add_page(p, idx)
+        except Exception:
+            print(f"Page copy failed: {p} p{idx+1}", file=sys.stderr)
+            traceback.print_exc()
+            return
 
         # -------- INSERT THIS BLOCK INSIDE FUNCTION --------
         try:
             if owner_override is None:
-                page_text = extract_text(p, idx)
-                owner = detect_ssn_owner(page_text, tp_ssn, sp_ssn)
+                rec = pages_by_key.get((p, idx))
+                owner = rec.owner if rec else None
                 if owner:
                     title = f"{title} – {owner}"
 
@@ -6116,11 +4949,9 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                     owner = None
 
                     for rp in real_entries:
-                        rp_path, rp_idx, _ = rp
-                        txt = extract_text(rp_path, rp_idx)
-                        who = detect_ssn_owner(txt, tp_ssn, sp_ssn)
-                        if who:
-                            owner = who
+                        rec = pages_by_key.get((rp[0], rp[1]))
+                        if rec and rec.owner:
+                            owner = rec.owner
                             break
 
         # Build final account label
@@ -6136,7 +4967,7 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
         #  ADD ALL PAGES BELOW THIS ACCOUNT
         # ------------------------------------------------------------------
                     for real_entry in real_entries:
-                        page_text = extract_text(real_entry[0], real_entry[1])
+                        page_text = page_store.text(real_entry[0], real_entry[1])
 
             # Skip unused pages
                         if is_unused_page(page_text):
@@ -6173,24 +5004,24 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                 # build the label
                 lbl = form if len(grp) == 1 else f"{form}#{j}"
                 if form == 'W-2':
-                    emp = w2_titles.get((path, idx))
+                    emp = titles.get((path, idx))
                     if emp:
                         lbl = emp
                 elif form == '1099-INT':
-                    payer = int_titles.get((path, idx))
+                    payer = titles.get((path, idx))
                     if payer:
                         lbl = payer
                 elif form == '1099-DIV':                  # <<< new
-                    payer = div_titles.get((path, idx))
+                    payer = titles.get((path, idx))
                     if payer:
                         lbl = payer
                 elif form == '1099-SA':
-                    payer = sa_titles.get((path, idx))
+                    payer = titles.get((path, idx))
                     if payer:
                         lbl = payer
                 
                 elif form == '1099-R':
-                    payer = r1099_titles.get((path, idx))
+                    payer = titles.get((path, idx))
                     if payer:
                         lbl = payer
 
@@ -6201,8 +5032,6 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                    
                 # normal case
                 print(f"[Bookmark] {os.path.basename(path)} p{idx+1} → Category='Income', Form='{form}', Title='{lbl}'", file=sys.stderr)
-                # 🆕 Detect SSN owner for this page and label it
-                page_text = extract_text(path, idx)
                 
  
                 #print(f"[SSN Tag] {os.path.basename(path)} p{idx+1} → {owner}", file=sys.stderr)
@@ -6221,25 +5050,25 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                 path, idx, _ = entry
                 lbl = form if len(grp) == 1 else f"{form}#{j}"
                 if form == '1098-Mortgage':
-                    m = mort_titles.get((path, idx))
+                    m = titles.get((path, idx))
                     if m:
                       lbl = m
                 elif form == '5498-SA':
-                    trustee = sa5498_titles.get((path, idx))
+                    trustee = titles.get((path, idx))
                     if trustee:
                         lbl = trustee
                     else:
-                        lbl = extract_5498sa_bookmark(text)
+                        lbl = extract_5498sa_bookmark(page_store.text(path, idx))
 
                 elif form == '1098-T':
-                    trustee = t1098_titles.get((path, idx))
+                    trustee = titles.get((path, idx))
                     if trustee:
                         lbl = trustee
                     else:
-                        page_text = extract_text(path, idx)  # ✅ get text for this page
+                        page_text = page_store.text(path, idx)  # ✅ get text for this page
                         lbl = extract_1098t_bookmark(page_text)
                 elif form == "Child Care Expenses":
-                    page_text = extract_text(path, idx)
+                    page_text = page_store.text(path, idx)
                     lower_page = page_text.lower()
 
                     # Check for key tax ID identifiers
@@ -6273,11 +5102,11 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                         )
 
                 elif form == '529-Plan':
-                    title = t529_titles.get((path, idx))
+                    title = titles.get((path, idx))
                     if title:
                         lbl = title
                 elif form == 'Property Tax':
-                    title = prop_titles.get((path, idx))
+                    title = titles.get((path, idx))
                     if title:
                         lbl = title
 
@@ -6290,7 +5119,6 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
                    
                 # normal case
                 print(f"[Bookmark] {os.path.basename(path)} p{idx+1} → Category='Expenses', Form='{form}', Title='{lbl}'", file=sys.stderr)
-                page_text = extract_text(path, idx)
                 
  
                 #print(f"[SSN Tag] {os.path.basename(path)} p{idx+1} → {owner}", file=sys.stderr)
@@ -6325,8 +5153,7 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
             for f in duplicate_files:
                 dup_path = os.path.join(abs_input, f)
                 try:
-                    reader = PdfReader(dup_path)
-                    for i in range(len(reader.pages)):
+                    for i in range(doc_pool.page_count(dup_path)):
                         append_and_bookmark((dup_path, i, "Duplicate"), node_dupe, "", with_bookmark=False)
                     print(f"[Duplicate] Added file {f} under 'Others → Duplicate'", file=sys.stderr)
                 except Exception as e:
@@ -6337,7 +5164,7 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
             node_1095c = merger.add_outline_item('1095-C', page_num, parent=root)
             for entry in c1095_pages:
                 path, idx, _ = entry
-                page_text = extract_text(path, idx)
+                page_text = page_store.text(path, idx)
                 lbl = extract_1095c_bookmark(page_text)
                 append_and_bookmark(entry, node_1095c, lbl)
                 print(f"[Bookmark] {os.path.basename(path)} p{idx+1} → Category='Others', Form='1095-C', Title='{lbl}'", file=sys.stderr)
@@ -6348,18 +5175,59 @@ def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
             #append_and_bookmark(entry, node, lbl)
 
     input_count = sum(
-    len(PdfReader(os.path.join(input_dir, f)).pages)
+    doc_pool.page_count(os.path.join(abs_input, f))
     for f in files if f.lower().endswith(".pdf")
     )
     print(f"[SUMMARY] Input pages={input_count}, Output pages={page_num}", file=sys.stderr)
 
     # Write merged output
     os.makedirs(os.path.dirname(abs_output), exist_ok=True)
-    with open(abs_output,'wb') as f:
-        merger.write(f)
-    merger.close()
+    merger.write(abs_output)
     print(f"Merged PDF created at {abs_output}", file=sys.stderr)
 
+
+# ── Merge + bookmarks + cleanup
+def merge_with_bookmarks(input_dir, output_pdf, meta_json, dummy=""):
+
+    import json
+    import sys
+
+
+    # Default values
+    tp_ssn = ""
+    sp_ssn = ""
+
+    # The server now sends JSON as 4th argument
+    try:
+        meta = json.loads(meta_json)
+        tp_ssn = meta.get("tpSSN", "")
+        sp_ssn = meta.get("spSSN", "")
+
+        print(f"[META] TP SSN={tp_ssn}, SP SSN={sp_ssn}", file=sys.stderr)
+
+    except Exception as e:
+        print(f"[META ERROR] Could not parse JSON: {e}", file=sys.stderr)
+    # Prevent storing merged file inside input_dir
+    abs_input = os.path.abspath(input_dir)
+    abs_output = os.path.abspath(output_pdf)
+    if abs_output.startswith(abs_input + os.sep):
+        abs_output = os.path.join(os.path.dirname(abs_input), os.path.basename(abs_output))
+        logger.warning(f"Moved output outside: {abs_output}")
+    # One extraction per page for the whole run
+    ocr_cache = open_ocr_cache()
+    try:
+        with DocumentPool() as doc_pool:  # closed once the merged PDF is written, or on error
+            run = MergeRun(abs_input, abs_output, doc_pool, PageTextStore(disk=ocr_cache, pool=doc_pool),
+                           tp_ssn=tp_ssn, sp_ssn=sp_ssn)
+            for name, stage_fn in (("ingest", ingest_stage), ("extract", extract_stage),
+                                   ("analyse", analyse_stage), ("assemble", assemble_stage)):
+                with timed_stage(run, name):
+                    stage_fn(run)
+    finally:
+        if ocr_cache is not None:
+            ocr_cache.close()
+    files, converted_files = run.files, run.converted_files
+
     # Cleanup uploads
     # Cleanup uploads
     # Cleanup uploads (originals + converted PDFs)